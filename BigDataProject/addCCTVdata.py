@@ -1,17 +1,28 @@
 import pandas as pd
-import re
+from openpyxl import load_workbook
+from loader import to_numeric
 
-df = pd.read_excel("BigDataProject/12_04_08_E_CCTV정보.xlsx")
+# 관리기관명/카메라대수 두 컬럼만 읽기 전용 모드로 스트리밍
+def read_cctv(path, columns=2):
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(max_col=columns, values_only=True)
+        header = next(rows)
+        return pd.DataFrame(list(rows), columns=header)
+    finally:
+        workbook.close()
 
-# 이름 추출
-def extract_gu(name):
-    match = re.search(r'서울(?:시|특별시)\s*(\S+?)청', name)
-    return match.group(1) if match else None
+df = read_cctv("BigDataProject/12_04_08_E_CCTV정보.xlsx")
+
+# 이름 추출 (같은 기관명이 수만 번 반복되므로 고유한 기관명에만 정규식 적용)
+def extract_gu(names):
+    unique = pd.Series(names.dropna().unique()).astype(str)
+    gu = unique.str.extract(r'서울(?:시|특별시)\s*(\S+?)청', expand=False)
+    return names.map(dict(zip(unique, gu)))
 
 # 구 컬럼 추가
-df['구'] = df.iloc[:, 0].apply(extract_gu)
+df['구'] = extract_gu(df.iloc[:, 0])
+df[df.columns[1]] = to_numeric(df[df.columns[1]])
 # 합산
 result = df.groupby('구')[df.columns[1]].sum().reset_index()
 result.to_csv("output.csv", index=False, encoding='utf-8-sig')
-
-
@@ -1,10 +1,12 @@
 import pandas as pd
+from districts import canonical_names
 
 # CSV 읽기
 df = pd.read_csv("BigDataProject/경찰청_범죄 발생 지역별 통계_20231231.csv", encoding="cp949")
 
-# 컬럼명 서울 제거
-df.columns = [col.replace('서울', '') if col != df.columns[0] else col for col in df.columns]
+# 서울 구 컬럼명을 표준 구 이름으로 통일 ('서울종로구' -> '종로구', 다른 지역은 그대로)
+columns = pd.Series(df.columns[1:])
+df.columns = [df.columns[0]] + canonical_names(columns).fillna(columns).tolist()
 df = df.rename(columns={df.columns[0]: '범죄대분류'})
 
 # 동일한 구 합산
@@ -1,86 +1,23 @@
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import folium
 from folium.plugins import HeatMap
+import branca.colormap as cm
 import json
 import requests
+from features import DistrictFeatures
+from hotspots import HotspotStore, HOTSPOT_FILES
+import spatial
+import render
 
 #한글 폰트 설정
 plt.rcParams['font.family'] = 'Malgun Gothic'
 plt.rcParams['axes.unicode_minus'] = False
 
-def load_data():
-    """데이터 로드 및 전처리 함수"""
-    try:
-        #CCTV
-        try:
-            cctv_df = pd.read_csv("CCTV.csv", encoding='utf-8-sig')
-            print("CCTV.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                cctv_df = pd.read_csv("CCTV.csv", encoding='cp949')
-                print("CCTV.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                cctv_df = pd.read_csv("CCTV.csv", encoding='euc-kr')
-                print("CCTV.csv 로드 성공 (EUC-KR)")
-    
-        #범죄
-        try:
-            crime_df = pd.read_csv("Crime.csv", encoding='utf-8-sig')
-            print("Crime.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                crime_df = pd.read_csv("Crime.csv", encoding='cp949')
-                print("Crime.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                crime_df = pd.read_csv("Crime.csv", encoding='euc-kr')
-                print("Crime.csv 로드 성공 (EUC-KR)")
-        
-        #부동산
-        try:
-            estate_df = pd.read_csv("Estate.csv", encoding='utf-8-sig')
-            print("Estate.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                estate_df = pd.read_csv("Estate.csv", encoding='cp949')
-                print("Estate.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                estate_df = pd.read_csv("Estate.csv", encoding='euc-kr')
-                print("Estate.csv 로드 성공 (EUC-KR)")
-        
-        # 인구
-        try:
-            person_df = pd.read_csv("Person.csv", encoding='utf-8-sig')
-            print("Person.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                person_df = pd.read_csv("Person.csv", encoding='cp949')
-                print("Person.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                person_df = pd.read_csv("Person.csv", encoding='euc-kr')
-                print("Person.csv 로드 성공 (EUC-KR)")
-        
-        return cctv_df, crime_df, estate_df, person_df
-    except Exception as e:
-        print(f"데이터 로드 중 오류 발생: {e}")
-        return None, None, None, None
-
-def analyze_cctv_per_capita(cctv_df, person_df):
-    """인구 1,000명당 CCTV 비율 분석"""
-    #인구 전처리
-    person_by_district = person_df[person_df['동별(2)'] != '소계'].copy()
-    person_by_district = person_by_district[person_by_district['동별(2)'] != '동별(2)'].copy()
-    person_by_district.rename(columns={'동별(2)': '구', '계 (명)': '총인구'}, inplace=True)
-    person_by_district['총인구'] = pd.to_numeric(person_by_district['총인구'].str.replace(',', ''), errors='coerce')
-    
-    #CCTV와 인구 병합
-    cctv_population = pd.merge(cctv_df, person_by_district[['구', '총인구']], on='구', how='inner')
-    
-    #인구 1000명당 CCTV 비율
-    cctv_population['인구천명당CCTV'] = (cctv_population['카메라대수'] / (cctv_population['총인구'] / 1000)).round(2)
-    
-    #결과 시각화
+def plot_cctv_per_capita(cctv_population):
+    """인구 1,000명당 CCTV 막대그래프"""
     plt.figure(figsize=(12, 6))
     sns.barplot(data=cctv_population.sort_values('인구천명당CCTV', ascending=False),
                 x='구', y='인구천명당CCTV', palette='viridis')
@@ -89,25 +26,18 @@ def analyze_cctv_per_capita(cctv_df, person_df):
     plt.ylabel('인구 1,000명당 CCTV 수')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
-    
-    return cctv_population
 
-def analyze_estate_prices(estate_df):
-    """부동산 실거래가 분석"""
-    #부동산 가격 전처리
-    estate_df['물건금액(만원)'] = pd.to_numeric(estate_df['물건금액(만원)'].astype(str).str.replace(',', ''), errors='coerce')
-    
-    #구별 평균가와 중위가 계산
-    estate_analysis = estate_df.groupby('자치구명').agg({
-        '물건금액(만원)': ['mean', 'median']
-    }).round(0)
-    
-    estate_analysis.columns = ['평균가', '중위가']
-    estate_analysis = estate_analysis.sort_values('중위가', ascending=False)
+def analyze_cctv_per_capita(features):
+    """인구 1,000명당 CCTV 비율 분석"""
+    cctv_population = features.select(['카메라대수', '총인구', '인구천명당CCTV'])
     
     #결과 시각화
-    plt.figure(figsize=(12, 6))
+    render.show(plot_cctv_per_capita, '인구수당 CCTV 설치 수', cctv_population)
+    
+    return cctv_population
+
+def plot_estate_prices(estate_analysis):
+    """구별 평균가/중위가 막대그래프"""
     estate_analysis.plot(kind='bar', figsize=(12, 6))
     plt.title('서울 자치구별 아파트 평균가/중위가')
     plt.xlabel('자치구')
@@ -115,37 +45,20 @@ def analyze_estate_prices(estate_df):
     plt.xticks(rotation=45, ha='right')
     plt.legend(['평균가', '중위가'])
     plt.tight_layout()
-    plt.show()
-    
-    return estate_analysis
 
-def analyze_crime_by_type(crime_df, person_df):
-    """범죄 유형별 분석"""
-    #범죄 전처리
-    crime_by_district = crime_df.set_index('범죄대분류').T
-    crime_by_district.reset_index(inplace=True)
-    crime_by_district.rename(columns={'index': '구'}, inplace=True)
-    
-    #범죄 유형별 총계 계산
-    crime_types = crime_by_district.columns[1:]  # '구' 컬럼 제외
-    crime_summary = crime_by_district[crime_types].sum().sort_values(ascending=False)
-    
-    #각 구의 총 범죄수 계산
-    crime_by_district['총범죄수'] = crime_by_district[crime_types].sum(axis=1)
-    
-    #인구 데이터 전처리
-    person_by_district = person_df[person_df['동별(2)'] != '소계'].copy()
-    person_by_district = person_by_district[person_by_district['동별(2)'] != '동별(2)'].copy()
-    person_by_district.rename(columns={'동별(2)': '구', '계 (명)': '총인구'}, inplace=True)
-    person_by_district['총인구'] = pd.to_numeric(person_by_district['총인구'].str.replace(',', ''), errors='coerce')
-    
-    #범죄 데이터와 인구 데이터 병합
-    crime_population = pd.merge(crime_by_district, person_by_district[['구', '총인구']], on='구', how='inner')
-    
-    #인구 1000명당 범죄율 계산
-    crime_population['인구천명당범죄수'] = (crime_population['총범죄수'] / (crime_population['총인구'] / 1000)).round(2)
+def analyze_estate_prices(features):
+    """부동산 실거래가 분석"""
+    #구별 평균가와 중위가
+    estate_analysis = features.select(['평균가', '중위가']).set_index('구').round(0)
+    estate_analysis = estate_analysis.sort_values('중위가', ascending=False)
     
     #결과 시각화
+    render.show(plot_estate_prices, '자치구별 아파트 평균가 중위가', estate_analysis)
+    
+    return estate_analysis
+
+def plot_crime_summary(crime_summary):
+    """범죄 유형별 발생 건수 막대그래프"""
     plt.figure(figsize=(12, 6))
     crime_summary.plot(kind='bar')
     plt.title('범죄 유형별 발생 건수')
@@ -153,54 +66,50 @@ def analyze_crime_by_type(crime_df, person_df):
     plt.ylabel('발생 건수')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
-    
-    #구별 총 범죄수 시각화
+
+def plot_crime_by_district(crime_by_district):
+    """구별 총 범죄수 막대그래프"""
     plt.figure(figsize=(12, 6))
     crime_by_district.sort_values('총범죄수', ascending=False).plot(
-        x='구', y='총범죄수', kind='bar'
+        x='구', y='총범죄수', kind='bar', ax=plt.gca()
     )
     plt.title('자치구별 총 범죄 발생 건수')
     plt.xlabel('자치구')
     plt.ylabel('총 범죄 건수')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
-    
-    #인구 1000명당 범죄율 시각화
+
+def plot_crime_rate(crime_population):
+    """구별 인구 1,000명당 범죄수 막대그래프"""
     plt.figure(figsize=(12, 6))
     crime_population.sort_values('인구천명당범죄수', ascending=False).plot(
-        x='구', y='인구천명당범죄수', kind='bar'
+        x='구', y='인구천명당범죄수', kind='bar', ax=plt.gca()
     )
     plt.title('자치구별 인구 1,000명당 범죄 발생 건수')
     plt.xlabel('자치구')
     plt.ylabel('인구 1,000명당 범죄 건수')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
-    
-    return crime_population
 
-def analyze_foreigner_ratio(person_df):
-    """외국인 비율 분석"""
-    #인구 데이터 전처리
-    person_by_district = person_df[person_df['동별(2)'] != '소계'].copy()
-    person_by_district = person_by_district[person_by_district['동별(2)'] != '동별(2)'].copy()
-    
-    #컬럼명 변경, 숫자형 변환
-    person_by_district.rename(columns={
-        '동별(2)': '구',
-        '계 (명)': '총인구',
-        '등록외국인 (명)': '외국인수'
-    }, inplace=True)
+def analyze_crime_by_type(features):
+    """범죄 유형별 분석"""
+    crime_by_district = features.select(features.crime_types + ['총범죄수'])
     
-    person_by_district['총인구'] = pd.to_numeric(person_by_district['총인구'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인수'] = pd.to_numeric(person_by_district['외국인수'].str.replace(',', ''), errors='coerce')
+    #범죄 유형별 총계 계산
+    crime_summary = crime_by_district[features.crime_types].sum().sort_values(ascending=False)
     
-    #외국인 비율 계산
-    person_by_district['외국인비율'] = (person_by_district['외국인수'] / person_by_district['총인구'] * 100).round(2)
+    #인구 1000명당 범죄율
+    crime_population = features.select(features.crime_types + ['총범죄수', '총인구', '인구천명당범죄수'])
     
     #결과 시각화
+    render.show(plot_crime_summary, '범죄 유형', crime_summary)
+    render.show(plot_crime_by_district, '자치구별 범죄 발생 건수', crime_by_district)
+    render.show(plot_crime_rate, '자치구별 1000명당 범죄 발생 건수', crime_population)
+    
+    return crime_population
+
+def plot_foreigner_ratio(person_by_district):
+    """구별 외국인 비율 막대그래프"""
     plt.figure(figsize=(12, 6))
     sns.barplot(data=person_by_district.sort_values('외국인비율', ascending=False),
                 x='구', y='외국인비율', palette='viridis')
@@ -209,58 +118,27 @@ def analyze_foreigner_ratio(person_df):
     plt.ylabel('외국인 비율 (%)')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    plt.show()
+
+def analyze_foreigner_ratio(features):
+    """외국인 비율 분석"""
+    person_by_district = features.select(['총인구', '외국인수', '외국인비율'])
+    
+    #결과 시각화
+    render.show(plot_foreigner_ratio, '자치구별 외국인 비율', person_by_district)
     
     return person_by_district
 
-def analyze_all_indicators(cctv_df, crime_df, estate_df, person_df):
-    """모든 지표를 비교하는 히트맵 분석"""
-    #CCTV 전처리
-    cctv_by_district = cctv_df.copy()
-    
-    # 범죄 전처리
-    crime_by_district = crime_df.set_index('범죄대분류').T
-    crime_by_district.reset_index(inplace=True)
-    crime_by_district.rename(columns={'index': '구'}, inplace=True)
-    crime_types = crime_by_district.columns[1:]
-    crime_by_district['총범죄수'] = crime_by_district[crime_types].sum(axis=1)
-    
-    # 부동산 전처리
-    estate_df['물건금액(만원)'] = pd.to_numeric(estate_df['물건금액(만원)'].astype(str).str.replace(',', ''), errors='coerce')
-    estate_by_district = estate_df.groupby('자치구명')['물건금액(만원)'].mean().reset_index()
-    estate_by_district.rename(columns={'자치구명': '구'}, inplace=True)
-    
-    # 인구 전처리
-    person_by_district = person_df[person_df['동별(2)'] != '소계'].copy()
-    person_by_district = person_by_district[person_by_district['동별(2)'] != '동별(2)'].copy()
-    person_by_district.rename(columns={
-        '동별(2)': '구',
-        '계 (명)': '총인구',
-        '등록외국인 (명)': '외국인수'
-    }, inplace=True)
-    person_by_district['총인구'] = pd.to_numeric(person_by_district['총인구'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인수'] = pd.to_numeric(person_by_district['외국인수'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인비율'] = (person_by_district['외국인수'] / person_by_district['총인구'] * 100).round(2)
-    
-    #모든 데이터 병합
-    merged_data = pd.merge(cctv_by_district, crime_by_district[['구', '총범죄수']], on='구', how='inner')
-    merged_data = pd.merge(merged_data, estate_by_district, on='구', how='inner')
-    merged_data = pd.merge(merged_data, person_by_district[['구', '총인구', '외국인비율']], on='구', how='inner')
-    
-    #인구 1000명당 지표 계산
-    merged_data['인구천명당CCTV'] = (merged_data['카메라대수'] / (merged_data['총인구'] / 1000)).round(2)
-    merged_data['인구천명당범죄수'] = (merged_data['총범죄수'] / (merged_data['총인구'] / 1000)).round(2)
-    
-    #범죄율과 부동산 가격의 산점도
+def plot_all_indicators(merged_data):
+    """범죄율과 부동산 가격의 산점도"""
     plt.figure(figsize=(12, 8))
     sns.scatterplot(data=merged_data, 
-                   x='물건금액(만원)', 
+                   x='평균가', 
                    y='인구천명당범죄수',
                    s=100)
     
     #구 이름 라벨 추가
     for i in range(len(merged_data)):
-        plt.text(merged_data['물건금액(만원)'].iloc[i] * 1.01,
+        plt.text(merged_data['평균가'].iloc[i] * 1.01,
                 merged_data['인구천명당범죄수'].iloc[i],
                 merged_data['구'].iloc[i],
                 fontsize=9)
@@ -270,86 +148,73 @@ def analyze_all_indicators(cctv_df, crime_df, estate_df, person_df):
     plt.ylabel('인구 1,000명당 범죄 발생 건수')
     plt.grid(True)
     plt.tight_layout()
-    plt.show()
+
+def analyze_all_indicators(features):
+    """모든 지표를 비교하는 히트맵 분석"""
+    merged_data = features.select(['카메라대수', '총범죄수', '평균가', '총인구', '외국인비율',
+                                   '인구천명당CCTV', '인구천명당범죄수'])
+    
+    #범죄율과 부동산 가격의 산점도
+    render.show(plot_all_indicators, '범죄율과 부동산 가격의 관계', merged_data)
     
     return merged_data
 
 def get_district_centers():
-    """서울시 자치구 중심 좌표 반환"""
-    #서울시 자치구 중심 좌표 (위도, 경도)
-    district_centers = {
-        '강남구': [37.517305, 127.047502],
-        '강동구': [37.549207, 127.145482],
-        '강북구': [37.639604, 127.025653],
-        '강서구': [37.550966, 126.849532],
-        '관악구': [37.478406, 126.951613],
-        '광진구': [37.538484, 127.082293],
-        '구로구': [37.495485, 126.887369],
-        '금천구': [37.456455, 126.895310],
-        '노원구': [37.654359, 127.056473],
-        '도봉구': [37.668773, 127.047152],
-        '동대문구': [37.574397, 127.039550],
-        '동작구': [37.512402, 126.939252],
-        '마포구': [37.563341, 126.908287],
-        '서대문구': [37.579116, 126.936778],
-        '서초구': [37.483664, 127.032411],
-        '성동구': [37.563341, 127.036848],
-        '성북구': [37.589116, 127.016778],
-        '송파구': [37.514402, 127.106252],
-        '양천구': [37.517305, 126.866502],
-        '영등포구': [37.526402, 126.896252],
-        '용산구': [37.538484, 126.977293],
-        '은평구': [37.602484, 126.929293],
-        '종로구': [37.572484, 126.977293],
-        '중구': [37.564484, 126.997293],
-        '중랑구': [37.606484, 127.092293]
-    }
-    return district_centers
+    """서울시 자치구 중심 좌표 반환 (구: [위도, 경도], 경계 파일이 있으면 실제 무게중심)"""
+    centers = district_centers_frame()
+    return {gu: [lat, lon] for gu, lat, lon in zip(centers['구'], centers['위도'], centers['경도'])}
 
-def visualize_crime_cctv_map(crime_df, cctv_df, person_df):
-    """범죄 다발 지역과 외국인 비율을 지도에 시각화"""
-    #범죄 데이터 전처리
-    crime_by_district = crime_df.set_index('범죄대분류').T
-    crime_by_district.reset_index(inplace=True)
-    crime_by_district.rename(columns={'index': '구'}, inplace=True)
-    crime_types = crime_by_district.columns[1:]
-    crime_by_district['총범죄수'] = crime_by_district[crime_types].sum(axis=1)
-    
-    #인구 데이터 전처리
-    person_by_district = person_df[person_df['동별(2)'] != '소계'].copy()
-    person_by_district = person_by_district[person_by_district['동별(2)'] != '동별(2)'].copy()
-    person_by_district.rename(columns={
-        '동별(2)': '구',
-        '계 (명)': '총인구',
-        '등록외국인 (명)': '외국인수'
-    }, inplace=True)
-    person_by_district['총인구'] = pd.to_numeric(person_by_district['총인구'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인수'] = pd.to_numeric(person_by_district['외국인수'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인비율'] = (person_by_district['외국인수'] / person_by_district['총인구'] * 100).round(2)
-    
-    #범죄율 계산
-    crime_rate = pd.merge(crime_by_district[['구', '총범죄수']], 
-                         person_by_district[['구', '총인구', '외국인비율']], 
-                         on='구', 
-                         how='inner')
-    crime_rate['인구천명당범죄수'] = (crime_rate['총범죄수'] / (crime_rate['총인구'] / 1000)).round(2)
-    
-    #자치구 중심 좌표 가져오기
-    district_centers = get_district_centers()
-    
-    #서울시 중심 좌표로 지도 생성
-    seoul_map = folium.Map(location=[37.5665, 126.9780], 
-                          zoom_start=11,
-                          tiles='CartoDB positron')
-    
-    # 범죄율에 따른 히트맵 데이터 생성
-    heat_data = []
-    for _, row in crime_rate.iterrows():
-        if row['구'] in district_centers:
-            lat, lon = district_centers[row['구']]
-            # 범죄율을 가중치로 사용
-            weight = row['인구천명당범죄수']
-            heat_data.append([lat, lon, weight])
+def district_centers_frame():
+    """자치구 중심 좌표를 데이터프레임으로 반환 (구, 구코드, 위도, 경도)"""
+    return spatial.district_centers_frame()
+
+def to_point_collection(properties, lat, lon):
+    """속성 데이터프레임과 좌표 배열로 GeoJSON FeatureCollection 생성"""
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [x, y]},
+            'properties': props,
+        }
+        for x, y, props in zip(lon.tolist(), lat.tolist(), properties.to_dict('records'))
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+def add_crime_choropleth(seoul_map, map_data, geojson):
+    """단순화한 구 경계에 범죄율을 결합해 GeoJSON 레이어 하나로 추가"""
+    rates = map_data.set_index('구코드')
+    colormap = cm.LinearColormap(['blue', 'lime', 'yellow', 'red'], index=None,
+                                 vmin=rates['인구천명당범죄수'].min(), vmax=rates['인구천명당범죄수'].max(),
+                                 caption='인구 1,000명당 범죄수')
+    
+    #색과 툴팁 문자열은 미리 속성에 넣어 두어 지도에는 속성만 담기도록 함
+    features = []
+    for feature in geojson['features']:
+        code = feature['properties']['구코드']
+        if code not in rates.index:
+            continue
+        row = rates.loc[code]
+        properties = dict(feature['properties'],
+                          총범죄수=f"{int(row['총범죄수']):,}건",
+                          인구천명당범죄수=f"{row['인구천명당범죄수']}건",
+                          외국인비율=f"{row['외국인비율']}%",
+                          fill=colormap(row['인구천명당범죄수']))
+        features.append(dict(feature, properties=properties))
+    
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        name='범죄율',
+        style_function=lambda feature: {'fillColor': feature['properties']['fill'],
+                                        'fillOpacity': 0.6, 'color': 'grey', 'weight': 1},
+        tooltip=folium.GeoJsonTooltip(fields=['구', '총범죄수', '인구천명당범죄수', '외국인비율'],
+                                      aliases=['자치구', '총 범죄수', '인구 1,000명당 범죄수', '외국인 비율']),
+    ).add_to(seoul_map)
+    colormap.add_to(seoul_map)
+
+def add_crime_heatmap(seoul_map, map_data):
+    """구 중심 좌표에 범죄율을 가중치로 둔 히트맵 추가 (경계 파일이 없을 때)"""
+    # 범죄율을 가중치로 사용한 히트맵 데이터
+    heat_data = map_data[['위도', '경도', '인구천명당범죄수']].values.tolist()
     
     #히트맵 레이어 추가 (투명도)
     HeatMap(heat_data,
@@ -358,28 +223,64 @@ def visualize_crime_cctv_map(crime_df, cctv_df, person_df):
             max_zoom=1,
             min_opacity=0.6,  # 최소 투명도 증가
             max_opacity=1.0,  # 최대 투명도 증가
-            gradient={0.3: 'blue', 0.5: 'lime', 0.7: 'yellow', 1: 'red'}).add_to(seoul_map)
-    
-    #외국인 비율 정보를 팝업으로 표시
-    for _, row in crime_rate.iterrows():
-        if row['구'] in district_centers:
-            lat, lon = district_centers[row['구']]
-            #외국인 비율에 따라 원의 크기 조정
-            circle_radius = 5 + (row['외국인비율'] * 2)  # 외국인 비율이 높을수록 원이 커짐
-            
-            folium.Popup(
-                f"{row['구']}<br>"
-                f"총 범죄수: {row['총범죄수']}건<br>"
-                f"인구 1,000명당 범죄수: {row['인구천명당범죄수']}건<br>"
-                f"외국인 비율: {row['외국인비율']}%",
-                max_width=300
-            ).add_to(folium.CircleMarker(
-                location=[lat, lon],
-                radius=circle_radius,
-                color='purple',
-                fill=False,  # 색 채우기 제거
-                weight=2     # 테두리 두께 증가
-            ).add_to(seoul_map))
+            gradient={0.3: 'blue', 0.5: 'lime', 0.7: 'yellow', 1: 'red'},
+            name='범죄율').add_to(seoul_map)
+
+def visualize_crime_cctv_map(features, hotspots=None, mode='choropleth'):
+    """범죄 다발 지역과 외국인 비율을 지도에 시각화 (hotspots가 있으면 무단횡단 사고 히트맵 추가)
+    
+    mode='choropleth'이면 구 경계 파일(spatial.BOUNDARY_FILE)을 범죄율로 색칠하고,
+    경계 파일이 없거나 mode='heatmap'이면 구 중심 좌표 히트맵으로 표시한다.
+    """
+    geojson = spatial.simplified_geojson() if mode == 'choropleth' else None
+    if mode == 'choropleth' and geojson is None:
+        print(f"{spatial.BOUNDARY_FILE} 파일이 없어 구 중심 히트맵으로 표시합니다.")
+    
+    crime_rate = features.select(['구코드', '총범죄수', '총인구', '외국인비율', '인구천명당범죄수'])
+    
+    #자치구 중심 좌표와 구 코드로 한 번에 결합
+    centers = district_centers_frame().drop(columns='구')
+    map_data = pd.merge(crime_rate, centers, on='구코드', how='inner')
+    
+    #서울시 중심 좌표로 지도 생성
+    seoul_map = folium.Map(location=[37.5665, 126.9780], 
+                          zoom_start=11,
+                          tiles='CartoDB positron')
+    
+    if geojson is not None:
+        add_crime_choropleth(seoul_map, map_data, geojson)
+    else:
+        add_crime_heatmap(seoul_map, map_data)
+    
+    #무단횡단 사고 다발지점 (사고 건수를 가중치로 사용)
+    if hotspots is not None and len(hotspots) > 0:
+        HeatMap(hotspots.heat_data(),
+                radius=10,
+                blur=8,
+                min_opacity=0.4,
+                gradient={0.4: 'purple', 0.7: 'magenta', 1: 'white'},
+                name='무단횡단 사고 다발지점').add_to(seoul_map)
+    
+    #외국인 비율 정보를 팝업으로 표시 (구마다 마커를 만들지 않고 GeoJSON 레이어 하나로 추가)
+    popup_data = pd.DataFrame({
+        '구': map_data['구'],
+        '총범죄수': map_data['총범죄수'].astype('int64').astype(str) + '건',
+        '인구천명당범죄수': map_data['인구천명당범죄수'].astype(str) + '건',
+        '외국인비율': map_data['외국인비율'].astype(str) + '%',
+        #외국인 비율이 높을수록 원이 커짐
+        'radius': 5 + map_data['외국인비율'] * 2,
+    })
+    folium.GeoJson(
+        to_point_collection(popup_data, map_data['위도'], map_data['경도']),
+        name='외국인 비율',
+        marker=folium.CircleMarker(color='purple',
+                                   fill=False,  # 색 채우기 제거
+                                   weight=2),   # 테두리 두께 증가
+        style_function=lambda feature: {'radius': feature['properties']['radius']},
+        popup=folium.GeoJsonPopup(fields=['구', '총범죄수', '인구천명당범죄수', '외국인비율'],
+                                  aliases=['자치구', '총 범죄수', '인구 1,000명당 범죄수', '외국인 비율'],
+                                  max_width=300),
+    ).add_to(seoul_map)
     
     # 범례 추가
     legend_html = '''
@@ -390,30 +291,65 @@ def visualize_crime_cctv_map(crime_df, cctv_df, person_df):
                 padding: 10px;
                 ">
     <p><strong>범례</strong></p>
-    <p><span style="color: red;">■</span> 범죄 발생 (색이 진할수록 범죄율 높음)</p>
+    <p><span style="color: red;">■</span> 범죄 발생 (붉을수록 범죄율 높음)</p>
     <p><span style="color: purple;">○</span> 외국인 비율 (원이 클수록 외국인 비율 높음)</p>
     </div>
     '''
     seoul_map.get_root().html.add_child(folium.Element(legend_html))
+    if hotspots is not None and len(hotspots) > 0:
+        folium.LayerControl().add_to(seoul_map)
     
     seoul_map.save('seoul_crime_foreigner_map.html')
     print("\n지도가 'seoul_crime_foreigner_map.html' 파일로 저장되었습니다.")
 
 def main():
     """메인 함수"""
-    cctv_df, crime_df, estate_df, person_df = load_data()
-    
-    if any(df is None for df in [cctv_df, crime_df, estate_df, person_df]):
+    parser = argparse.ArgumentParser(description="서울시 자치구별 범죄/안전 지표 분석")
+    parser.add_argument('--stream', choices=['exact', 'sketch'],
+                        help="Estate.csv를 청크 단위로 집계 (sketch: 근사 중위가)")
+    parser.add_argument('--estate-files',
+                        help="Estate.csv 대신 사용할 월별 거래 파일 glob 패턴 (예: 'csv/실거래가_*.csv')")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="--estate-files 집계에 사용할 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--all', action='store_true',
+                        help="CCTV/부동산/범죄 유형/외국인 비율 분석 그림까지 모두 생성")
+    parser.add_argument('--map-mode', choices=['choropleth', 'heatmap'], default='choropleth',
+                        help=f"범죄율 지도 표시 방식 (choropleth는 {spatial.BOUNDARY_FILE} 구 경계 필요, 없으면 heatmap)")
+    parser.add_argument('--hotspots', nargs='?', const=HOTSPOT_FILES, default=None,
+                        help=f"무단횡단 크롤러 결과로 구별 사고 지표와 지도 레이어 추가 (기본: '{HOTSPOT_FILES}')")
+    render.add_arguments(parser)
+    args = parser.parse_args()
+    render.configure(args)
+    
+    features = DistrictFeatures.load(estate_stream=args.stream, estate_files=args.estate_files,
+                                     workers=args.workers)
+    
+    if features is None:
         print("일부 데이터를 로드하지 못했습니다. 프로그램을 종료합니다.")
         return
     
+    hotspots = HotspotStore.load(args.hotspots) if args.hotspots else None
+    if hotspots is not None:
+        features = features.with_hotspots(hotspots)
+    
+    if args.all:
+        print("\n=== 인구 1,000명당 CCTV 분석 ===")
+        analyze_cctv_per_capita(features)
+        print("\n=== 부동산 실거래가 분석 ===")
+        analyze_estate_prices(features)
+        print("\n=== 범죄 유형별 분석 ===")
+        analyze_crime_by_type(features)
+        print("\n=== 외국인 비율 분석 ===")
+        analyze_foreigner_ratio(features)
+    
     print("\n=== 범죄율과 부동산 가격의 관계 분석 ===")
-    all_indicators = analyze_all_indicators(cctv_df, crime_df, estate_df, person_df)
+    all_indicators = analyze_all_indicators(features)
     print("\n범죄율과 부동산 가격의 관계를 산점도로 확인했습니다.")
     
     print("\n=== 범죄 다발 지역과 외국인 비율을 지도에 시각화 ===")
-    visualize_crime_cctv_map(crime_df, cctv_df, person_df)
+    visualize_crime_cctv_map(features, hotspots, args.map_mode)
+    
+    render.finish()
 
 if __name__ == "__main__":
     main()
-
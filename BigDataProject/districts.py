@@ -0,0 +1,53 @@
+import pandas as pd
+
+#서울시 자치구 행정구역 코드 (행정표준코드 시군구 5자리)
+SEOUL_DISTRICT_CODES = {
+    '종로구': 11110, '중구': 11140, '용산구': 11170, '성동구': 11200, '광진구': 11215,
+    '동대문구': 11230, '중랑구': 11260, '성북구': 11290, '강북구': 11305, '도봉구': 11320,
+    '노원구': 11350, '은평구': 11380, '서대문구': 11410, '마포구': 11440, '양천구': 11470,
+    '강서구': 11500, '구로구': 11530, '금천구': 11545, '영등포구': 11560, '동작구': 11590,
+    '관악구': 11620, '서초구': 11650, '강남구': 11680, '송파구': 11710, '강동구': 11740,
+}
+DISTRICT_NAMES = {code: name for name, code in SEOUL_DISTRICT_CODES.items()}
+
+def _codes_for_names(names):
+    """표기가 제각각인 이름 목록을 구 코드로 변환 (고유값에만 적용)"""
+    names = names.astype(str).str.replace(r'\s+', '', regex=True)
+    names = names.str.replace(r'^서울(?:특별시|시)?', '', regex=True)
+    names = names.str.replace(r'청$', '', regex=True)
+
+    #'강남구청', '강남구역삼동' -> '강남구' / '서울강남' -> '강남' -> '강남구'
+    extracted = names.str.extract(r'^(\S+?구)', expand=False)
+    codes = extracted.map(SEOUL_DISTRICT_CODES)
+    codes = codes.fillna((names + '구').map(SEOUL_DISTRICT_CODES))
+    codes = codes.fillna(names.map(SEOUL_DISTRICT_CODES))
+    return codes.astype('Int32')
+
+def district_codes(values):
+    """구 이름(모든 표기)을 정수 구 코드로 변환 (인식하지 못한 값은 <NA>)
+
+    정규식은 고유한 이름에만 한 번씩 적용하고 결과를 category 코드로 펼친다.
+    """
+    values = pd.Series(values)
+    categories = values.astype('category')
+    unique_codes = _codes_for_names(pd.Series(categories.cat.categories)).to_numpy()
+    positions = categories.cat.codes.to_numpy()
+    codes = pd.array([pd.NA] * len(values), dtype='Int32')
+    matched = positions >= 0
+    codes[matched] = unique_codes[positions[matched]]
+    return pd.Series(codes, index=values.index, name='구코드')
+
+def district_names(codes):
+    """구 코드를 표준 구 이름으로 변환"""
+    return pd.Series(codes).map(DISTRICT_NAMES).rename('구')
+
+def canonical_names(values):
+    """구 이름을 표준 표기('강남구')로 통일"""
+    return district_names(district_codes(values))
+
+def report_unmatched(values, source):
+    """구 코드로 변환되지 않은 이름 출력 (병합에서 조용히 빠지는 구 확인용)"""
+    values = pd.Series(values)
+    unmatched = values[district_codes(values).isna()].dropna().unique()
+    if len(unmatched) > 0:
+        print(f"{source}: 구 이름을 인식하지 못한 값 {len(unmatched)}개 - {list(unmatched)[:10]}")
@@ -0,0 +1,141 @@
+import glob
+import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from loader import DATA_FILES, detect_encoding, to_numeric
+
+DISTRICT_COLUMN = '자치구명'
+PRICE_COLUMN = '물건금액(만원)'
+
+#한 번에 읽을 거래 건수
+CHUNK_SIZE = 100_000
+
+#근사 중위가 스케치의 상대 오차 (1%)
+SKETCH_ACCURACY = 0.01
+
+def histogram_medians(histogram, to_value=None):
+    """(그룹..., 값) 인덱스의 건수 히스토그램에서 그룹별 중위값 계산
+
+    누적합으로 가운데 위치를 찾으며, 짝수 건수는 가운데 두 값의 평균을 쓴다.
+    to_value는 히스토그램 키를 실제 값으로 바꾸는 함수 (기본: 키 그대로).
+    """
+    group_levels = list(range(histogram.index.nlevels - 1))
+    result = {}
+    for group, hist in histogram.groupby(level=group_levels):
+        hist = hist.droplevel(group_levels).sort_index()
+        keys = hist.index.to_numpy()
+        values = to_value(keys) if to_value is not None else keys.astype('float64')
+        cumulative = hist.to_numpy().cumsum()
+        n = cumulative[-1]
+        lower = values[np.searchsorted(cumulative, (n - 1) // 2, side='right')]
+        upper = values[np.searchsorted(cumulative, n // 2, side='right')]
+        result[group[0] if len(group) == 1 else group] = (lower + upper) / 2
+    if len(group_levels) > 1:
+        index = pd.MultiIndex.from_tuples(list(result), names=histogram.index.names[:-1])
+        return pd.Series(list(result.values()), index=index, dtype='float64')
+    return pd.Series(result, dtype='float64')
+
+class PriceAggregate:
+    """구별 거래금액 합계/건수와 중위가용 히스토그램 (파일/청크 단위로 병합 가능)
+
+    median='exact'이면 금액별 건수를, 'sketch'이면 로그 버킷별 건수를 저장한다.
+    어느 쪽이든 메모리는 거래 건수가 아니라 서로 다른 금액(버킷) 수에 비례한다.
+    """
+
+    def __init__(self, median='exact', accuracy=SKETCH_ACCURACY):
+        if median not in ('exact', 'sketch'):
+            raise ValueError(f"지원하지 않는 중위가 방식입니다: {median}")
+        self.median = median
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.sums = pd.Series(dtype='float64')
+        self.counts = pd.Series(dtype='int64')
+        self.histogram = pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays([[], []], names=['구', 'key']))
+
+    def _bucket(self, prices):
+        """금액을 히스토그램 키로 변환"""
+        if self.median == 'exact':
+            return prices
+        return np.ceil(np.log(prices.clip(lower=1)) / math.log(self.gamma)).astype('int64')
+
+    def _bucket_value(self, keys):
+        """히스토그램 키를 대표 금액으로 변환"""
+        if self.median == 'exact':
+            return keys.astype('float64')
+        return 2 * self.gamma ** keys / (self.gamma + 1)
+
+    def update(self, chunk):
+        """거래 데이터 청크 하나를 누적"""
+        prices = to_numeric(chunk[PRICE_COLUMN])
+        valid = prices.notna()
+        prices = prices[valid]
+        districts = chunk.loc[valid, DISTRICT_COLUMN].astype(str).str.strip().rename('구')
+
+        grouped = prices.groupby(districts)
+        self.sums = self.sums.add(grouped.sum(), fill_value=0)
+        self.counts = self.counts.add(grouped.size(), fill_value=0).astype('int64')
+
+        hist = prices.groupby([districts, self._bucket(prices).rename('key')]).size()
+        self.histogram = self.histogram.add(hist, fill_value=0).astype('int64')
+        return self
+
+    def merge(self, other):
+        """다른 집계 결과를 합산"""
+        if other.median != self.median or other.gamma != self.gamma:
+            raise ValueError("중위가 방식이 다른 집계는 합칠 수 없습니다.")
+        self.sums = self.sums.add(other.sums, fill_value=0)
+        self.counts = self.counts.add(other.counts, fill_value=0).astype('int64')
+        self.histogram = self.histogram.add(other.histogram, fill_value=0).astype('int64')
+        return self
+
+    def medians(self):
+        """구별 중위가 (sketch 모드는 버킷 대표값 기준 근사치)"""
+        return histogram_medians(self.histogram, self._bucket_value)
+
+    def result(self):
+        """features.estate_by_district와 같은 형태의 구별 요약"""
+        summary = pd.DataFrame({
+            '평균가': self.sums / self.counts,
+            '중위가': self.medians(),
+            '거래건수': self.counts,
+        })
+        summary.index.name = '구'
+        return summary.reset_index()
+
+def aggregate_estate_file(path=DATA_FILES['estate'], median='exact', chunksize=CHUNK_SIZE):
+    """거래 파일을 청크 단위로 읽어 구별 집계 (파일 크기와 무관하게 메모리 일정)"""
+    aggregate = PriceAggregate(median)
+    reader = pd.read_csv(path, encoding=detect_encoding(path),
+                         usecols=[DISTRICT_COLUMN, PRICE_COLUMN],
+                         dtype={DISTRICT_COLUMN: str, PRICE_COLUMN: str},
+                         chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            aggregate.update(chunk)
+    print(f"{path} 스트리밍 집계 완료 ({int(aggregate.counts.sum()):,}건)")
+    return aggregate
+
+def aggregate_estate_files(paths, median='exact', chunksize=CHUNK_SIZE, processes=None):
+    """여러 거래 파일(glob 패턴 또는 경로 목록)을 파일별로 병렬 집계한 뒤 병합
+
+    파일마다 프로세스 하나가 부분 집계를 만들고, 부분 집계를 경로 순서대로 합치므로
+    결과는 직렬 실행과 같다.
+    """
+    if isinstance(paths, str):
+        paths = glob.glob(paths)
+    paths = sorted(paths)
+    if not paths:
+        raise FileNotFoundError("집계할 거래 파일이 없습니다.")
+
+    if len(paths) == 1 or processes == 1:
+        partials = [aggregate_estate_file(path, median, chunksize) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            partials = list(pool.map(aggregate_estate_file, paths, repeat(median), repeat(chunksize)))
+
+    total = PriceAggregate(median)
+    for partial in partials:
+        total.merge(partial)
+    print(f"거래 파일 {len(paths)}개 집계 완료 ({int(total.counts.sum()):,}건)")
+    return total
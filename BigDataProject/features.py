@@ -0,0 +1,152 @@
+import glob
+import pandas as pd
+from loader import load_data, load_frame, data_fingerprint, cached_frame
+from estate import aggregate_estate_file, aggregate_estate_files
+from districts import district_codes, district_names, report_unmatched
+import price_index
+
+#범죄 유형 컬럼을 제외한 지표 컬럼
+BASE_COLUMNS = [
+    '구', '구코드', '총인구', '외국인수', '외국인비율',
+    '총범죄수', '카메라대수', '평균가', '중위가', '거래건수',
+    '인구천명당CCTV', '인구천명당범죄수',
+    '무단횡단다발지점수', '무단횡단사고건수', '무단횡단사상자수', '인구천명당무단횡단사고',
+    '매매지수', '매매지수전월비', '매매지수전년비', '매매지수3개월평균', '매매지수12개월평균',
+    '매매지수1개월전', '매매지수12개월전',
+]
+
+def person_by_district(person_df):
+    """인구 데이터에서 구별 행만 추출 (소계/헤더 반복 행 제외)"""
+    person = person_df[~person_df['동별(2)'].isin(['소계', '동별(2)'])]
+    person = person.rename(columns={
+        '동별(2)': '구',
+        '계 (명)': '총인구',
+        '등록외국인 (명)': '외국인수'
+    })[['구', '총인구', '외국인수']]
+    person['구'] = person['구'].astype(str)
+    person['외국인비율'] = (person['외국인수'] / person['총인구'] * 100).round(2)
+    return person
+
+def crime_by_district(crime_df):
+    """범죄 데이터를 구별 행으로 전치하고 총범죄수 계산"""
+    crime = crime_df.set_index('범죄대분류').T
+    crime.index = crime.index.astype(str).str.strip()
+    crime.index.name = '구'
+    crime.columns = crime.columns.astype(str)
+    crime['총범죄수'] = crime.sum(axis=1)
+    return crime.reset_index()
+
+def estate_by_district(estate_df):
+    """부동산 실거래가의 구별 평균가/중위가/거래건수"""
+    estate = estate_df.groupby('자치구명', observed=True)['물건금액(만원)'].agg(['mean', 'median', 'count'])
+    estate.columns = ['평균가', '중위가', '거래건수']
+    estate.index = estate.index.astype(str)
+    estate.index.name = '구'
+    return estate.reset_index()
+
+def with_district_code(frame, source):
+    """'구' 이름 컬럼을 정수 구 코드로 바꿔 병합 키로 사용"""
+    report_unmatched(frame['구'], source)
+    frame = frame.assign(구코드=district_codes(frame['구'].astype(str)).values)
+    return frame.dropna(subset=['구코드']).drop(columns='구')
+
+def build_district_table(cctv_df, crime_df, estate_summary, person_df):
+    """모든 지표를 구 단위로 병합한 테이블 생성 (estate_summary는 구별 평균가/중위가/거래건수)"""
+    #인구 데이터의 구 목록을 기준으로 구 코드로 병합 (지표가 없는 구는 NaN으로 남김)
+    table = with_district_code(person_by_district(person_df), '인구')
+    table = pd.merge(table, with_district_code(crime_by_district(crime_df), '범죄'), on='구코드', how='left')
+    table = pd.merge(table, with_district_code(cctv_df[['구', '카메라대수']], 'CCTV'), on='구코드', how='left')
+    table = pd.merge(table, with_district_code(estate_summary, '부동산'), on='구코드', how='left')
+    table.insert(0, '구', district_names(table['구코드']).values)
+
+    #인구 1000명당 지표
+    table['인구천명당CCTV'] = (table['카메라대수'] / (table['총인구'] / 1000)).round(2)
+    table['인구천명당범죄수'] = (table['총범죄수'] / (table['총인구'] / 1000)).round(2)
+    return table.sort_values('구').reset_index(drop=True)
+
+class DistrictFeatures:
+    """구 단위 통합 지표 테이블 (입력 파일 해시별로 한 번만 계산)"""
+    _memo = {}
+
+    def __init__(self, table):
+        self.table = table
+        self.crime_types = [c for c in table.columns if c not in BASE_COLUMNS]
+
+    @classmethod
+    def from_frames(cls, cctv_df, crime_df, estate_df, person_df):
+        """이미 로드된 데이터프레임으로 테이블 생성"""
+        return cls(build_district_table(cctv_df, crime_df, estate_by_district(estate_df), person_df))
+
+    @classmethod
+    def load(cls, estate_stream=None, estate_files=None, workers=None):
+        """입력 파일 해시가 같으면 메모리/디스크 캐시의 테이블을 재사용
+
+        estate_stream이 'exact' 또는 'sketch'이면 Estate.csv 전체를 올리지 않고
+        청크 단위로 집계한다 ('sketch'는 근사 중위가).
+        estate_files(glob 패턴)를 주면 Estate.csv 대신 월별 거래 파일들을
+        프로세스 풀(workers개)에서 파일별로 집계해 병합한다.
+        """
+        try:
+            if estate_files is None:
+                fingerprint = data_fingerprint()
+            else:
+                estate_paths = sorted(glob.glob(estate_files))
+                if not estate_paths:
+                    raise FileNotFoundError(f"'{estate_files}'에 해당하는 거래 파일이 없습니다.")
+                fingerprint = data_fingerprint(['cctv', 'crime', 'person'], estate_paths)
+        except FileNotFoundError as e:
+            print(f"데이터 로드 중 오류 발생: {e}")
+            return None
+
+        #정확한 집계는 전체 로드와 결과가 같으므로 캐시를 공유
+        name = 'district' if estate_files is None else 'district_files'
+        if estate_stream == 'sketch':
+            name += '_sketch'
+        if (name, fingerprint) in cls._memo:
+            return cls._memo[(name, fingerprint)]
+
+        def build():
+            if estate_files is not None:
+                cctv_df, crime_df, person_df = load_frame('cctv'), load_frame('crime'), load_frame('person')
+                estate_summary = aggregate_estate_files(estate_paths, median=estate_stream or 'exact',
+                                                        processes=workers).result()
+            elif estate_stream is None:
+                cctv_df, crime_df, estate_df, person_df = load_data()
+                if any(df is None for df in [cctv_df, crime_df, estate_df, person_df]):
+                    raise ValueError("일부 데이터를 로드하지 못했습니다.")
+                estate_summary = estate_by_district(estate_df)
+            else:
+                cctv_df, crime_df, person_df = load_frame('cctv'), load_frame('crime'), load_frame('person')
+                estate_summary = aggregate_estate_file(median=estate_stream).result()
+            return build_district_table(cctv_df, crime_df, estate_summary, person_df)
+
+        try:
+            features = cls(cached_frame(name, fingerprint, build))
+        except Exception as e:
+            print(f"데이터 로드 중 오류 발생: {e}")
+            return None
+        cls._memo[(name, fingerprint)] = features
+        return features
+
+    def with_hotspots(self, store):
+        """무단횡단 사고 다발지점(hotspots.HotspotStore)의 구별 집계를 붙인 새 테이블"""
+        summary = store.district_summary()
+        measures = [c for c in summary.columns if c != '구코드']
+        table = self.table.drop(columns=[c for c in measures if c in self.table.columns])
+        #수집 결과에 없는 구는 다발지점이 없는 것으로 봄
+        table = pd.merge(table, summary, on='구코드', how='left')
+        table[measures] = table[measures].fillna(0)
+        table['인구천명당무단횡단사고'] = (table['무단횡단사고건수'] / (table['총인구'] / 1000)).round(4)
+        return DistrictFeatures(table)
+
+    def with_price_index(self, panel, period=None):
+        """매매지수 패널(price_index.load_price_index)에서 한 달(기본: 마지막 달)의 구별 지표를 붙인 새 테이블"""
+        snapshot = price_index.snapshot(panel, period)
+        measures = [c for c in snapshot.columns if c != '구코드']
+        table = self.table.drop(columns=[c for c in measures if c in self.table.columns])
+        return DistrictFeatures(pd.merge(table, snapshot, on='구코드', how='left'))
+
+    def select(self, columns):
+        """필요한 컬럼이 모두 있는 구만 반환"""
+        columns = ['구'] + [c for c in columns if c != '구']
+        return self.table.dropna(subset=columns)[columns].reset_index(drop=True)
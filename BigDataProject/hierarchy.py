@@ -0,0 +1,152 @@
+import pandas as pd
+from estate import histogram_medians
+from features import BASE_COLUMNS, DistrictFeatures, crime_by_district
+from districts import SEOUL_DISTRICT_CODES, canonical_names
+
+#집계 단위 (상위 -> 하위)
+LEVELS = ['시', '구', '동']
+CITY_NAME = '서울특별시'
+
+#원본 파일에서 동 단위 정보가 들어 있는 컬럼
+PERSON_DONG_COLUMN = '동별(3)'
+ESTATE_DONG_COLUMN = '법정동명'
+
+def push_down(table, frame, keys):
+    """상위 단위로만 있는 합산 지표(frame)를 keys 단위 table 행에 인구 비례로 나눠 붙임
+
+    총인구가 없는 단위면 같은 상위 단위 행끼리 똑같이 나눈다. 나눈 값을 다시 합치면 원래
+    합계가 되고, 인구 천명당 지표는 상위 단위 값과 같아진다.
+    """
+    levels = list(frame.index.names)
+    finer = [name for name in keys if name not in levels]
+    if '총인구' in table.columns:
+        weight = table['총인구'].fillna(0)
+    else:
+        weight = pd.Series(1.0, index=table.index)
+    share = weight / weight.groupby(level=levels, observed=True).transform('sum')
+    values = frame.reindex(table.index.droplevel(finer))
+    values.index = table.index
+    return table.join(values.mul(share, axis=0))
+
+class HierarchicalFeatures:
+    """지표를 원본의 가장 세밀한 단위에서 한 번 합산해 두고 상위 단위로 롤업
+
+    각 원본(인구/범죄/CCTV/거래)은 제공되는 가장 세밀한 단위로 등록된다.
+    at(level)은 등록된 합산 지표를 groupby 합계로 올려서 비율 지표만 다시 계산하며,
+    원본보다 세밀한 단위에서는 상위 단위 합계를 인구 비례로 나눠 내려준다.
+    """
+
+    def __init__(self):
+        self.sources = []
+        self.price_histogram = None
+
+    def add(self, frame, levels):
+        """levels 컬럼과 합산 가능한 지표 컬럼으로 된 데이터 등록"""
+        frame = frame.copy()
+        frame['시'] = CITY_NAME
+        #원본마다 다른 구 표기를 표준 이름으로 통일 (인식하지 못한 행은 제외)
+        frame['구'] = canonical_names(frame['구'])
+        frame = frame.dropna(subset=['구'])
+        levels = ['시'] + [level for level in levels if level != '시']
+        measures = [c for c in frame.columns if c not in LEVELS]
+        self.sources.append((levels, frame.groupby(levels, observed=True)[measures].sum()))
+
+    def add_prices(self, estate_df, levels):
+        """거래 데이터를 (단위..., 금액) 건수 히스토그램으로 등록 (중위가 롤업용)"""
+        frame = estate_df.rename(columns={'자치구명': '구', ESTATE_DONG_COLUMN: '동'})
+        frame = frame.dropna(subset=['물건금액(만원)']).assign(시=CITY_NAME)
+        levels = ['시'] + levels
+        for level in levels:
+            frame[level] = frame[level].astype(str).str.strip()
+        frame['구'] = canonical_names(frame['구'])
+        self.price_histogram = frame.groupby(levels + ['물건금액(만원)'], observed=True).size()
+
+        prices = frame.groupby(levels, observed=True)['물건금액(만원)'].agg(['sum', 'count'])
+        prices.columns = ['거래금액합', '거래건수']
+        self.add(prices.reset_index(), levels)
+
+    @property
+    def finest_level(self):
+        """등록된 원본 중 가장 세밀한 단위"""
+        return max((levels[-1] for levels, _ in self.sources), key=LEVELS.index)
+
+    def at(self, level):
+        """level 단위 지표 테이블 (합산 지표는 groupby 합계, 비율 지표는 재계산)"""
+        keys = LEVELS[:LEVELS.index(level) + 1]
+        parts = [
+            frame.groupby(keys, observed=True).sum()
+            for levels, frame in self.sources
+            if set(keys) <= set(levels)
+        ]
+        table = pd.concat(parts, axis=1)
+        for levels, frame in self.sources:
+            if not set(keys) <= set(levels):
+                table = push_down(table, frame, keys)
+
+        if '거래건수' in table.columns:
+            table['평균가'] = table['거래금액합'] / table['거래건수']
+        if self.price_histogram is not None:
+            #거래가 더 거친 단위로만 있으면 상위 단위 중위가를 그대로 사용
+            shared = [name for name in keys if name in self.price_histogram.index.names]
+            drop = [name for name in self.price_histogram.index.names if name not in shared + ['물건금액(만원)']]
+            histogram = self.price_histogram.groupby(shared + ['물건금액(만원)'], observed=True).sum() \
+                if drop else self.price_histogram
+            medians = histogram_medians(histogram)
+            table['중위가'] = medians if shared == keys else \
+                medians.reindex(table.index.droplevel(keys[len(shared):])).to_numpy()
+        if '외국인수' in table.columns:
+            table['외국인비율'] = (table['외국인수'] / table['총인구'] * 100).round(2)
+        if '카메라대수' in table.columns:
+            table['인구천명당CCTV'] = (table['카메라대수'] / (table['총인구'] / 1000)).round(2)
+        if '총범죄수' in table.columns:
+            table['인구천명당범죄수'] = (table['총범죄수'] / (table['총인구'] / 1000)).round(2)
+        return table.reset_index()
+
+    def district_features(self, level='구'):
+        """level 단위 테이블을 DistrictFeatures로 감싸 기존 분석/그림 함수에 그대로 사용
+
+        동 단위에서는 '구' 컬럼에 '강남구 역삼동' 형태의 이름을 넣고, 소속 구는 '상위구'와
+        '구코드'에 남겨 구 단위 지도/병합에 그대로 쓸 수 있게 한다.
+        """
+        if LEVELS.index(level) > LEVELS.index(self.finest_level):
+            print(f"{level} 단위 데이터가 없어 {self.finest_level} 단위로 분석합니다.")
+            level = self.finest_level
+        table = self.at(level)
+        if '구' in table.columns:
+            table.insert(table.columns.get_loc('구') + 1, '구코드', table['구'].map(SEOUL_DISTRICT_CODES).astype('Int32'))
+        if level == '동':
+            table.insert(table.columns.get_loc('구') + 1, '상위구', table['구'])
+            table['구'] = table['구'] + ' ' + table['동']
+        table = table.drop(columns=[c for c in ['시', '동'] if c in table.columns])
+        columns = [c for c in ['구', '상위구'] + BASE_COLUMNS[1:] if c in table.columns]
+        columns += [c for c in table.columns if c not in columns and c != '거래금액합']
+        return DistrictFeatures(table[columns].sort_values('구').reset_index(drop=True))
+
+    @classmethod
+    def from_frames(cls, cctv_df, crime_df, estate_df, person_df):
+        """load_data() 결과로 계층 지표 생성 (동 단위 컬럼이 있으면 동까지 사용)"""
+        hierarchy = cls()
+
+        #인구: 동별(3)이 있으면 동 단위, 없으면 구 단위 행 사용 (소계/헤더 반복 행 제외)
+        person = person_df[~person_df['동별(2)'].isin(['소계', '동별(2)'])]
+        columns = {'동별(2)': '구', '계 (명)': '총인구', '등록외국인 (명)': '외국인수'}
+        levels = ['구']
+        if PERSON_DONG_COLUMN in person.columns:
+            person = person[~person[PERSON_DONG_COLUMN].isin(['소계', PERSON_DONG_COLUMN])]
+            columns[PERSON_DONG_COLUMN] = '동'
+            levels = ['구', '동']
+        person = person.rename(columns=columns)[levels + ['총인구', '외국인수']]
+        for level in levels:
+            person[level] = person[level].astype(str)
+        hierarchy.add(person, levels)
+
+        #범죄/CCTV: 구 단위로만 제공
+        hierarchy.add(crime_by_district(crime_df), ['구'])
+        cctv = cctv_df[['구', '카메라대수']].copy()
+        cctv['구'] = cctv['구'].astype(str)
+        hierarchy.add(cctv, ['구'])
+
+        #거래: 법정동명이 있으면 동 단위
+        estate_levels = ['구', '동'] if ESTATE_DONG_COLUMN in estate_df.columns else ['구']
+        hierarchy.add_prices(estate_df, estate_levels)
+        return hierarchy
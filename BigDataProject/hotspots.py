@@ -0,0 +1,163 @@
+import glob
+import json
+import numpy as np
+import pandas as pd
+from loader import read_csv, to_numeric
+from districts import district_codes
+from spatial import DistrictPolygons
+
+#무단횡단 크롤러(jaywalk copy.py) 결과 파일
+HOTSPOT_FILES = "무단횡단교통사고다발지역_*.ndjson"
+
+#격자 한 칸의 크기 (도, 서울 위도에서 약 1km)
+GRID_SIZE = 0.01
+
+#위도 1도의 거리 (km)
+KM_PER_DEGREE = 111.32
+
+def read_hotspot_file(path):
+    """크롤러 결과(NDJSON 또는 CSV) 한 파일을 좌표/건수 데이터프레임으로 읽기"""
+    if path.endswith('.ndjson'):
+        with open(path, encoding='utf-8') as f:
+            frame = pd.DataFrame([json.loads(line) for line in f])
+    else:
+        frame = read_csv(path)
+    columns = ['sido_sgg_nm', 'spot_nm', 'occrrnc_cnt', 'caslt_cnt', 'lo_crd', 'la_crd']
+    frame = frame.reindex(columns=columns + [c for c in ['searchYearCd'] if c in frame.columns])
+    for column in ['occrrnc_cnt', 'caslt_cnt', 'lo_crd', 'la_crd']:
+        frame[column] = to_numeric(frame[column].astype(str))
+    return frame.dropna(subset=['lo_crd', 'la_crd'])
+
+class HotspotStore:
+    """사고 다발지점 좌표를 NumPy 배열로 보관하고 격자 색인으로 위치 질의
+
+    지점은 격자 칸 번호 순으로 정렬해 두고 칸마다 [시작, 끝) 구간만 기억하므로
+    반경/최근접 질의는 주변 칸의 지점만 거리 계산한다.
+    """
+
+    def __init__(self, frame, grid_size=GRID_SIZE, polygons=None):
+        self.grid_size = grid_size
+        codes = district_codes(frame['sido_sgg_nm'].fillna('').astype(str)).to_numpy(dtype='float64', na_value=np.nan)
+        #구 이름이 없거나 인식되지 않는 지점은 경계 다각형으로 위치에서 구를 찾음
+        missing = np.isnan(codes)
+        if polygons is not None and missing.any():
+            located = polygons.assign(frame['lo_crd'].to_numpy()[missing], frame['la_crd'].to_numpy()[missing])
+            codes[missing] = located.to_numpy(dtype='float64', na_value=np.nan)
+        cells = self._cells(frame['lo_crd'].to_numpy(), frame['la_crd'].to_numpy())
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+
+        self.lon = frame['lo_crd'].to_numpy('float64')[order]
+        self.lat = frame['la_crd'].to_numpy('float64')[order]
+        self.accidents = np.nan_to_num(frame['occrrnc_cnt'].to_numpy('float64')[order])
+        self.casualties = np.nan_to_num(frame['caslt_cnt'].to_numpy('float64')[order])
+        self.district = np.nan_to_num(codes[order], nan=0).astype('int32')
+        self.names = frame['spot_nm'].to_numpy(dtype=object)[order]
+
+        #격자 칸별 지점 구간
+        cells = cells[order]
+        keys, starts, counts = np.unique(cells, axis=0, return_index=True, return_counts=True)
+        self.cell_index = {(x, y): (s, s + n) for (x, y), s, n in zip(keys.tolist(), starts.tolist(), counts.tolist())}
+        self.cell_bounds = (keys.min(axis=0).tolist() + keys.max(axis=0).tolist()) if len(keys) else [0, 0, 0, 0]
+
+        #구 코드별 지점 위치 (구 코드 순 정렬)
+        self.district_order = np.argsort(self.district, kind='stable')
+        self.district_keys, self.district_starts = np.unique(self.district[self.district_order], return_index=True)
+
+    def __len__(self):
+        return len(self.lon)
+
+    @classmethod
+    def load(cls, pattern=HOTSPOT_FILES):
+        """glob 패턴에 맞는 크롤러 결과를 모두 읽어 저장소 생성 (파일이 없으면 None)"""
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            print(f"'{pattern}'에 해당하는 무단횡단 사고 파일이 없습니다.")
+            return None
+        frame = pd.concat([read_hotspot_file(path) for path in paths], ignore_index=True)
+        store = cls(frame, polygons=DistrictPolygons.load())
+        print(f"무단횡단 사고 다발지점 {len(store):,}곳 로드 ({len(paths)}개 파일)")
+        return store
+
+    def _cells(self, lon, lat):
+        return np.stack([np.floor(np.asarray(lon) / self.grid_size),
+                         np.floor(np.asarray(lat) / self.grid_size)], axis=1).astype('int64')
+
+    def _distance_km(self, index, lon, lat):
+        #서울 범위에서는 위도 보정한 평면 거리로 충분
+        dx = (self.lon[index] - lon) * KM_PER_DEGREE * np.cos(np.radians(lat))
+        dy = (self.lat[index] - lat) * KM_PER_DEGREE
+        return np.hypot(dx, dy)
+
+    def _ring(self, cx, cy, r):
+        #(cx, cy)에서 체비셰프 거리 r인 칸(테두리)들에 있는 지점 인덱스
+        if r == 0:
+            cells = [(cx, cy)]
+        else:
+            cells = [(x, y) for x in range(cx - r, cx + r + 1) for y in (cy - r, cy + r)]
+            cells += [(x, y) for x in (cx - r, cx + r) for y in range(cy - r + 1, cy + r)]
+        spans = [self.cell_index[cell] for cell in cells if cell in self.cell_index]
+        if not spans:
+            return np.empty(0, dtype='int64')
+        return np.concatenate([np.arange(start, end) for start, end in spans])
+
+    def within_district(self, code):
+        """구 코드에 속한 지점 인덱스"""
+        i = np.searchsorted(self.district_keys, code)
+        if i == len(self.district_keys) or self.district_keys[i] != code:
+            return np.empty(0, dtype='int64')
+        end = self.district_starts[i + 1] if i + 1 < len(self.district_starts) else len(self.district_order)
+        return self.district_order[self.district_starts[i]:end]
+
+    def within_radius(self, lon, lat, km):
+        """(lon, lat)에서 km 안에 있는 지점 인덱스 (가까운 순)"""
+        (cx, cy), = self._cells([lon], [lat])
+        rings = int(np.ceil(km / (KM_PER_DEGREE * np.cos(np.radians(lat)) * self.grid_size)))
+        index = np.concatenate([self._ring(cx, cy, r) for r in range(rings + 1)])
+        distance = self._distance_km(index, lon, lat)
+        keep = distance <= km
+        return index[keep][np.argsort(distance[keep], kind='stable')]
+
+    def nearest(self, lon, lat, n=5):
+        """(lon, lat)에서 가장 가까운 지점 n곳의 (인덱스, 거리 km)
+
+        칸을 한 겹씩 넓혀 가다가 n곳을 찾았고, 다음 겹이 그보다 멀면 멈춘다.
+        """
+        n = min(n, len(self))
+        if n == 0:
+            return np.empty(0, dtype='int64'), np.empty(0)
+        (cx, cy), = self._cells([lon], [lat])
+        cell_km = KM_PER_DEGREE * np.cos(np.radians(lat)) * self.grid_size
+        found = []
+        r = 0
+        xmin, ymin, xmax, ymax = self.cell_bounds
+        max_ring = max(abs(cx - xmin), abs(cx - xmax), abs(cy - ymin), abs(cy - ymax))
+        while r <= max_ring:
+            found.append(self._ring(cx, cy, r))
+            index = np.concatenate(found)
+            if len(index) >= n:
+                distance = self._distance_km(index, lon, lat)
+                nth = np.partition(distance, n - 1)[n - 1]
+                #다음 겹의 칸은 최소 r * cell_km 떨어져 있음
+                if nth <= r * cell_km:
+                    break
+            r += 1
+        index = np.concatenate(found)
+        distance = self._distance_km(index, lon, lat)
+        order = np.argsort(distance, kind='stable')[:n]
+        return index[order], distance[order]
+
+    def district_summary(self):
+        """구별 사고 다발지점 수/사고 건수/사상자 수 (구 코드로 병합용)"""
+        known = self.district > 0
+        summary = pd.DataFrame({
+            '구코드': self.district[known],
+            '무단횡단다발지점수': 1,
+            '무단횡단사고건수': self.accidents[known],
+            '무단횡단사상자수': self.casualties[known],
+        }).groupby('구코드').sum().reset_index()
+        summary['구코드'] = summary['구코드'].astype('Int32')
+        return summary
+
+    def heat_data(self):
+        """folium HeatMap용 [위도, 경도, 사고 건수] 목록"""
+        return np.column_stack([self.lat, self.lon, self.accidents]).tolist()
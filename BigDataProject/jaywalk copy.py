@@ -1,33 +1,51 @@
 import os
 import sys
+import argparse
+import asyncio
 import urllib.request
 import datetime
 import time
 import json
-import pandas as pd
 from dotenv import load_dotenv
+from districts import SEOUL_DISTRICT_CODES
+from webcrawler import http_client
+from webcrawler.sink import RecordSink
 
 load_dotenv()
 ServiceKey = os.getenv("JAYWALK_KEY")
 
+#무단횡단 교통사고 API 주소 (테스트 서버로 바꿀 때는 JAYWALK_SERVICE_URL 지정)
+SERVICE_URL = os.getenv("JAYWALK_SERVICE_URL", 'http://apis.data.go.kr/B552061/jaywalking/getRestJaywalking')
+
+#서울 구별 시군구 코드 (행정구역 코드 뒤 3자리)
+SEOUL_GUGUN_CODES = {name: str(code)[2:] for name, code in SEOUL_DISTRICT_CODES.items()}
+
+#초당 요청 수 제한과 동시에 보낼 최대 요청 수
+REQUESTS_PER_SECOND = 5
+MAX_CONCURRENCY = 8
+NUM_OF_ROWS = 100
+
+#CSV로 저장할 컬럼
+COLUMNS = [
+    'searchYearCd', 'geom_json', 'afos_fid', 'afos_id', 'bjd_cd', 'spot_cd',
+    'sido_sgg_nm', 'spot_nm', 'occrrnc_cnt', 'caslt_cnt', 
+    'dth_dnv_cnt', 'se_dnv_cnt', 'sl_dnv_cnt', 'wnd_dnv_cnt', 
+    'lo_crd', 'la_crd'
+]
+
 def getRequestUrl(url):
-    req = urllib.request.Request(url)
     try:
-        response = urllib.request.urlopen(req)
-        if response.getcode() == 200:
-            print("[%s] Url Request Success" % datetime.datetime.now())
-            return response.read().decode('utf-8')
+        response = http_client.get(url)
+        print("[%s] Url Request Success" % datetime.datetime.now())
+        return response.decode('utf-8')
     except Exception as e:
         print(e)
         print("[%s] Error for URL : %s" % (datetime.datetime.now(), url))
         return None
 
 #API 호출
-def getPedestrianAccidentData(searchYearCd, siDo, guGun, numOfRows, pageNo, dataType="json"):
-    #무단횡단 교통사고 API
-    service_url = 'http://apis.data.go.kr/B552061/jaywalking/getRestJaywalking'
-
-    parameters = "?type=" + dataType + "&serviceKey=" + ServiceKey
+def getPedestrianAccidentData(searchYearCd, siDo, guGun, numOfRows, pageNo, dataType="json", service_url=SERVICE_URL):
+    parameters = "?type=" + dataType + "&serviceKey=" + str(ServiceKey)
     parameters += "&searchYearCd=" + str(searchYearCd)
     parameters += "&siDo=" + str(siDo)
     parameters += "&guGun=" + str(guGun)
@@ -42,99 +60,166 @@ def getPedestrianAccidentData(searchYearCd, siDo, guGun, numOfRows, pageNo, data
         return None
     else:
         try:
-            return json.loads(retData)
+            jsonData = json.loads(retData)
+            #오류 응답은 캐시에 남기지 않음
+            if jsonData.get('response', {}).get('header', {}).get('resultCode') != '0000':
+                http_client.forget(url)
+            return jsonData
         except json.JSONDecodeError as e:
+            http_client.forget(url)
             print(f"[{datetime.datetime.now()}] JSON 디코딩 오류 발생:")
             print(f"오류 메시지: {e}")
             print(f"수신된 데이터 (일부): {retData[:500]}...") # 처음 500자만 출력 확인
             print("데이터가 JSON 형식이 아니거나 비어있습니다.")
             return None
 
+class TokenBucket:
+    #초당 rate개씩 토큰이 차는 버킷 (최대 capacity개까지 몰아서 요청 가능)
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def parsePage(jsonData, guGun_code):
+    #응답에서 (items, totalCount) 추출, 데이터가 없으면 ([], 0), 오류면 None
+    if jsonData is None:
+        print("데이터를 가져오는 중 오류가 발생했습니다. 다음 구로 넘어갑니다.")
+        return None
+    if not ('response' in jsonData and 'header' in jsonData['response'] and 'body' in jsonData['response']):
+        print(f"예상치 못한 API 응답 구조입니다 for {guGun_code} 구.")
+        print(json.dumps(jsonData, indent=4, ensure_ascii=False))
+        return None
+
+    header = jsonData['response']['header']
+    body = jsonData['response']['body']
+    resultCode = header.get('resultCode')
+    resultMsg = header.get('resultMsg')
+
+    if resultCode != '0000': #resultCode가 0000이 아님
+        print(f"API 호출 실패 for {guGun_code} 구: [{resultCode}] {resultMsg}")
+        return None
+    #totalCount가 0이거나 items.item이 비어있는지 먼저 확인
+    if body.get('totalCount', 0) == 0 or not (body.get('items') and body['items'].get('item')):
+        print(f"{guGun_code} 구에 해당 연도의 데이터가 없습니다.")
+        return [], 0
+
+    items = body['items']['item']
+    if isinstance(items, dict):
+        items = [items]
+    return items, int(body.get('totalCount', 0))
+
+async def collectDistrict(fetchPage, searchYearCd, siDo, guGun_code, numOfRows=NUM_OF_ROWS):
+    #첫 페이지의 totalCount로 나머지 페이지를 한꺼번에 요청하고 페이지 순서대로 반환
+    #한 페이지라도 실패하면 None (다음 실행에서 이 구를 다시 수집)
+    print(f"\n--- {searchYearCd}년 {siDo} 시도 코드, {guGun_code} 시군구 코드 데이터 수집 중 ---")
+    first = parsePage(await fetchPage(searchYearCd, siDo, guGun_code, numOfRows, 1), guGun_code)
+    if first is None:
+        return None
+    items, totalCount = first
+
+    lastPage = -(-totalCount // numOfRows)
+    pages = await asyncio.gather(*(fetchPage(searchYearCd, siDo, guGun_code, numOfRows, pageNo)
+                                   for pageNo in range(2, lastPage + 1)))
+    for jsonData in pages:
+        page = parsePage(jsonData, guGun_code)
+        if page is None:
+            print(f"{searchYearCd}년 {guGun_code} 구의 일부 페이지를 받지 못했습니다.")
+            return None
+        items += page[0]
+
+    for item in items:
+        item['searchYearCd'] = searchYearCd
+        print(f"지점명: {item.get('spot_nm')}, 발생건수: {item.get('occrrnc_cnt')}, 사상자수: {item.get('caslt_cnt')}")
+    print(f"{searchYearCd}년 {guGun_code} 구의 모든 데이터를 가져왔습니다. ({len(items)}/{totalCount}건)")
+    return items
+
+async def collectPedestrianAccidents(years, siDo, target_guguns, sink=None, rate=REQUESTS_PER_SECOND,
+                                     concurrency=MAX_CONCURRENCY, service_url=SERVICE_URL):
+    #연도 x 구 조합을 동시에 수집 (요청 간격은 토큰 버킷, 동시 요청 수는 세마포어로 제한)
+    #sink를 주면 구가 끝나는 대로 파일에 쓰고 이미 끝난 구는 건너뛰며, 아니면 목록으로 반환
+    bucket = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetchPage(searchYearCd, siDo, guGun, numOfRows, pageNo):
+        async with semaphore:
+            await bucket.acquire()
+            return await asyncio.to_thread(getPedestrianAccidentData, searchYearCd, siDo, guGun,
+                                           numOfRows, pageNo, "json", service_url)
+
+    async def collect(year, guGun_code):
+        unit = f"{year}_{guGun_code}"
+        if sink is not None and unit in sink.done:
+            return []
+        items = await collectDistrict(fetchPage, year, siDo, guGun_code)
+        if sink is None or items is None:
+            return items or []
+        sink.write(unit, items)
+        return []
+
+    results = await asyncio.gather(*(collect(year, guGun_code)
+                                     for year in years for guGun_code in target_guguns))
+    return [item for items in results for item in items]
+
+def parseYears(text):
+    #'2019', '2019-2021', '2019,2021' 형태의 연도 입력
+    years = []
+    for part in text.split(','):
+        if '-' in part:
+            startYear, endYear = part.split('-')
+            years += range(int(startYear), int(endYear) + 1)
+        else:
+            years.append(int(part))
+    return years
+
 def main():
-    jsonResult = []
-    
+    parser = argparse.ArgumentParser(description="무단횡단 교통사고 다발지역 정보 수집")
+    parser.add_argument('--resume', action='store_true',
+                        help="이전 실행에서 끝나지 않은 구만 이어서 수집")
+    parser.add_argument('--pretty-json', action='store_true',
+                        help="수집이 끝난 뒤 들여쓰기 JSON 파일도 생성")
+    args = parser.parse_args()
+
     print("<< 한국도로교통공단_무단횡단 교통사고 다발지역 정보를 수집합니다. >>")
-    searchYearCd = int(input("조회하고자 하는 연도를 입력해주세요 (예: 2015): "))
+    yearInput = input("조회하고자 하는 연도를 입력해주세요 (예: 2015 / 2015-2017 / 2015,2017): ").strip()
+    years = parseYears(yearInput)
     siDo_input = input("시도 코드를 입력해주세요 (서울: 11 / 부산: 26 등, '서울' 입력 시 모든 구 조회): ")
 
     if siDo_input == "11" or siDo_input.lower() == "서울":
         siDo = "11"
-        target_guguns = SEOUL_GUGUN_CODES.values() 
+        target_guguns = list(SEOUL_GUGUN_CODES.values())
         print(f"서울특별시의 모든 구에 대한 데이터를 수집합니다.")
     else:
         siDo = siDo_input
         guGun = input("시군구 코드를 입력해주세요 (해당 시도의 시군구 코드 입력): ")
-        target_guguns = [guGun] 
-
-    numOfRows = 100 
-    
-    for guGun_code in target_guguns:
-        print(f"\n--- {siDo} 시도 코드, {guGun_code} 시군구 코드 데이터 수집 중 ---")
-        pageNo = 1      
-
-        while True:
-            jsonData = getPedestrianAccidentData(searchYearCd, siDo, guGun_code, numOfRows, pageNo)
-            
-            if jsonData is None:
-                print("데이터를 가져오는 중 오류가 발생했습니다. 다음 구로 넘어갑니다.")
-                break
-            if 'response' in jsonData and 'header' in jsonData['response'] and 'body' in jsonData['response']:
-                header = jsonData['response']['header']
-                body = jsonData['response']['body']
-
-                resultCode = header.get('resultCode')
-                resultMsg = header.get('resultMsg')
-
-                if resultCode == '0000': #API 호출 성공 (데이터가 있을 수도 있고 없을 수도 있음)
-                    #totalCount가 0이거나 items.item이 비어있는지 먼저 확인
-                    if body.get('totalCount', 0) == 0 or not (body.get('items') and body['items'].get('item')):
-                        print(f"{guGun_code} 구에 해당 연도의 데이터가 없습니다.")
-                        break #현재 구에 대한 데이터 수집 중단하고 다음 구로 넘어감
-                    else:
-                        items = body['items']['item']
-                        if isinstance(items, dict):
-                            items = [items]
-
-                        for item in items:
-                            jsonResult.append(item)
-                            print(f"지점명: {item.get('spot_nm')}, 발생건수: {item.get('occrrnc_cnt')}, 사상자수: {item.get('caslt_cnt')}")
-
-                        totalCount = body.get('totalCount', 0)
-                        if (pageNo * numOfRows) < totalCount:
-                            pageNo += 1
-                            time.sleep(1)
-                        else:
-                            print(f"{guGun_code} 구의 모든 데이터를 가져왔습니다.")
-                            break
-                else: #resultCode가 0000이 아님
-                    print(f"API 호출 실패 for {guGun_code} 구: [{resultCode}] {resultMsg}")
-                    break
-            else:
-                print(f"예상치 못한 API 응답 구조입니다 for {guGun_code} 구.")
-                print(json.dumps(jsonData, indent=4, ensure_ascii=False))
-                break
-
-    if jsonResult:
-        filename_json = f'./무단횡단교통사고다발지역_{searchYearCd}_{siDo_input}_전체구.json'
-        with open(filename_json, 'w', encoding='utf8') as outfile:
-            jsonFile = json.dumps(jsonResult, indent=4, sort_keys=True, ensure_ascii=False)
-            outfile.write(jsonFile)
-        print(f"\nJSON 파일 저장 완료: {filename_json}")
-
-        columns = [
-            'geom_json', 'afos_fid', 'afos_id', 'bjd_cd', 'spot_cd', 
-            'sido_sgg_nm', 'spot_nm', 'occrrnc_cnt', 'caslt_cnt', 
-            'dth_dnv_cnt', 'se_dnv_cnt', 'sl_dnv_cnt', 'wnd_dnv_cnt', 
-            'lo_crd', 'la_crd'
-        ]
-        result_df = pd.DataFrame(jsonResult)
-        result_df = result_df[[col for col in columns if col in result_df.columns]]
-        
-        filename_csv = f'./무단횡단교통사고다발지역_{searchYearCd}_{siDo_input}_전체구.csv'
-        result_df.to_csv(filename_csv, index=False, encoding='cp949')
-        print(f"CSV 파일 저장 완료: {filename_csv}")
-    else:
-        print("수집된 데이터가 없습니다.")
+        target_guguns = [guGun]
+
+    searchYearCd = yearInput.replace(',', '_')
+    basename = f'./무단횡단교통사고다발지역_{searchYearCd}_{siDo_input}_전체구'
+
+    #구별로 수집이 끝나는 대로 NDJSON/CSV에 바로 기록
+    with RecordSink(basename, COLUMNS, csv_encoding='cp949', resume=args.resume) as sink:
+        asyncio.run(collectPedestrianAccidents(years, siDo, target_guguns, sink))
+
+        if sink.count:
+            print(f"\nNDJSON 파일 저장 완료: {sink.ndjson_path}")
+            print(f"CSV 파일 저장 완료: {sink.csv_path}")
+            if args.pretty_json:
+                sink.write_pretty_json(basename + '.json')
+        else:
+            print("수집된 데이터가 없습니다.")
 
 if __name__ == '__main__':
 
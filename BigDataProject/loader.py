@@ -0,0 +1,182 @@
+import codecs
+import hashlib
+import json
+import os
+import pandas as pd
+
+#pyarrow가 없으면 캐시 없이 CSV를 매번 파싱
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+#분석에 사용하는 데이터 파일
+DATA_FILES = {
+    'cctv': "CCTV.csv",
+    'crime': "Crime.csv",
+    'estate': "Estate.csv",
+    'person': "Person.csv",
+}
+
+#파일별 구 컬럼 (category 타입으로 변환)
+DISTRICT_COLUMNS = {
+    'cctv': '구',
+    'estate': '자치구명',
+    'person': '동별(2)',
+}
+
+#쉼표가 포함된 문자열로 저장된 숫자 컬럼
+NUMERIC_COLUMNS = {
+    'estate': ['물건금액(만원)'],
+    'person': ['계 (명)', '등록외국인 (명)'],
+}
+
+#인코딩 판별에 사용할 앞부분 바이트 수
+SAMPLE_SIZE = 64 * 1024
+
+#전처리된 데이터프레임 캐시 (정제 로직이 바뀌면 CACHE_VERSION을 올릴 것)
+CACHE_DIR = ".cache"
+CACHE_VERSION = 2
+MANIFEST_FILE = os.path.join(CACHE_DIR, "manifest.json")
+
+def detect_encoding(path, sample_size=SAMPLE_SIZE):
+    """파일 앞부분 바이트로 인코딩 판별 (utf-8-sig / utf-8 / cp949)"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    #샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않도록 증분 디코더 사용
+    #cp949는 euc-kr의 상위 집합이므로 euc-kr 파일도 그대로 읽힘
+    for encoding in ('utf-8', 'cp949'):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"{path}: 인코딩을 판별할 수 없습니다. (utf-8/cp949 모두 디코딩 실패)")
+
+def read_csv(path, district_column=None, **kwargs):
+    """인코딩을 판별한 뒤 CSV를 한 번만 읽어 반환"""
+    encoding = detect_encoding(path)
+    df = pd.read_csv(path, encoding=encoding, **kwargs)
+    print(f"{path} 로드 성공 ({encoding.upper()})")
+
+    if district_column is not None and district_column in df.columns:
+        df[district_column] = df[district_column].astype('category')
+    return df
+
+def to_numeric(series):
+    """'1,234' 형태의 문자열 컬럼을 숫자로 변환"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    return pd.to_numeric(series.astype(str).str.replace(',', ''), errors='coerce')
+
+def clean_frame(name, df):
+    """NUMERIC_COLUMNS에 등록된 컬럼을 숫자형으로 정제"""
+    for column in NUMERIC_COLUMNS.get(name, []):
+        if column in df.columns:
+            df[column] = to_numeric(df[column])
+    return df
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _save_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+def file_fingerprint(path):
+    """파일 내용 해시 반환 (mtime/크기가 그대로면 저장된 해시를 재사용)"""
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    manifest = _load_manifest()
+    entry = manifest.get(key)
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+        return entry['sha1']
+
+    #수정된 파일만 전체를 읽어 해시 계산
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(block)
+    manifest[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1.hexdigest()}
+    _save_manifest(manifest)
+    return manifest[key]['sha1']
+
+def data_fingerprint(names=None, extra_paths=()):
+    """여러 입력 파일의 해시를 하나로 묶은 키 (extra_paths는 DATA_FILES 외 추가 파일)"""
+    names = list(DATA_FILES) if names is None else names
+    combined = hashlib.sha1(str(CACHE_VERSION).encode())
+    for name in names:
+        combined.update(name.encode())
+        combined.update(file_fingerprint(DATA_FILES[name]).encode())
+    for path in extra_paths:
+        combined.update(os.path.basename(path).encode())
+        combined.update(file_fingerprint(path).encode())
+    return combined.hexdigest()
+
+def _cache_path(name, fingerprint):
+    return os.path.join(CACHE_DIR, f"{name}-v{CACHE_VERSION}-{fingerprint[:16]}.feather")
+
+def _remove_stale_cache(name, keep_path):
+    """같은 데이터의 이전 버전 캐시 파일 삭제"""
+    prefix = f"{name}-v"
+    for filename in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, filename)
+        if filename.startswith(prefix) and filename.endswith(".feather") and path != keep_path:
+            os.remove(path)
+
+def cached_frame(name, fingerprint, build):
+    """fingerprint별로 build() 결과를 Feather 파일로 캐시 (메모리 맵으로 재사용)"""
+    if feather is None:
+        return build()
+
+    cache_path = _cache_path(name, fingerprint)
+    if os.path.exists(cache_path):
+        #메모리 맵으로 읽어 원본 크기와 무관하게 로드
+        df = feather.read_table(cache_path, memory_map=True).to_pandas()
+        print(f"{name} 캐시 로드 ({cache_path})")
+        return df
+
+    df = build()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, cache_path)
+        _remove_stale_cache(name, cache_path)
+    except Exception as e:
+        print(f"{name} 캐시 저장 실패: {e}")
+    return df
+
+def load_frame(name, use_cache=True):
+    """DATA_FILES에 등록된 데이터 하나를 정제된 상태로 로드 (Feather 캐시 사용)"""
+    path = DATA_FILES[name]
+
+    def build():
+        return clean_frame(name, read_csv(path, district_column=DISTRICT_COLUMNS.get(name)))
+
+    if not use_cache:
+        return build()
+    return cached_frame(name, file_fingerprint(path), build)
+
+def load_data(use_cache=True):
+    """CCTV, 범죄, 부동산, 인구 데이터 로드 (숫자 컬럼은 정제된 상태)"""
+    try:
+        cctv_df = load_frame('cctv', use_cache)
+        crime_df = load_frame('crime', use_cache)
+        estate_df = load_frame('estate', use_cache)
+        person_df = load_frame('person', use_cache)
+        return cctv_df, crime_df, estate_df, person_df
+    except Exception as e:
+        print(f"데이터 로드 중 오류 발생: {e}")
+        return None, None, None, None
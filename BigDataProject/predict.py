@@ -1,3 +1,5 @@
+import argparse
+import glob
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -7,106 +9,95 @@ from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from sklearn.pipeline import Pipeline
+from features import DistrictFeatures
+from districts import canonical_names
+from hierarchy import HierarchicalFeatures
+from loader import load_data, data_fingerprint, DATA_FILES
+from price_index import load_price_index
+import validation
+import scenarios
+import subset_search
+import stats
+from transactions import transaction_regression
+import render
 
 #한글 폰트 설정
 plt.rcParams['font.family'] = 'Malgun Gothic'
 plt.rcParams['axes.unicode_minus'] = False
 
-def load_data():
-    """데이터 로드 및 전처리 함수"""
-    try:
-        #CCTV 데이터 로드
-        try:
-            cctv_df = pd.read_csv("CCTV.csv", encoding='utf-8-sig')
-            print("CCTV.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                cctv_df = pd.read_csv("CCTV.csv", encoding='cp949')
-                print("CCTV.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                cctv_df = pd.read_csv("CCTV.csv", encoding='euc-kr')
-                print("CCTV.csv 로드 성공 (EUC-KR)")
-        
-        #범죄 데이터 로드
-        try:
-            crime_df = pd.read_csv("Crime.csv", encoding='utf-8-sig')
-            print("Crime.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                crime_df = pd.read_csv("Crime.csv", encoding='cp949')
-                print("Crime.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                crime_df = pd.read_csv("Crime.csv", encoding='euc-kr')
-                print("Crime.csv 로드 성공 (EUC-KR)")
-        
-        #부동산 데이터 로드
-        try:
-            estate_df = pd.read_csv("Estate.csv", encoding='utf-8-sig')
-            print("Estate.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                estate_df = pd.read_csv("Estate.csv", encoding='cp949')
-                print("Estate.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                estate_df = pd.read_csv("Estate.csv", encoding='euc-kr')
-                print("Estate.csv 로드 성공 (EUC-KR)")
-        
-        #인구 데이터 로드
-        try:
-            person_df = pd.read_csv("Person.csv", encoding='utf-8-sig')
-            print("Person.csv 로드 성공 (UTF-8-SIG)")
-        except UnicodeDecodeError:
-            try:
-                person_df = pd.read_csv("Person.csv", encoding='cp949')
-                print("Person.csv 로드 성공 (CP949)")
-            except UnicodeDecodeError:
-                person_df = pd.read_csv("Person.csv", encoding='euc-kr')
-                print("Person.csv 로드 성공 (EUC-KR)")
-        
-        return cctv_df, crime_df, estate_df, person_df
-    except Exception as e:
-        print(f"데이터 로드 중 오류 발생: {e}")
-        return None, None, None, None
-
-def prepare_data(cctv_df, crime_df, estate_df, person_df):
-    """회귀 분석을 위한 데이터 준비"""
-    #범죄 전처리
-    crime_by_district = crime_df.set_index('범죄대분류').T
-    crime_by_district.reset_index(inplace=True)
-    crime_by_district.rename(columns={'index': '구'}, inplace=True)
-    crime_types = crime_by_district.columns[1:]
-    crime_by_district['총범죄수'] = crime_by_district[crime_types].sum(axis=1)
-    
-    #인구 전처리
-    person_by_district = person_df[person_df['동별(2)'] != '소계'].copy()
-    person_by_district = person_by_district[person_by_district['동별(2)'] != '동별(2)'].copy()
-    person_by_district.rename(columns={
-        '동별(2)': '구',
-        '계 (명)': '총인구',
-        '등록외국인 (명)': '외국인수'
-    }, inplace=True)
-    person_by_district['총인구'] = pd.to_numeric(person_by_district['총인구'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인수'] = pd.to_numeric(person_by_district['외국인수'].str.replace(',', ''), errors='coerce')
-    person_by_district['외국인비율'] = (person_by_district['외국인수'] / person_by_district['총인구'] * 100).round(2)
-    
-    #부동산 전처리
-    estate_df['물건금액(만원)'] = pd.to_numeric(estate_df['물건금액(만원)'].astype(str).str.replace(',', ''), errors='coerce')
-    estate_by_district = estate_df.groupby('자치구명')['물건금액(만원)'].mean().reset_index()
-    estate_by_district.rename(columns={'자치구명': '구'}, inplace=True)
-    
-    #모든 데이터 병합
-    merged_data = pd.merge(cctv_df[['구', '카메라대수']], crime_by_district[['구', '총범죄수']], on='구', how='inner')
-    merged_data = pd.merge(merged_data, estate_by_district, on='구', how='inner')
-    merged_data = pd.merge(merged_data, person_by_district[['구', '외국인비율']], on='구', how='inner')
-    
-    return merged_data
-
-def analyze_regression(data):
+#회귀 분석 기본 특성
+FEATURES = ['총범죄수', '외국인비율', '카메라대수']
+
+#거래 단위 회귀에 붙이는 구 지표를 만드는 원본 (누적 상태 파일과 비교)
+DISTRICT_SOURCES = ['cctv', 'crime', 'person']
+
+#--price-index로 추가하는 시계열 특성
+PRICE_INDEX_FEATURES = ['매매지수', '매매지수전년비', '매매지수12개월평균']
+
+def prepare_data(features, extra=()):
+    """회귀 분석을 위한 데이터 준비 (extra는 추가 특성 컬럼, 분석 단위에 없는 특성은 제외)"""
+    columns = ['카메라대수', '총범죄수', '외국인비율', *extra]
+    return features.select([c for c in columns if c in features.table.columns] + ['평균가'])
+
+def regressors(data, extra=()):
+    """data에 있는 특성 컬럼 목록 (기본 특성 + extra 순서)"""
+    return [c for c in [*FEATURES, *extra] if c in data.columns]
+
+def plot_coefficients(feature_importance):
+    """특성별 회귀 계수 막대그래프"""
+    plt.figure(figsize=(10, 6))
+    sns.barplot(data=feature_importance.sort_values('계수', ascending=False),
+                x='계수', y='특성')
+    plt.title('특성별 회귀 계수 (전체 구)')
+    plt.xlabel('회귀 계수')
+    plt.ylabel('특성')
+    plt.tight_layout()
+
+def plot_prediction(y_test, y_pred):
+    """실제값 vs 예측값 산점도"""
+    plt.figure(figsize=(10, 6))
+    plt.scatter(y_test, y_pred, alpha=0.5)
+    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--', lw=2)
+    plt.title('실제값 vs 예측값 (전체 구)')
+    plt.xlabel('실제 아파트 가격 (만원)')
+    plt.ylabel('예측 아파트 가격 (만원)')
+    plt.tight_layout()
+
+def plot_correlation(correlation, labels=None):
+    """변수 간 상관관계 히트맵 (labels가 있으면 칸마다 유의성 표시와 신뢰구간)"""
+    plt.figure(figsize=(8, 6) if labels is None else (10, 8))
+    sns.heatmap(correlation, 
+                annot=True if labels is None else labels, 
+                cmap='coolwarm', 
+                vmin=-1, 
+                vmax=1,
+                fmt='.2f' if labels is None else '',
+                annot_kws=None if labels is None else {'fontsize': 8})
+    if labels is None:
+        plt.title('변수 간 상관관계')
+    else:
+        plt.title('변수 간 상관관계 (* p<0.05, ** p<0.01, *** p<0.001, [95% 신뢰구간])')
+    plt.tight_layout()
+
+def report_cross_validation(X, y, folds=validation.FOLDS, repeats=validation.REPEATS):
+    """LOO와 반복 k-겹 교차 검증 지표 출력 (분할 하나에 좌우되지 않는 평가)"""
+    summary = validation.cross_validate(X, y, folds, repeats)
+    print("\n=== 교차 검증 결과 ===")
+    for method, row in summary.iterrows():
+        if pd.isna(row.get('MSE 표준편차')):
+            print(f"{method}: MSE {row['MSE']:,.2f}, MAE {row['MAE']:,.2f}, R² {row['R²']:.4f}")
+        else:
+            print(f"{method}: MSE {row['MSE']:,.2f} (±{row['MSE 표준편차']:,.2f}), "
+                  f"MAE {row['MAE']:,.2f} (±{row['MAE 표준편차']:,.2f}), "
+                  f"R² {row['R²']:.4f} (±{row['R² 표준편차']:.4f})")
+    return summary
+
+def analyze_regression(data, extra=(), folds=validation.FOLDS, repeats=validation.REPEATS):
     """회귀 분석 수행"""
     #특성과 타겟 분리
-    features = ['총범죄수', '외국인비율', '카메라대수']
+    features = regressors(data, extra)
     X = data[features]
-    y = data['물건금액(만원)']
+    y = data['평균가']
     
     #파이프라인
     pipeline = Pipeline([
@@ -131,59 +122,191 @@ def analyze_regression(data):
     print(f"평균 절대 오차 (MAE): {mae:,.2f}")
     print(f"결정 계수 (R²): {r2:.4f}")
     
+    #테스트 5개 구에 좌우되지 않도록 전체 구로 교차 검증
+    report_cross_validation(X, y, folds, repeats)
+    
     #특성 중요도 시각화
-    plt.figure(figsize=(10, 6))
     feature_importance = pd.DataFrame({
         '특성': features,
         '계수': pipeline.named_steps['regressor'].coef_
     })
-    sns.barplot(data=feature_importance.sort_values('계수', ascending=False),
-                x='계수', y='특성')
-    plt.title('특성별 회귀 계수 (전체 구)')
-    plt.xlabel('회귀 계수')
-    plt.ylabel('특성')
-    plt.tight_layout()
-    plt.show()
+    render.show(plot_coefficients, '특성별 회귀 계수 (전체)', feature_importance)
     
     #실제값 vs 예측값
-    plt.figure(figsize=(10, 6))
-    plt.scatter(y_test, y_pred, alpha=0.5)
-    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'r--', lw=2)
-    plt.title('실제값 vs 예측값 (전체 구)')
-    plt.xlabel('실제 아파트 가격 (만원)')
-    plt.ylabel('예측 아파트 가격 (만원)')
-    plt.tight_layout()
-    plt.show()
+    render.show(plot_prediction, '실제 값 vs 예측 값', y_test, y_pred)
     
     return pipeline
 
+def analyze_scenarios(data, features, exclusions=(), feature_sets=(), sweep=None):
+    """구 제외/특성 조합 시나리오를 한 번에 적합하고 비교 그림 저장"""
+    cases = scenarios.make_scenarios(exclusions, feature_sets, features, sweep, data['구'].tolist())
+    summary, coefficients, predictions = scenarios.run_scenarios(data, cases)
+    
+    print(f"\n=== 시나리오 비교 ({len(cases)}개) ===")
+    shown = summary if len(summary) <= 20 else summary.sort_values('LOO R²').head(20)
+    print(shown.to_string(index=False, float_format=lambda v: f"{v:,.4f}"))
+    
+    #그림에는 앞쪽(직접 지정한) 시나리오만 패널로 표시
+    names = list(summary['시나리오'][:scenarios.MAX_PANELS])
+    render.show(scenarios.plot_scenario_coefficients, '특성별 회귀 계수 (시나리오 비교)',
+                coefficients[coefficients['시나리오'].isin(names)])
+    render.show(scenarios.plot_scenario_predictions, '실제 값 vs 예측 값 (시나리오 비교)',
+                predictions[predictions['시나리오'].isin(names)])
+    render.show(scenarios.plot_scenario_metrics, '시나리오별 결정 계수', summary)
+    return summary
+
+def check_scenario_arguments(data, exclusions=(), feature_sets=()):
+    """--exclude 구 이름과 --feature-set 컬럼이 데이터에 있는지 확인해 문제 설명 목록 반환"""
+    problems = []
+    names = [name.strip() for names in exclusions for name in names]
+    canonical = canonical_names(names)
+    unknown = [name for name, gu in zip(names, canonical) if pd.isna(gu) or gu not in set(data['구'])]
+    if unknown:
+        problems.append(f"--exclude: 분석 데이터에 없는 구 {unknown} (사용 가능: {', '.join(data['구'])})")
+    columns = [c for c in data.columns if c not in ('구', '평균가')]
+    missing = [name.strip() for names in feature_sets for name in names if name.strip() not in columns]
+    if missing:
+        problems.append(f"--feature-set: 없는 특성 {missing} (사용 가능: {', '.join(columns)})")
+    return problems
+
+def search_features(features, max_size, top=subset_search.TOP, processes=None):
+    """범죄 유형별 발생률과 지표의 모든 특성 조합을 LOO 오차로 평가해 순위표 출력"""
+    candidates = subset_search.candidate_table(features.table, features.crime_types)
+    print(f"\n=== 특성 조합 탐색 (최대 {max_size}개) ===")
+    leaderboard = subset_search.search_subsets(candidates, max_size, top=top, processes=processes)
+    print(leaderboard.to_string(float_format=lambda v: f"{v:,.4f}"))
+    return leaderboard
+
+def analyze_transactions(features, paths, fixed_effects=False, state_path=None):
+    """구 평균가 대신 거래 하나하나를 구 지표와 결합해 청크 단위로 회귀"""
+    print("\n=== 거래 단위 회귀 분석 ===")
+    model = transaction_regression(features.table, paths, FEATURES, fixed_effects, state_path,
+                                   district_fingerprint=data_fingerprint(DISTRICT_SOURCES))
+    summary = model.summary()
+    print(f"거래 수: {summary['거래 수']:,} (제외 {summary['제외 거래 수']:,})")
+    print(f"RMSE: {summary['RMSE']:,.2f}")
+    print(f"결정 계수 (R²): {summary['R²']:.4f}")
+    print(model.coefficients().to_string(float_format=lambda v: f"{v:,.4f}"))
+    return model
+
 def main():
     """메인 함수"""
-    cctv_df, crime_df, estate_df, person_df = load_data()
+    parser = argparse.ArgumentParser(description="서울시 자치구별 아파트 가격 회귀 분석")
+    parser.add_argument('--stream', choices=['exact', 'sketch'],
+                        help="Estate.csv를 청크 단위로 집계 (sketch: 근사 중위가)")
+    parser.add_argument('--estate-files',
+                        help="Estate.csv 대신 사용할 월별 거래 파일 glob 패턴 (예: 'csv/실거래가_*.csv')")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="--estate-files 집계에 사용할 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--level', choices=['구', '동'], default='구',
+                        help="회귀 분석 단위 (동: 원본에 동 단위 컬럼이 있을 때 동별 지표 사용)")
+    parser.add_argument('--price-index', nargs='?', const='latest', default=None, metavar='YYYYMM',
+                        help="아파트 매매지수 시계열 특성 추가 (기준 월, 생략하면 마지막 달)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='구,구',
+                        help="이 구들을 뺀 시나리오 추가 (쉼표로 여러 구, 옵션 반복 가능, 예: --exclude 강남)")
+    parser.add_argument('--feature-set', action='append', default=[], metavar='특성,특성',
+                        help="이 특성만 쓰는 시나리오 추가 (옵션 반복 가능)")
+    parser.add_argument('--sweep', choices=['single', 'pairs'],
+                        help="모든 한 구(single)/두 구(pairs) 제외 시나리오 추가")
+    parser.add_argument('--search', type=int, metavar='K',
+                        help="범죄 유형별 발생률/지표 중 최대 K개 특성 조합을 모두 교차 검증해 순위표 출력")
+    parser.add_argument('--search-top', type=int, default=subset_search.TOP,
+                        help=f"--search 순위표에 표시할 조합 수 (기본: {subset_search.TOP})")
+    parser.add_argument('--search-workers', type=int, default=None,
+                        help="--search에 사용할 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--permutations', type=int, default=stats.PERMUTATIONS,
+                        help=f"상관계수 순열 검정/부트스트랩 횟수 (기본: {stats.PERMUTATIONS})")
+    parser.add_argument('--transactions', action='store_true',
+                        help="거래 단위 회귀 추가 (Estate.csv 또는 --estate-files를 청크 단위로 누적)")
+    parser.add_argument('--fixed-effects', action='store_true',
+                        help="--transactions에서 구별 고정효과 사용 (거래 단위 특성이 있을 때 의미 있음)")
+    parser.add_argument('--model-state',
+                        help="--transactions 누적 상태 파일 (.npz, 있으면 이어서 새 파일만 누적)")
+    parser.add_argument('--folds', type=int, default=validation.FOLDS,
+                        help=f"반복 k-겹 교차 검증의 겹 수 (기본: {validation.FOLDS})")
+    parser.add_argument('--cv-repeats', type=int, default=validation.REPEATS,
+                        help=f"반복 k-겹 교차 검증 반복 횟수 (기본: {validation.REPEATS})")
+    render.add_arguments(parser)
+    args = parser.parse_args()
+    render.configure(args)
+    
+    if args.search is not None and args.search < 1:
+        print("--search는 1 이상이어야 합니다.")
+        return
+    if args.level != '구' and (args.stream or args.estate_files):
+        #동 단위 롤업은 원본 파일을 한 번에 읽어 합산하므로 청크/월별 파일 집계와 함께 쓸 수 없음
+        print("--stream/--estate-files는 구 단위 분석에서만 사용할 수 있습니다.")
+        return
+    
+    if args.level == '구':
+        features = DistrictFeatures.load(estate_stream=args.stream, estate_files=args.estate_files,
+                                         workers=args.workers)
+    else:
+        #동 단위 지표를 한 번 합산해 두고 필요한 단위로 롤업
+        frames = load_data()
+        features = None
+        if not any(df is None for df in frames):
+            features = HierarchicalFeatures.from_frames(*frames).district_features(args.level)
     
     #존재 여부 확인
-    if any(df is None for df in [cctv_df, crime_df, estate_df, person_df]):
+    if features is None:
         print("일부 데이터를 로드하지 못했습니다. 프로그램을 종료합니다.")
         return
     
+    extra = []
+    if args.price_index is not None:
+        if args.level != '구':
+            print("매매지수 특성은 구 단위 분석에서만 사용할 수 있습니다.")
+            return
+        period = None if args.price_index == 'latest' else args.price_index
+        try:
+            features = features.with_price_index(load_price_index(), period)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"매매지수 로드 중 오류 발생: {e}")
+            return
+        extra = PRICE_INDEX_FEATURES
+    
     print("\n=== 데이터 준비 중... ===")
-    merged_data = prepare_data(cctv_df, crime_df, estate_df, person_df)
+    merged_data = prepare_data(features, extra)
+    
+    exclusions = [names.split(',') for names in args.exclude]
+    feature_sets = [[name.strip() for name in names.split(',')] for names in args.feature_set]
+    problems = check_scenario_arguments(merged_data, exclusions, feature_sets)
+    if problems:
+        print("\n".join(problems))
+        return
     
     print("\n=== 회귀 분석 수행 중... ===")
-    model = analyze_regression(merged_data)
+    model = analyze_regression(merged_data, extra, args.folds, args.cv_repeats)
+    
+    if args.exclude or args.feature_set or args.sweep:
+        analyze_scenarios(merged_data, regressors(merged_data, extra), exclusions, feature_sets, args.sweep)
+    
+    if args.transactions:
+        if args.level != '구':
+            print("거래 단위 회귀는 구 단위 분석에서만 사용할 수 있습니다.")
+        else:
+            paths = sorted(glob.glob(args.estate_files)) if args.estate_files else [DATA_FILES['estate']]
+            try:
+                analyze_transactions(features, paths, args.fixed_effects, args.model_state)
+            except ValueError as e:
+                print(f"거래 단위 회귀 중 오류 발생: {e}")
+    
+    if args.search is not None:
+        search_features(features, args.search, args.search_top, args.search_workers)
     
     print("\n=== 변수 간 상관관계 분석 ===")
-    correlation = merged_data[['총범죄수', '외국인비율', '카메라대수', '물건금액(만원)']].corr()
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(correlation, 
-                annot=True, 
-                cmap='coolwarm', 
-                vmin=-1, 
-                vmax=1,
-                fmt='.2f')
-    plt.title('변수 간 상관관계')
-    plt.tight_layout()
-    plt.show()
+    #구 수가 적으므로 순열 검정 p값과 부트스트랩 신뢰구간을 함께 표시
+    report = stats.correlation_report(merged_data[regressors(merged_data, extra) + ['평균가']],
+                                      args.permutations, args.permutations)
+    correlation = report['상관계수']
+    for column in correlation.columns[:-1]:
+        print(f"{column} - 평균가: {correlation.loc[column, '평균가']:.2f} "
+              f"(p={report['p값'].loc[column, '평균가']:.4f}, "
+              f"95% CI [{report['하한'].loc[column, '평균가']:.2f}, {report['상한'].loc[column, '평균가']:.2f}])")
+    render.show(plot_correlation, '상관관계', correlation, stats.annotation_labels(report))
+    
+    render.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from loader import read_csv
+from districts import SEOUL_DISTRICT_CODES, district_codes
+
+#한국부동산원 아파트 매매가격지수 (월별, 2022년 1월~)
+PRICE_INDEX_FILE = "csv/(월) 지역별 매매지수_아파트.csv"
+
+#지수 파일의 서울 생활권역과 소속 자치구 (구 단위 행이 없으면 권역 지수를 소속 구에 적용)
+REGION_DISTRICTS = {
+    '도심권': ['종로구', '중구', '용산구'],
+    '동북권': ['성동구', '광진구', '동대문구', '중랑구', '성북구', '강북구', '도봉구', '노원구'],
+    '서북권': ['은평구', '서대문구', '마포구'],
+    '서남권': ['양천구', '강서구', '구로구', '금천구', '영등포구', '동작구', '관악구'],
+    '동남권': ['서초구', '강남구', '송파구', '강동구'],
+}
+
+#이동평균 기간과 시차 (개월)
+WINDOWS = (3, 12)
+LAGS = (1, 12)
+
+def read_price_index(path=PRICE_INDEX_FILE):
+    """'2022년 1월' 형태의 월 컬럼을 녹여 (지역, 기간 yyyymm int32, 지수 float32) 긴 패널로 읽기"""
+    #두 번째 헤더 행('지수')은 건너뛰고, 같은 이름의 '분류' 두 개 중 상세 분류를 지역으로 사용
+    wide = read_csv(path, skiprows=[1])
+    months = wide.columns.str.extract(r'^(\d{4})년\s*(\d{1,2})월$').astype('float64')
+    is_month = months[0].notna().to_numpy()
+    periods = (months[0] * 100 + months[1]).to_numpy()[is_month].astype('int32')
+
+    values = wide.loc[:, is_month].apply(pd.to_numeric, errors='coerce').to_numpy('float32')
+    region = wide.iloc[:, 2].astype(str).str.strip().to_numpy()
+    panel = pd.DataFrame({
+        '지역': np.repeat(region, len(periods)),
+        '기간': np.tile(periods, len(region)),
+        '지수': values.ravel(),
+    })
+    return panel.dropna(subset=['지수']).reset_index(drop=True)
+
+def district_panel(panel):
+    """지역 패널을 구 코드 패널로 변환 (구 행은 그대로, 권역 행은 소속 구마다 복제)"""
+    codes = district_codes(panel['지역'])
+    direct = panel.assign(구코드=codes.values).dropna(subset=['구코드'])
+
+    members = pd.DataFrame([(region, SEOUL_DISTRICT_CODES[name])
+                            for region, names in REGION_DISTRICTS.items() for name in names],
+                           columns=['지역', '구코드'])
+    #구 단위 지수가 있는 구는 권역 지수로 덮어쓰지 않음
+    members = members[~members['구코드'].isin(direct['구코드'])]
+    expanded = pd.merge(panel, members, on='지역', how='inner')
+
+    result = pd.concat([direct, expanded], ignore_index=True)
+    result['구코드'] = result['구코드'].astype('Int32')
+    result['지역'] = result['지역'].astype('category')
+    return result[['구코드', '지역', '기간', '지수']].sort_values(['구코드', '기간']).reset_index(drop=True)
+
+def _month_number(period):
+    return (period // 100) * 12 + period % 100 - 1
+
+def add_time_features(panel, windows=WINDOWS, lags=LAGS, key='구코드'):
+    """전월/전년 대비 변화율(%), 이동평균, 시차 지수를 한 번에 계산해 컬럼으로 추가
+
+    key별 시계열을 (key x 연속 월) 2차원 배열로 펼친 뒤 열 방향으로 밀고 누적합을 써서
+    모든 key를 한꺼번에 계산한다. 빠진 달은 NaN으로 두어 그 달을 거치는 변화율/이동평균도
+    NaN이 되며, 빠진 달은 그 달이 들어가는 창에만 영향을 준다.
+    """
+    month = _month_number(panel['기간'].to_numpy('int64'))
+    keys, row = np.unique(panel[key].to_numpy(), return_inverse=True)
+    first = month.min()
+    grid = np.full((len(keys), month.max() - first + 1), np.nan)
+    grid[row, month - first] = panel['지수'].to_numpy('float64')
+
+    def shifted(n):
+        out = np.full_like(grid, np.nan)
+        out[:, n:] = grid[:, :-n] if n else grid
+        return out
+
+    columns = {
+        '지수전월비': (grid / shifted(1) - 1) * 100,
+        '지수전년비': (grid / shifted(12) - 1) * 100,
+    }
+    #누적합 차이로 이동평균 (빠진 달은 0으로 더하고 창 안의 유효 월 수를 따로 세어
+    #창이 다 채워지지 않은 달만 NaN, NaN을 그대로 누적하면 이후 모든 달이 NaN이 됨)
+    valid = ~np.isnan(grid)
+    zeros = np.zeros((len(keys), 1))
+    cumulative = np.concatenate([zeros, np.cumsum(np.nan_to_num(grid), axis=1)], axis=1)
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+    for window in windows:
+        mean = np.full_like(grid, np.nan)
+        total = cumulative[:, window:] - cumulative[:, :-window]
+        count = counts[:, window:] - counts[:, :-window]
+        mean[:, window - 1:] = np.where(count == window, total / window, np.nan)
+        columns[f'지수{window}개월평균'] = mean
+    for lag in lags:
+        columns[f'지수{lag}개월전'] = shifted(lag)
+
+    result = panel.copy()
+    for name, values in columns.items():
+        result[name] = values[row, month - first].astype('float32')
+    return result
+
+def load_price_index(path=PRICE_INDEX_FILE):
+    """구 코드별 월별 지수 패널과 시계열 지표"""
+    return add_time_features(district_panel(read_price_index(path)))
+
+def snapshot(panel, period=None):
+    """한 달(기본: 마지막 달)의 구별 지표를 '매매' 접두어 컬럼으로 반환 (구 코드로 병합용)"""
+    period = int(panel['기간'].max()) if period is None else int(period)
+    rows = panel[panel['기간'] == period]
+    if rows.empty:
+        raise ValueError(f"{period} 기간의 매매지수가 없습니다.")
+    rows = rows.drop(columns=['지역', '기간']).set_index('구코드')
+    return rows.add_prefix('매매').reset_index()
@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import stats
 
 #한글 폰트 설정 (matplotlib에서 한글 깨짐 방지)
 plt.rcParams['font.family'] = 'Malgun Gothic' #윈도우 쓸 때
@@ -235,13 +236,15 @@ if '구' in cctv_df.columns and '구' in estate_by_district.columns and '구' in
     plt.show()
 
     #상관관계 분석
-    correlation_foreign_crime = merged_df['외국인비율'].corr(merged_df['인구만명당범죄율'])
-    correlation_foreign_cctv = merged_df['외국인비율'].corr(merged_df['카메라대수'])
-    correlation_crime_cctv = merged_df['인구만명당범죄율'].corr(merged_df['카메라대수'])
+    #상관계수 (순열 검정 p값, 부트스트랩 95% 신뢰구간)
+    report = stats.correlation_report(merged_df[['외국인비율', '인구만명당범죄율', '카메라대수']])
+    correlation_foreign_crime = stats.report_pair(report, '외국인비율', '인구만명당범죄율')
+    correlation_foreign_cctv = stats.report_pair(report, '외국인비율', '카메라대수')
+    correlation_crime_cctv = stats.report_pair(report, '인구만명당범죄율', '카메라대수')
     
-    print(f"\n외국인 비율과 인구 만명당 범죄율 간의 상관관계: {correlation_foreign_crime:.2f}")
-    print(f"외국인 비율과 CCTV 설치 수 간의 상관관계: {correlation_foreign_cctv:.2f}")
-    print(f"인구 만명당 범죄율과 CCTV 설치 수 간의 상관관계: {correlation_crime_cctv:.2f}")
+    print(f"\n외국인 비율과 인구 만명당 범죄율 간의 상관관계: {correlation_foreign_crime}")
+    print(f"외국인 비율과 CCTV 설치 수 간의 상관관계: {correlation_foreign_cctv}")
+    print(f"인구 만명당 범죄율과 CCTV 설치 수 간의 상관관계: {correlation_crime_cctv}")
 
     #외국인 비율 TOP 5
     print("\n--- 외국인 비율 상위 5개 구 ---")
@@ -262,8 +265,8 @@ else:
 print("\n--- 5-2. CCTV 설치 현황과 범죄율 비교 ---")
 
 #CCTV 설치 개수와 범죄 발생 간의 상관관계 분석
-correlation = merged_df['카메라대수'].corr(merged_df['총범죄수'])
-print(f"\nCCTV 설치 개수와 총 범죄 발생 건수 간의 상관관계: {correlation:.2f}")
+correlation = stats.pair_summary(merged_df['카메라대수'], merged_df['총범죄수'])
+print(f"\nCCTV 설치 개수와 총 범죄 발생 건수 간의 상관관계: {correlation}")
 
 plt.figure(figsize=(10, 7))
 sns.regplot(data=merged_df, x='카메라대수', y='총범죄수', scatter_kws={'alpha':0.6})
@@ -336,8 +339,8 @@ plt.show()
 #안전지표(범죄율, 교통사고)와의 상관관계 확인
 #아파트 중간 매매가와 총 범죄수 간의 상관관계
 if '아파트_중간매매가' in merged_df.columns and '총범죄수' in merged_df.columns:
-    correlation_estate_crime = merged_df['아파트_중간매매가'].corr(merged_df['총범죄수'])
-    print(f"\n아파트 중간 매매 가격과 총 범죄 건수 간의 상관관계: {correlation_estate_crime:.2f}")
+    correlation_estate_crime = stats.pair_summary(merged_df['아파트_중간매매가'], merged_df['총범죄수'])
+    print(f"\n아파트 중간 매매 가격과 총 범죄 건수 간의 상관관계: {correlation_estate_crime}")
 
     plt.figure(figsize=(10, 7))
     sns.regplot(data=merged_df, x='아파트_중간매매가', y='총범죄수', scatter_kws={'alpha':0.6})
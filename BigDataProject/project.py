@@ -1,6 +1,14 @@
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from loader import load_frame
+import render
+
+#--batch 옵션이면 창을 띄우지 않고 img/에 저장
+parser = argparse.ArgumentParser(description="서울 자치구별 CCTV 수와 범죄수 시각화")
+render.add_arguments(parser)
+render.configure(parser.parse_args())
 
 #한글 폰트 설정 (matplotlib에서 한글 깨짐 방지)
 plt.rcParams['font.family'] = 'Malgun Gothic' #윈도우 쓸 때
@@ -8,59 +16,16 @@ plt.rcParams['font.family'] = 'Malgun Gothic' #윈도우 쓸 때
 plt.rcParams['axes.unicode_minus'] = False #마이너스 기호 깨짐 방지
 
 #데이터 불러오기
-#인코딩 문제와 파일 경로 문제 해결 완
+#인코딩은 loader에서 판별하므로 파일마다 한 번만 읽음
 try:
-    cctv_df = pd.read_csv("CCTV.csv", encoding='utf-8-sig')
-    print("CCTV.csv 로드 성공 (UTF-8-SIG)")
-except UnicodeDecodeError:
-    try:
-        cctv_df = pd.read_csv("CCTV.csv", encoding='cp949')
-        print("CCTV.csv 로드 성공 (CP949)")
-    except UnicodeDecodeError:
-        print("CCTV.csv 로드 실패 (CP949), EUC-KR로 재시도...")
-        cctv_df = pd.read_csv("CCTV.csv", encoding='euc-kr')
-        print("CCTV.csv 로드 성공 (EUC-KR)")
-except FileNotFoundError:
-    print("Error: CCTV.csv 파일을 찾을 수 없습니다. 경로를 확인해주세요.")
+    cctv_df = load_frame('cctv')
+    crime_df = load_frame('crime')
+    estate_df = load_frame('estate')
+except FileNotFoundError as e:
+    print(f"Error: {e.filename} 파일을 찾을 수 없습니다. 경로를 확인해주세요.")
     exit() #파일이 없으면 프로그램 종료
 except Exception as e:
-    print(f"CCTV.csv 로드 중 예상치 못한 오류 발생: {e}")
-    exit()
-
-try:
-    crime_df = pd.read_csv("Crime.csv", encoding='utf-8-sig')
-    print("Crime.csv 로드 성공 (UTF-8-SIG)")
-except UnicodeDecodeError:
-    try:
-        crime_df = pd.read_csv("Crime.csv", encoding='cp949')
-        print("Crime.csv 로드 성공 (CP949)")
-    except UnicodeDecodeError:
-        print("Crime.csv 로드 실패 (CP949), EUC-KR로 재시도...")
-        crime_df = pd.read_csv("Crime.csv", encoding='euc-kr')
-        print("Crime.csv 로드 성공 (EUC-KR)")
-except FileNotFoundError:
-    print("Error: Crime.csv 파일을 찾을 수 없습니다. 경로를 확인해주세요.")
-    exit()
-except Exception as e:
-    print(f"Crime.csv 로드 중 예상치 못한 오류 발생: {e}")
-    exit()
-
-try:
-    estate_df = pd.read_csv("Estate.csv", encoding='utf-8-sig')
-    print("Estate.csv 로드 성공 (UTF-8-SIG)")
-except UnicodeDecodeError:
-    try:
-        estate_df = pd.read_csv("Estate.csv", encoding='cp949')
-        print("Estate.csv 로드 성공 (CP949)")
-    except UnicodeDecodeError:
-        print("Estate.csv 로드 실패 (CP949), EUC-KR로 재시도...")
-        estate_df = pd.read_csv("Estate.csv", encoding='euc-kr')
-        print("Estate.csv 로드 성공 (EUC-KR)")
-except FileNotFoundError:
-    print("Error: Estate.csv 파일을 찾을 수 없습니다. 경로를 확인해주세요.")
-    exit()
-except Exception as e:
-    print(f"Estate.csv 로드 중 예상치 못한 오류 발생: {e}")
+    print(f"데이터 로드 중 예상치 못한 오류 발생: {e}")
     exit()
 
 #각 데이터프레임의 상위 5행 출력 (데이터 로드 확인용)
@@ -73,7 +38,7 @@ print(estate_df.head())
 
 #부동산 평균 집계
 if '물건금액(만원)' in estate_df.columns and '자치구명' in estate_df.columns:
-    estate_grouped = estate_df.groupby('자치구명')['물건금액(만원)'].mean().reset_index()
+    estate_grouped = estate_df.groupby('자치구명', observed=True)['물건금액(만원)'].mean().reset_index()
     estate_grouped.columns = ['구', '평균부동산금액']
     print("\n--- Estate Grouped Head ---")
     print(estate_grouped.head())
@@ -129,7 +94,7 @@ if '구' in cctv_df.columns and '구' in crime_by_district.columns and '자치
         plt.ylabel('총 범죄 건수')
         plt.grid(True)
         plt.tight_layout()
-        plt.show()
+        render.show_current('CCTV 수와 총 범죄 발생 건수')
     else:
         print("Error: 시각화에 필요한 '카메라대수', '총범죄수', '물건금액(만원)' 컬럼 중 일부가 병합된 데이터프레임에 없습니다.")
         print("병합된 데이터프레임 컬럼: ", merged_df.columns.tolist())
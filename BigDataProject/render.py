@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import matplotlib.pyplot as plt
+
+#그림 저장 폴더 (기존 결과 이미지와 같은 위치)
+IMG_DIR = "img"
+
+_batch = False
+_img_dir = IMG_DIR
+_workers = None
+_pool = None
+_futures = []
+
+def add_arguments(parser):
+    """렌더링 관련 CLI 옵션 추가"""
+    parser.add_argument('--batch', action='store_true',
+                        help="창을 띄우지 않고 모든 그림을 이미지 파일로 병렬 저장")
+    parser.add_argument('--img-dir', default=IMG_DIR,
+                        help=f"--batch 모드에서 그림을 저장할 폴더 (기본: {IMG_DIR})")
+    parser.add_argument('--render-workers', type=int, default=None,
+                        help="--batch 모드에서 그림을 그릴 프로세스 수 (기본: CPU 코어 수)")
+
+def configure(args):
+    """add_arguments로 받은 옵션 적용"""
+    if args.batch:
+        set_batch_mode(args.img_dir, args.render_workers)
+
+def set_batch_mode(img_dir=IMG_DIR, workers=None):
+    """비대화형 백엔드로 전환하고 그림을 img_dir에 저장하도록 설정"""
+    global _batch, _img_dir, _workers
+    plt.switch_backend('Agg')
+    _batch = True
+    _img_dir = img_dir
+    _workers = workers
+    os.makedirs(img_dir, exist_ok=True)
+
+def _render(plot_func, args, path):
+    """워커 프로세스에서 그림 하나를 그려 파일로 저장"""
+    matplotlib.use('Agg', force=True)
+    plot_func(*args)
+    plt.savefig(path, dpi=100, bbox_inches='tight')
+    plt.close('all')
+    return path
+
+def show(plot_func, name, *args):
+    """plot_func(*args)로 그림 출력
+
+    대화형 모드에서는 바로 plt.show()로 띄우고, batch 모드에서는 워커 프로세스에
+    맡겨 '<img_dir>/<name>.png'로 저장한다. plot_func는 모듈 최상위 함수여야 한다.
+    """
+    global _pool
+    if not _batch:
+        plot_func(*args)
+        plt.show()
+        return
+
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_workers)
+    path = os.path.join(_img_dir, f"{name}.png")
+    _futures.append(_pool.submit(_render, plot_func, args, path))
+
+def show_current(name):
+    """현재 그림을 출력 (batch 모드에서는 같은 프로세스에서 바로 저장)
+
+    모듈 최상위에서 그림을 그리는 스크립트(project.py)처럼 워커에 넘길
+    함수가 없는 경우에 사용한다.
+    """
+    if not _batch:
+        plt.show()
+        return
+    path = os.path.join(_img_dir, f"{name}.png")
+    plt.savefig(path, dpi=100, bbox_inches='tight')
+    plt.close('all')
+    print(f"그림 저장 완료: {path}")
+
+def finish():
+    """batch 모드에서 제출된 그림이 모두 저장될 때까지 대기"""
+    global _pool
+    if _pool is None:
+        return
+    for future in _futures:
+        try:
+            print(f"그림 저장 완료: {future.result()}")
+        except Exception as e:
+            print(f"그림 저장 중 오류 발생: {e}")
+    _futures.clear()
+    _pool.shutdown()
+    _pool = None
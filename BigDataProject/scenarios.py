@@ -0,0 +1,177 @@
+from itertools import combinations
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from districts import canonical_names
+from validation import design_matrix
+
+#비교 그림에 패널로 그릴 최대 시나리오 수
+MAX_PANELS = 6
+
+#결정 계수 그림에 그릴 최대 시나리오 수 (넘으면 LOO R² 상위/하위만)
+MAX_METRIC_ROWS = 40
+
+def scenario_name(exclude, features=None, all_features=None):
+    """'강남 제외' 형태의 시나리오 이름 (특성 일부만 쓰면 특성 목록을 덧붙임)"""
+    #'강남구' -> '강남' (두 글자 구 이름 '중구'는 그대로)
+    short = [gu[:-1] if len(gu) > 2 and gu.endswith('구') else gu for gu in exclude]
+    name = '전체' if not exclude else ', '.join(short) + ' 제외'
+    if features is not None and list(features) != list(all_features):
+        name += ' / ' + '+'.join(features)
+    return name
+
+def make_scenarios(exclusions=(), feature_sets=(), all_features=(), sweep=None, districts=()):
+    """제외 구 집합 목록 x 특성 집합 목록의 시나리오 목록 [(이름, 제외 구, 특성), ...]
+
+    sweep이 'single'/'pairs'이면 districts의 모든 한 구/두 구 제외 조합을 추가한다.
+    """
+    exclusion_sets = [()] + [tuple(canonical_names(list(names)).dropna()) for names in exclusions]
+    if sweep == 'single':
+        exclusion_sets += [(gu,) for gu in districts]
+    elif sweep == 'pairs':
+        exclusion_sets += list(combinations(districts, 2))
+    feature_sets = [tuple(all_features)] + [tuple(f) for f in feature_sets]
+
+    #순서만 다른 같은 제외 집합은 한 번만
+    unique = {}
+    for exclude in exclusion_sets:
+        unique.setdefault(frozenset(exclude), exclude)
+
+    scenarios = []
+    for features in dict.fromkeys(feature_sets):
+        for exclude in unique.values():
+            scenarios.append((scenario_name(exclude, features, all_features), exclude, features))
+    return scenarios
+
+def _downdated_fits(A, y, Ginv, exclude_rows):
+    """AᵀA 역행렬 하나에서 제외 행들을 Woodbury 항등식으로 빼 모든 시나리오를 한꺼번에 적합
+
+    exclude_rows는 (시나리오 수, m) 정수 배열로, 같은 개수(m)의 행을 빼는 시나리오끼리 묶어 호출한다.
+    반환값: 계수 (B, p), 역행렬 (B, p, p)
+    """
+    batch = len(exclude_rows)
+    b = A.T @ y
+    if exclude_rows.shape[1] == 0:
+        return np.tile(Ginv @ b, (batch, 1)), np.tile(Ginv, (batch, 1, 1))
+
+    U = A[exclude_rows].transpose(0, 2, 1)             # (B, p, m)
+    K = Ginv @ U                                       # (B, p, m)
+    C = np.eye(U.shape[2]) - U.transpose(0, 2, 1) @ K  # (B, m, m)
+    #남은 행으로 계수를 정할 수 없는 시나리오는 최소 노름 해 사용
+    inverse = Ginv + K @ np.linalg.pinv(C) @ K.transpose(0, 2, 1)
+    rhs = b - (U @ y[exclude_rows][:, :, None])[:, :, 0]
+    beta = (inverse @ rhs[:, :, None])[:, :, 0]
+    return beta, inverse
+
+def run_scenarios(data, scenarios, target='평균가'):
+    """시나리오마다 계수와 지표 계산 (특성 집합별 AᵀA 분해 한 번, 제외는 저랭크 갱신)
+
+    반환값:
+      summary      시나리오별 학습 구 수, MSE, MAE, R², LOO R², 제외 구 MAE
+      coefficients 시나리오별 표준화 회귀 계수 (StandardScaler+LinearRegression의 coef_와 같은 값)
+      predictions  시나리오별 구 실제값/예측값 (제외 구는 학습에 쓰지 않은 예측)
+    """
+    districts = data['구'].astype(str).tolist()
+    position = {gu: i for i, gu in enumerate(districts)}
+    y = data[target].to_numpy('float64')
+    n = len(y)
+
+    summary, coefficients, predictions = [], [], []
+    by_features = {}
+    for index, (name, exclude, features) in enumerate(scenarios):
+        rows = tuple(position[gu] for gu in exclude if gu in position)
+        by_features.setdefault(tuple(features), {}).setdefault(len(rows), []).append((index, name, rows))
+
+    for features, by_size in by_features.items():
+        X = data[list(features)].to_numpy('float64')
+        A = design_matrix(X)
+        Ginv = np.linalg.pinv(A.T @ A)
+        for size, group in by_size.items():
+            indexes, names, rows = zip(*group)
+            exclude_rows = np.array(rows, dtype='int64').reshape(len(group), size)
+            beta, inverse = _downdated_fits(A, y, Ginv, exclude_rows)
+
+            kept = np.ones((len(group), n), dtype=bool)
+            np.put_along_axis(kept, exclude_rows, False, axis=1)
+            count = kept.sum(axis=1)
+            fitted = beta @ A.T
+            residual = np.where(kept, y - fitted, 0)
+            y_mean = (kept * y).sum(axis=1) / count
+            sst = (kept * (y - y_mean[:, None]) ** 2).sum(axis=1)
+            sse = (residual ** 2).sum(axis=1)
+
+            #학습 구의 hat 행렬 대각으로 시나리오별 LOO 잔차
+            leverage = np.einsum('ni,bij,nj->bn', A, inverse, A)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                press = np.where(kept, (residual / (1 - leverage)) ** 2, 0).sum(axis=1)
+                held_out = np.where(kept, 0, np.abs(y - fitted)).sum(axis=1) / (n - count)
+
+            #학습 구의 특성 표준편차를 곱하면 표준화 계수
+            X_mean = (kept @ X) / count[:, None]
+            X_std = np.sqrt((kept @ X ** 2) / count[:, None] - X_mean ** 2)
+            scaled = beta[:, 1:] * X_std
+
+            summary.append(pd.DataFrame({
+                '순서': indexes, '시나리오': names, '학습 구 수': count,
+                'MSE': sse / count, 'MAE': np.abs(residual).sum(axis=1) / count,
+                'R²': 1 - sse / sst, 'LOO R²': 1 - press / sst,
+                '제외 구 MAE': held_out if size else np.nan,
+            }))
+            p = len(features)
+            coefficients.append(pd.DataFrame({
+                '순서': np.repeat(indexes, p), '시나리오': np.repeat(names, p),
+                '특성': np.tile(features, len(group)), '계수': scaled.ravel(),
+            }))
+            predictions.append(pd.DataFrame({
+                '순서': np.repeat(indexes, n), '시나리오': np.repeat(names, n),
+                '구': np.tile(districts, len(group)), '실제값': np.tile(y, len(group)),
+                '예측값': fitted.ravel(), '학습': kept.ravel(),
+            }))
+
+    def ordered(frames):
+        frame = pd.concat(frames, ignore_index=True).sort_values('순서', kind='stable')
+        return frame.drop(columns='순서').reset_index(drop=True)
+
+    return ordered(summary), ordered(coefficients), ordered(predictions)
+
+def plot_scenario_coefficients(coefficients):
+    """시나리오별 표준화 회귀 계수 비교 막대그래프"""
+    plt.figure(figsize=(10, 6))
+    sns.barplot(data=coefficients, x='계수', y='특성', hue='시나리오')
+    plt.title('특성별 회귀 계수 (시나리오 비교)')
+    plt.xlabel('회귀 계수')
+    plt.ylabel('특성')
+    plt.tight_layout()
+
+def plot_scenario_predictions(predictions):
+    """시나리오별 실제값 vs 예측값 (x 표시는 학습에서 제외한 구)"""
+    names = list(dict.fromkeys(predictions['시나리오']))
+    fig, axes = plt.subplots(1, len(names), figsize=(5 * len(names), 5), squeeze=False, sharex=True, sharey=True)
+    low, high = predictions['실제값'].min(), predictions['실제값'].max()
+    for ax, name in zip(axes[0], names):
+        rows = predictions[predictions['시나리오'] == name]
+        train = rows[rows['학습']]
+        held = rows[~rows['학습']]
+        ax.scatter(train['실제값'], train['예측값'], alpha=0.5)
+        ax.scatter(held['실제값'], held['예측값'], marker='x', color='red', s=60)
+        for _, row in held.iterrows():
+            ax.annotate(row['구'], (row['실제값'], row['예측값']))
+        ax.plot([low, high], [low, high], 'r--', lw=2)
+        ax.set_title(f'실제값 vs 예측값 ({name})')
+        ax.set_xlabel('실제 아파트 가격 (만원)')
+    axes[0][0].set_ylabel('예측 아파트 가격 (만원)')
+    plt.tight_layout()
+
+def plot_scenario_metrics(summary):
+    """시나리오별 결정 계수 (학습/LOO, 많으면 LOO R² 상위/하위 시나리오만)"""
+    if len(summary) > MAX_METRIC_ROWS:
+        ranked = summary.sort_values('LOO R²', ascending=False)
+        summary = pd.concat([ranked.head(MAX_METRIC_ROWS // 2), ranked.tail(MAX_METRIC_ROWS // 2)])
+    data = summary.melt(id_vars='시나리오', value_vars=['R²', 'LOO R²'], var_name='지표', value_name='값')
+    plt.figure(figsize=(10, max(4, 0.3 * len(summary))))
+    sns.barplot(data=data, x='값', y='시나리오', hue='지표')
+    plt.title('시나리오별 결정 계수')
+    plt.xlabel('결정 계수')
+    plt.ylabel('')
+    plt.tight_layout()
@@ -0,0 +1,302 @@
+import os
+import math
+import json
+import numpy as np
+import pandas as pd
+from districts import DISTRICT_NAMES, district_codes
+from loader import CACHE_DIR, file_fingerprint
+
+#서울시 자치구 경계 GeoJSON (시군구 경계 파일을 이 경로에 두거나 SEOUL_BOUNDARY_FILE로 지정)
+#예: southkorea-maps의 seoul_municipalities_geo_simple.json, 통계청 SGIS 시군구 경계를 변환한 파일
+BOUNDARY_FILE = os.getenv("SEOUL_BOUNDARY_FILE", "csv/seoul_municipalities_geo.json")
+
+#경계 파일에서 구 이름이 들어 있을 수 있는 속성
+NAME_PROPERTIES = ['name', 'SIG_KOR_NM', 'sggnm', 'SGG_NM', 'adm_nm']
+
+#한 번에 판정할 (지점 x 경계선) 쌍의 최대 개수 (메모리 제한)
+MAX_PAIRS = 4_000_000
+
+#구마다 변을 나눠 담는 위도 띠의 수 (지점은 자기 띠에 걸친 변과만 비교)
+BANDS = 64
+
+#지도용 단순화 허용 오차 (도, 서울 위도에서 약 50m)
+SIMPLIFY_TOLERANCE = 0.0005
+
+#경계 파일이 없을 때 사용하는 자치구 중심 좌표 (위도, 경도)
+DISTRICT_CENTERS = {
+    '강남구': [37.517305, 127.047502],
+    '강동구': [37.549207, 127.145482],
+    '강북구': [37.639604, 127.025653],
+    '강서구': [37.550966, 126.849532],
+    '관악구': [37.478406, 126.951613],
+    '광진구': [37.538484, 127.082293],
+    '구로구': [37.495485, 126.887369],
+    '금천구': [37.456455, 126.895310],
+    '노원구': [37.654359, 127.056473],
+    '도봉구': [37.668773, 127.047152],
+    '동대문구': [37.574397, 127.039550],
+    '동작구': [37.512402, 126.939252],
+    '마포구': [37.563341, 126.908287],
+    '서대문구': [37.579116, 126.936778],
+    '서초구': [37.483664, 127.032411],
+    '성동구': [37.550600, 127.041000],
+    '성북구': [37.589116, 127.016778],
+    '송파구': [37.514402, 127.106252],
+    '양천구': [37.524700, 126.855500],
+    '영등포구': [37.526402, 126.896252],
+    '용산구': [37.531100, 126.981000],
+    '은평구': [37.602484, 126.929293],
+    '종로구': [37.572484, 126.977293],
+    '중구': [37.564484, 126.997293],
+    '중랑구': [37.606484, 127.092293]
+}
+
+def _polygons(geometry):
+    """Polygon/MultiPolygon geometry를 [외곽선, 구멍...] 좌표 배열 목록으로 변환"""
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return []
+    return [[np.asarray(ring, dtype='float64')[:, :2] for ring in polygon] for polygon in polygons]
+
+def _ring_area_centroid(ring):
+    """고리 하나의 넓이(절댓값)와 무게중심 (신발끈 공식)"""
+    x, y = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y2 - x2 * y
+    area = cross.sum() / 2
+    if area == 0:
+        return 0.0, x.mean(), y.mean()
+    cx = ((x + x2) * cross).sum() / (6 * area)
+    cy = ((y + y2) * cross).sum() / (6 * area)
+    return abs(area), cx, cy
+
+def _douglas_peucker(points, tolerance):
+    """양 끝점을 고정한 선분을 Douglas-Peucker로 단순화 (남길 점의 bool 마스크)"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        start, end = points[i], points[j]
+        inner = points[i + 1:j]
+        dx, dy = end - start
+        length = math.hypot(dx, dy)
+        if length == 0:
+            distance = np.hypot(*(inner - start).T)
+        else:
+            distance = np.abs(dx * (inner[:, 1] - start[1]) - dy * (inner[:, 0] - start[0])) / length
+        k = int(np.argmax(distance))
+        if distance[k] > tolerance:
+            keep[i + 1 + k] = True
+            stack += [(i, i + 1 + k), (i + 1 + k, j)]
+    return keep
+
+class DistrictPolygons:
+    """자치구 경계 다각형으로 좌표를 구에 배정하고 실제 무게중심 계산
+
+    구마다 모든 고리(외곽선과 구멍)의 변을 위도 띠별 배열로 펼쳐 두고, 지점 묶음을 경계
+    상자로 먼저 거른 뒤 같은 띠의 변과의 반직선 교차 횟수 홀짝으로 내부 여부를 판정한다.
+    """
+
+    def __init__(self, districts):
+        #districts: [(구 코드, [[외곽선, 구멍...], ...]), ...]
+        self.codes = []
+        self.polygons = []
+        self.edges = []
+        self.bounds = []
+        for code, polygons in districts:
+            rings = [ring for polygon in polygons for ring in polygon]
+            start = np.concatenate(rings)
+            end = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+            #수평인 변은 반직선과 교차하지 않으므로 제외
+            keep = start[:, 1] != end[:, 1]
+            x1, y1, x2, y2 = start[keep, 0], start[keep, 1], end[keep, 0], end[keep, 1]
+            slope, low, high = (x2 - x1) / (y2 - y1), np.minimum(y1, y2), np.maximum(y1, y2)
+            bounds = (start[:, 0].min(), start[:, 1].min(), start[:, 0].max(), start[:, 1].max())
+
+            #변이 걸친 위도 띠마다 그 변을 복사해 둠
+            bands = np.linspace(bounds[1], bounds[3], BANDS + 1)
+            first = np.clip(np.searchsorted(bands, low, side='right') - 1, 0, BANDS - 1)
+            last = np.clip(np.searchsorted(bands, high, side='right') - 1, 0, BANDS - 1)
+            band_edges = []
+            for band in range(BANDS):
+                take = (first <= band) & (last >= band)
+                band_edges.append((x1[take], y1[take], slope[take], low[take], high[take]))
+
+            self.codes.append(code)
+            self.polygons.append(polygons)
+            self.edges.append((bands, band_edges))
+            self.bounds.append(bounds)
+
+    @classmethod
+    def from_geojson(cls, geojson):
+        """GeoJSON FeatureCollection에서 생성 (구 이름 속성으로 구 코드 부여)"""
+        districts = {}
+        for feature in geojson['features']:
+            properties = feature.get('properties') or {}
+            name = next((properties[key] for key in NAME_PROPERTIES if properties.get(key)), None)
+            code = district_codes(pd.Series([str(name)])).iloc[0] if name else pd.NA
+            if pd.isna(code):
+                continue
+            districts.setdefault(int(code), []).extend(_polygons(feature['geometry']))
+        return cls(sorted(districts.items()))
+
+    @classmethod
+    def load(cls, path=BOUNDARY_FILE):
+        """경계 파일을 읽어 생성 (파일이 없으면 None)"""
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            polygons = cls.from_geojson(json.load(f))
+        print(f"{path} 경계 로드 ({len(polygons.codes)}개 구)")
+        return polygons
+
+    def contains(self, i, lon, lat):
+        """i번째 구 다각형 안에 있는 지점 여부 (짝홀 규칙이라 구멍/떨어진 섬도 처리)"""
+        bands, band_edges = self.edges[i]
+        inside = np.zeros(len(lon), dtype=bool)
+        band_of = np.clip(np.searchsorted(bands, lat, side='right') - 1, 0, BANDS - 1)
+        order = np.argsort(band_of, kind='stable')
+        splits = np.searchsorted(band_of[order], np.arange(BANDS + 1))
+        for band, (x1, y1, slope, ymin, ymax) in enumerate(band_edges):
+            index = order[splits[band]:splits[band + 1]]
+            step = max(1, MAX_PAIRS // max(len(x1), 1))
+            for start in range(0, len(index), step):
+                chunk = index[start:start + step]
+                px = lon[chunk, None]
+                py = lat[chunk, None]
+                crosses = (ymin <= py) & (py < ymax) & (px < x1 + (py - y1) * slope)
+                inside[chunk] = crosses.sum(axis=1) % 2 == 1
+        return inside
+
+    def assign(self, lon, lat):
+        """좌표 배열을 구 코드 배열로 변환 (어느 구에도 속하지 않으면 <NA>)"""
+        lon = np.asarray(lon, dtype='float64')
+        lat = np.asarray(lat, dtype='float64')
+        result = np.zeros(len(lon), dtype='int32')
+        for i, (xmin, ymin, xmax, ymax) in enumerate(self.bounds):
+            candidates = np.flatnonzero((result == 0) & (lon >= xmin) & (lon <= xmax) & (lat >= ymin) & (lat <= ymax))
+            if len(candidates):
+                result[candidates[self.contains(i, lon[candidates], lat[candidates])]] = self.codes[i]
+        return pd.array(np.where(result == 0, None, result), dtype='Int32')
+
+    def centroids(self):
+        """구별 넓이 가중 무게중심 (구, 구코드, 위도, 경도)"""
+        rows = []
+        for code, polygons in zip(self.codes, self.polygons):
+            total = cx = cy = 0.0
+            for polygon in polygons:
+                for j, ring in enumerate(polygon):
+                    area, x, y = _ring_area_centroid(ring)
+                    #첫 고리는 외곽선, 나머지는 구멍
+                    area = area if j == 0 else -area
+                    total += area
+                    cx += area * x
+                    cy += area * y
+            rows.append((code, cy / total, cx / total))
+        centers = pd.DataFrame(rows, columns=['구코드', '위도', '경도'])
+        centers.insert(0, '구', centers['구코드'].map(DISTRICT_NAMES))
+        centers['구코드'] = centers['구코드'].astype('Int32')
+        return centers
+
+    def _vertex_owners(self):
+        #꼭짓점별로 그 점을 쓰는 구 코드 집합
+        owners = {}
+        for code, polygons in zip(self.codes, self.polygons):
+            for polygon in polygons:
+                for ring in polygon:
+                    for point in map(tuple, ring.tolist()):
+                        owners.setdefault(point, set()).add(code)
+        return owners
+
+    def simplified(self, tolerance=SIMPLIFY_TOLERANCE):
+        """경계를 단순화한 GeoJSON FeatureCollection (속성: 구, 구코드)
+
+        고리를 이웃 구가 바뀌는 꼭짓점에서 끊어 구간별로 단순화하므로 두 구가 공유하는
+        경계선은 양쪽에서 같은 점만 남아 틈이나 겹침이 생기지 않는다.
+        """
+        owners = self._vertex_owners()
+        #허용 오차보다 한 자리 더 정밀하게 반올림
+        digits = max(0, math.ceil(-math.log10(tolerance))) + 1 if tolerance > 0 else 7
+        features = []
+        for code, polygons in zip(self.codes, self.polygons):
+            coordinates = []
+            for polygon in polygons:
+                rings = []
+                for ring in polygon:
+                    points = ring[:-1] if len(ring) > 1 and (ring[0] == ring[-1]).all() else ring
+                    sets = [owners[point] for point in map(tuple, points.tolist())]
+                    anchors = [j for j in range(len(points))
+                               if len(sets[j]) > 2 or sets[j] != sets[j - 1] or sets[j] != sets[(j + 1) % len(points)]]
+                    if not anchors:
+                        #이웃이 없는 고리(섬)는 첫 점과 가장 먼 점을 고정
+                        anchors = [0, int(np.argmax(np.hypot(*(points - points[0]).T)))]
+                    keep = np.zeros(len(points), dtype=bool)
+                    for a, b in zip(anchors, anchors[1:] + [anchors[0] + len(points)]):
+                        index = np.arange(a, b + 1) % len(points)
+                        keep[index[_douglas_peucker(points[index], tolerance)]] = True
+                    simple = points[keep]
+                    if len(simple) < 3:
+                        simple = points
+                    simple = np.round(np.vstack([simple, simple[:1]]), digits)
+                    rings.append(simple.tolist())
+                coordinates.append(rings)
+            features.append({
+                'type': 'Feature',
+                'properties': {'구': DISTRICT_NAMES[code], '구코드': code},
+                'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates},
+            })
+        return {'type': 'FeatureCollection', 'features': features}
+
+def simplified_geojson(tolerance=SIMPLIFY_TOLERANCE, path=BOUNDARY_FILE):
+    """단순화한 경계 GeoJSON을 허용 오차별로 디스크에 캐시해 반환 (경계 파일이 없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    cache_path = os.path.join(CACHE_DIR, f"boundary-{file_fingerprint(path)[:16]}-{tolerance:g}.geojson")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    polygons = DistrictPolygons.load(path)
+    geojson = polygons.simplified(tolerance)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, cache_path)
+    print(f"단순화한 경계 저장 ({cache_path})")
+    return geojson
+
+def center_table():
+    """경계 파일이 없을 때 쓰는 DISTRICT_CENTERS 표 (구, 구코드, 위도, 경도)"""
+    centers = pd.DataFrame.from_dict(DISTRICT_CENTERS, orient='index', columns=['위도', '경도'])
+    centers = centers.rename_axis('구').reset_index()
+    centers.insert(1, '구코드', district_codes(centers['구']))
+    return centers
+
+def district_centers_frame(polygons=None):
+    """자치구 중심 좌표 (경계가 있으면 실제 무게중심, 없으면 DISTRICT_CENTERS)"""
+    polygons = polygons or DistrictPolygons.load()
+    if polygons is None:
+        return center_table()
+    return polygons.centroids()
+
+def assign_districts(lon, lat, polygons=None):
+    """좌표를 구 코드로 배정 (경계 파일이 없으면 가장 가까운 중심 좌표의 구로 근사)"""
+    polygons = polygons or DistrictPolygons.load()
+    if polygons is not None:
+        return polygons.assign(lon, lat)
+
+    print(f"{BOUNDARY_FILE} 파일이 없어 가장 가까운 구 중심으로 배정합니다.")
+    centers = center_table()
+    lon = np.asarray(lon, dtype='float64')[:, None]
+    lat = np.asarray(lat, dtype='float64')[:, None]
+    dx = (lon - centers['경도'].to_numpy()) * np.cos(np.radians(37.55))
+    dy = lat - centers['위도'].to_numpy()
+    nearest = np.argmin(dx ** 2 + dy ** 2, axis=1)
+    return pd.array(centers['구코드'].to_numpy()[nearest], dtype='Int32')
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+#순열/부트스트랩 기본 횟수
+PERMUTATIONS = 10_000
+RESAMPLES = 10_000
+
+#한 번에 계산할 재표본 수 (재표본 x 구 x 변수 배열 크기 제한)
+BATCH_SIZE = 2_000
+
+#유의 수준별 표시 (p값이 작은 순)
+SIGNIFICANCE_MARKS = [(0.001, '***'), (0.01, '**'), (0.05, '*')]
+
+def _standardize(values, axis=-2):
+    #평균 0, 표준편차 1로 변환 (표준편차가 0이면 NaN)
+    mean = values.mean(axis=axis, keepdims=True)
+    std = values.std(axis=axis, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values - mean) / np.where(std > 0, std, np.nan)
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield min(batch_size, total - start)
+
+def permutation_pvalues(values, permutations=PERMUTATIONS, seed=42, batch_size=BATCH_SIZE):
+    """모든 변수 쌍의 상관계수에 대한 양측 순열 검정 p값 (변수 x 변수 배열)
+
+    순열 인덱스 행렬을 한 번에 만들어 행을 섞은 표준화 행렬과 원래 행렬의 곱을 배치로 계산한다.
+    (i, j) 원소는 i 변수만 섞었을 때의 상관이므로 모든 쌍을 한꺼번에 검정할 수 있다.
+    """
+    z = _standardize(np.asarray(values, dtype='float64'))
+    n = len(z)
+    observed = np.abs(z.T @ z / n)
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros_like(observed)
+    for size in _batches(permutations, batch_size):
+        order = np.argsort(rng.random((size, n)), axis=1)
+        permuted = np.einsum('bni,nj->bij', z[order], z) / n
+        #부동소수점 오차로 같은 값이 작게 계산되는 경우를 허용
+        exceed += (np.abs(permuted) >= observed - 1e-12).sum(axis=0)
+    pvalues = (exceed + 1) / (permutations + 1)
+    #(i, j)와 (j, i)는 같은 가설이므로 위쪽 삼각형 값을 대칭으로 사용
+    pvalues = np.triu(pvalues, 1) + np.triu(pvalues, 1).T
+    #표준편차가 0인 변수와의 상관은 정의되지 않으므로 p값도 NaN
+    pvalues[np.isnan(observed)] = np.nan
+    return pvalues
+
+def bootstrap_intervals(values, resamples=RESAMPLES, level=0.95, seed=42, batch_size=BATCH_SIZE):
+    """모든 변수 쌍의 상관계수에 대한 부트스트랩 백분위 신뢰구간 (하한, 상한 배열)"""
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    rng = np.random.default_rng(seed)
+    samples = []
+    for size in _batches(resamples, batch_size):
+        z = _standardize(values[rng.integers(0, n, (size, n))])
+        samples.append(np.einsum('bni,bnj->bij', z, z) / n)
+    samples = np.concatenate(samples)
+    alpha = (1 - level) / 2
+    #원래 표준편차가 0인 변수와의 쌍은 신뢰구간도 NaN
+    constant = values.std(axis=0) == 0
+    undefined = constant[:, None] | constant[None, :]
+    samples[:, undefined] = 0
+    #한 값만 뽑힌 재표본(표준편차 0)은 제외
+    with np.errstate(invalid='ignore'):
+        low, high = np.nanquantile(samples, [alpha, 1 - alpha], axis=0)
+    low[undefined] = high[undefined] = np.nan
+    return low, high
+
+def correlation_report(data, permutations=PERMUTATIONS, resamples=RESAMPLES, level=0.95, seed=42):
+    """상관계수, 순열 p값, 부트스트랩 신뢰구간을 변수 x 변수 데이터프레임으로 반환"""
+    data = data.dropna()
+    columns = data.columns
+    values = data.to_numpy('float64')
+
+    def frame(array):
+        return pd.DataFrame(array, index=columns, columns=columns)
+
+    low, high = bootstrap_intervals(values, resamples, level, seed)
+    return {
+        '상관계수': data.corr(),
+        'p값': frame(permutation_pvalues(values, permutations, seed)),
+        '하한': frame(low),
+        '상한': frame(high),
+    }
+
+def significance_mark(pvalue):
+    """p값에 해당하는 별표 ('***', '**', '*', '')"""
+    return next((mark for limit, mark in SIGNIFICANCE_MARKS if pvalue < limit), '')
+
+def annotation_labels(report):
+    """히트맵 칸에 넣을 '계수+별표' / '[하한, 상한]' 문자열 배열 (대각선은 계수만, 정의되지 않으면 빈칸)"""
+    r, p, low, high = (report[key].to_numpy() for key in ['상관계수', 'p값', '하한', '상한'])
+    labels = np.empty(r.shape, dtype=object)
+    for i in range(r.shape[0]):
+        for j in range(r.shape[1]):
+            if np.isnan(r[i, j]):
+                labels[i, j] = ''
+            elif i == j:
+                labels[i, j] = f"{r[i, j]:.2f}"
+            else:
+                labels[i, j] = f"{r[i, j]:.2f}{significance_mark(p[i, j])}\n[{low[i, j]:.2f}, {high[i, j]:.2f}]"
+    return labels
+
+def report_pair(report, x, y, level=0.95):
+    """correlation_report 결과에서 x, y 쌍의 '상관계수 (p=..., 95% CI [하한, 상한])' 문자열"""
+    r, p = report['상관계수'].loc[x, y], report['p값'].loc[x, y]
+    low, high = report['하한'].loc[x, y], report['상한'].loc[x, y]
+    return f"{r:.2f} (p={p:.4f}, {level:.0%} CI [{low:.2f}, {high:.2f}])"
+
+def pair_summary(x, y, permutations=PERMUTATIONS, resamples=RESAMPLES, level=0.95, seed=42):
+    """두 변수의 '상관계수 (p=..., 95% CI [하한, 상한])' 문자열"""
+    report = correlation_report(pd.DataFrame({'x': x, 'y': y}), permutations, resamples, level, seed)
+    return report_pair(report, 'x', 'y', level)
@@ -0,0 +1,147 @@
+import math
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from validation import design_matrix
+
+#한 작업에서 평가할 조합 수 (작업마다 배치 QR 한 번)
+CHUNK_SIZE = 2000
+
+#순위표에 남길 조합 수
+TOP = 20
+
+#구 단위 지표 중 후보 특성 (범죄 유형별 천명당 발생은 candidate_table에서 추가)
+INDICATOR_COLUMNS = ['총범죄수', '인구천명당범죄수', '카메라대수', '인구천명당CCTV', '외국인비율', '총인구']
+
+#워커 프로세스가 붙는 공유 메모리 (initializer에서 설정)
+_shared = None
+_X = None
+_y = None
+
+def candidate_table(table, crime_types, target='평균가'):
+    """후보 특성과 타겟만 남긴 구별 테이블 (범죄 유형은 인구 천명당 발생 건수로 변환)"""
+    candidates = table[['구'] + [c for c in INDICATOR_COLUMNS if c in table.columns]].copy()
+    for crime_type in crime_types:
+        candidates[f'{crime_type}(천명당)'] = (table[crime_type] / (table['총인구'] / 1000)).round(4)
+    candidates[target] = table[target]
+    return candidates.dropna().reset_index(drop=True)
+
+def count_subsets(m, max_size):
+    """특성 m개에서 1~max_size개를 고르는 조합 수"""
+    return sum(math.comb(m, size) for size in range(1, max_size + 1))
+
+def loo_scores(X, y, subsets):
+    """같은 크기의 특성 조합들을 배치 QR 한 번으로 풀어 조합별 LOO MSE/MAE 계산
+
+    subsets는 (조합 수, 크기) 정수 배열. hat 행렬 대각 h로 LOO 잔차 e / (1 - h)를 구한다.
+    """
+    A = np.concatenate([np.ones((len(subsets), len(y), 1)), X[:, subsets].transpose(1, 0, 2)], axis=2)
+    Q, _ = np.linalg.qr(A)
+    leverage = (Q ** 2).sum(axis=2)
+    fitted = (Q @ (Q.transpose(0, 2, 1) @ y[:, None]))[:, :, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        residual = (y - fitted) / (1 - leverage)
+    mse = (residual ** 2).mean(axis=1)
+    mae = np.abs(residual).mean(axis=1)
+    #특성이 서로 종속이면 지레값이 1이 되어 평가할 수 없음
+    bad = ~np.isfinite(mse) | (leverage.max(axis=1) > 1 - 1e-10)
+    return np.where(bad, np.inf, mse), np.where(bad, np.inf, mae)
+
+def _attach(name, shape):
+    #워커에서 공유 메모리를 복사 없이 배열로 사용 (마지막 열이 타겟)
+    global _shared, _X, _y
+    _shared = shared_memory.SharedMemory(name=name)
+    data = np.ndarray(shape, dtype='float64', buffer=_shared.buf)
+    _X, _y = data[:, :-1], data[:, -1]
+
+def unrank_combination(m, size, rank):
+    """range(m)에서 size개를 고르는 조합 중 사전순 rank번째(0부터) 조합"""
+    subset = []
+    first = 0
+    for remaining in range(size, 0, -1):
+        #맨 앞 원소가 i인 조합 수만큼 건너뛰며 자리마다 원소를 정함
+        for i in range(first, m):
+            count = math.comb(m - i - 1, remaining - 1)
+            if rank < count:
+                subset.append(i)
+                first = i + 1
+                break
+            rank -= count
+    return subset
+
+def combination_range(m, size, start, stop):
+    """사전순 [start, stop) 번째 조합 (앞 조합들을 거치지 않고 start번째부터 생성)"""
+    subset = unrank_combination(m, size, start)
+    for _ in range(stop - start):
+        yield tuple(subset)
+        #끝에서부터 더 올릴 수 있는 자리를 찾아 1 올리고 뒤는 연속 값으로 채움
+        i = size - 1
+        while i >= 0 and subset[i] == m - size + i:
+            i -= 1
+        if i < 0:
+            return
+        subset[i] += 1
+        for j in range(i + 1, size):
+            subset[j] = subset[j - 1] + 1
+
+def _score_chunk(size, start, stop, top):
+    #크기 size 조합 중 [start, stop) 번째를 평가해 LOO MSE 상위 top개 반환
+    subsets = np.array(list(combination_range(_X.shape[1], size, start, stop)), dtype='int64')
+    mse, mae = loo_scores(_X, _y, subsets)
+    best = np.argsort(mse, kind='stable')[:top]
+    return [(mse[i], mae[i], tuple(subsets[i].tolist())) for i in best if np.isfinite(mse[i])]
+
+def _tasks(m, max_size, chunk_size):
+    for size in range(1, max_size + 1):
+        total = math.comb(m, size)
+        for start in range(0, total, chunk_size):
+            yield size, start, min(start + chunk_size, total)
+
+def search_subsets(candidates, max_size=3, target='평균가', top=TOP, processes=None, chunk_size=CHUNK_SIZE):
+    """1~max_size개 특성의 모든 조합을 LOO 교차 검증 오차로 평가한 순위표
+
+    설계 행렬은 공유 메모리에 한 번만 올리고, 워커는 (조합 크기, 구간)만 받아 조합을
+    직접 만들어 평가한 뒤 구간별 상위 조합만 돌려준다.
+    """
+    if max_size < 1:
+        raise ValueError(f"최대 특성 수는 1 이상이어야 합니다. (입력: {max_size})")
+    columns = [c for c in candidates.columns if c not in ('구', target)]
+    data = np.column_stack([candidates[columns].to_numpy('float64'), candidates[target].to_numpy('float64')])
+    #절편을 포함한 계수 수가 구 수보다 작아야 LOO 잔차가 정의됨
+    max_size = min(max_size, len(columns), len(data) - 2)
+    if max_size < 1:
+        print(f"평가할 특성 조합이 없습니다. (후보 {len(columns)}개, 구 {len(data)}개)")
+        return pd.DataFrame(columns=['특성', '특성 수', 'LOO MSE', 'LOO MAE', 'LOO R²'],
+                            index=pd.RangeIndex(1, 1, name='순위'))
+    tasks = list(_tasks(len(columns), max_size, chunk_size))
+
+    if processes == 1 or len(tasks) == 1:
+        global _X, _y
+        _X, _y = data[:, :-1], data[:, -1]
+        results = [_score_chunk(*task, top) for task in tasks]
+    else:
+        shared = shared_memory.SharedMemory(create=True, size=data.nbytes)
+        try:
+            np.ndarray(data.shape, dtype='float64', buffer=shared.buf)[:] = data
+            with ProcessPoolExecutor(max_workers=processes, initializer=_attach,
+                                     initargs=(shared.name, data.shape)) as pool:
+                sizes, starts, stops = zip(*tasks)
+                results = list(pool.map(_score_chunk, sizes, starts, stops, [top] * len(tasks)))
+        finally:
+            shared.close()
+            shared.unlink()
+
+    best = heapq.nsmallest(top, (row for rows in results for row in rows), key=lambda row: row[0])
+    sst = ((data[:, -1] - data[:, -1].mean()) ** 2).mean()
+    leaderboard = pd.DataFrame({
+        '특성': [', '.join(columns[i] for i in subset) for _, _, subset in best],
+        '특성 수': [len(subset) for _, _, subset in best],
+        'LOO MSE': [mse for mse, _, _ in best],
+        'LOO MAE': [mae for _, mae, _ in best],
+        'LOO R²': [1 - mse / sst for mse, _, _ in best],
+    })
+    leaderboard.index = pd.RangeIndex(1, len(leaderboard) + 1, name='순위')
+    print(f"특성 조합 {count_subsets(len(columns), max_size):,}개 평가 완료 (후보 {len(columns)}개, 최대 {max_size}개)")
+    return leaderboard
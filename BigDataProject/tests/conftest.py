@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+import pytest
+
+#스크립트들이 서로를 같은 폴더 모듈로 import하므로 상위 폴더와 webcrawler 폴더를 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'webcrawler'))
+sys.path.insert(0, ROOT)
+
+import http_client
+
+@pytest.fixture
+def stub_server(tmp_path, monkeypatch):
+    """respond(query) -> (지연 초, JSON 응답)으로 동작하는 로컬 HTTP 서버 (주소, 받은 요청 목록)"""
+    monkeypatch.setattr(http_client, 'CACHE_DIR', str(tmp_path / 'cache'))
+    hits = []
+    handlers = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            query = dict(parse_qsl(urlsplit(self.path).query))
+            hits.append(query)
+            delay, body = handlers['respond'](query)
+            time.sleep(delay)
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def serve(respond):
+        handlers['respond'] = respond
+        return f'http://127.0.0.1:{server.server_port}/service', hits
+
+    yield serve
+    server.shutdown()
+    server.server_close()
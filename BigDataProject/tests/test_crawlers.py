@@ -0,0 +1,62 @@
+import os
+import asyncio
+import importlib.util
+import datago_api
+
+def tourism_response(query, last_month):
+    #last_month 이후는 정상 응답에 items가 빈 문자열 (아직 제공되지 않는 달)
+    header = {'resultCode': '0000', 'resultMsg': 'OK'}
+    if query['YM'] > last_month:
+        return {'response': {'header': header, 'body': {'items': ''}}}
+    item = {'natKorNm': '일 본', 'num': int(query['YM']), 'ed': '방한외래관광객', 'ym': int(query['YM'])}
+    return {'response': {'header': header, 'body': {'items': {'item': item}}}}
+
+def test_fetch_tourism_stats_keeps_month_order(stub_server):
+    months = ['202301', '202302', '202303', '202304', '202305', '202306']
+    #뒤 달일수록 먼저 응답이 와도 결과는 months 순서
+    url, hits = stub_server(lambda query: (0.05 * (6 - int(query['YM'][-2:])), tourism_response(query, '202312')))
+
+    responses = asyncio.run(datago_api.fetchTourismStats('130', 'E', months, concurrency=6, service_url=url))
+
+    assert [r['response']['body']['items']['item']['ym'] for r in responses] == [int(m) for m in months]
+    assert len(hits) == len(months)
+
+def test_fetch_tourism_stats_stops_at_first_empty_month(stub_server):
+    months = ['202401', '202402', '202403', '202404', '202405', '202406']
+    url, hits = stub_server(lambda query: (0, tourism_response(query, '202402')))
+
+    responses = asyncio.run(datago_api.fetchTourismStats('130', 'E', months, concurrency=1, service_url=url))
+
+    assert [r['response']['body']['items']['item']['ym'] for r in responses[:2]] == [202401, 202402]
+    assert datago_api.isEmptyMonth(responses[2])
+    #첫 빈 달 뒤의 달은 요청하지 않음
+    assert responses[3:] == [None, None, None]
+    assert [hit['YM'] for hit in hits] == months[:3]
+
+def load_jaywalk():
+    #파일 이름에 공백이 있어 경로로 직접 로드
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'jaywalk copy.py')
+    spec = importlib.util.spec_from_file_location('jaywalk', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def jaywalk_response(query, total):
+    n, page = int(query['numOfRows']), int(query['pageNo'])
+    items = [{'spot_nm': f'지점{i}', 'occrrnc_cnt': 1, 'caslt_cnt': 1} for i in range((page - 1) * n, min(page * n, total))]
+    body = {'totalCount': total, 'items': {'item': items} if items else ''}
+    return {'response': {'header': {'resultCode': '0000', 'resultMsg': 'NORMAL_CODE'}, 'body': body}}
+
+def test_collect_district_fans_out_pages_after_total_count(stub_server, tmp_path, monkeypatch):
+    jaywalk = load_jaywalk()
+    monkeypatch.setattr(jaywalk.http_client, 'CACHE_DIR', str(tmp_path / 'cache'))
+    #2페이지가 3페이지보다 늦게 와도 항목은 페이지 순서대로 합쳐짐
+    url, hits = stub_server(lambda query: (0.2 if query['pageNo'] == '2' else 0, jaywalk_response(query, 250)))
+
+    items = asyncio.run(jaywalk.collectPedestrianAccidents([2023], '11', ['680'], rate=1000, service_url=url))
+
+    assert [item['spot_nm'] for item in items] == [f'지점{i}' for i in range(250)]
+    assert all(item['searchYearCd'] == 2023 for item in items)
+    #첫 페이지의 totalCount로 나머지 페이지만 한 번씩 요청
+    assert hits[0]['pageNo'] == '1'
+    assert sorted(hit['pageNo'] for hit in hits) == ['1', '2', '3']
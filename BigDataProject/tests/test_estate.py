@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from estate import DISTRICT_COLUMN, PRICE_COLUMN, aggregate_estate_file, aggregate_estate_files
+
+@pytest.fixture
+def transactions():
+    rng = np.random.default_rng(7)
+    districts = rng.choice(['강남구', '종로구', '중구'], size=41)
+    #같은 금액이 여러 번 나오도록 1,000만원 단위로 반올림 (짝수/홀수 건수 구가 섞이게)
+    prices = (rng.lognormal(11, 0.5, size=41) // 1000 * 1000).astype('int64')
+    return pd.DataFrame({DISTRICT_COLUMN: districts, PRICE_COLUMN: prices})
+
+def expected_summary(frame):
+    grouped = frame.groupby(DISTRICT_COLUMN)[PRICE_COLUMN]
+    return pd.DataFrame({'평균가': grouped.mean(), '중위가': grouped.median(), '거래건수': grouped.size()})
+
+def write_csv(frame, path):
+    #원본처럼 천 단위 쉼표가 들어간 금액 문자열
+    frame.assign(**{PRICE_COLUMN: frame[PRICE_COLUMN].map('{:,}'.format)}).to_csv(path, index=False)
+    return str(path)
+
+def test_chunked_exact_and_sketch_medians_match_groupby(transactions, tmp_path):
+    path = write_csv(transactions, tmp_path / 'estate.csv')
+    expected = expected_summary(transactions)
+
+    exact = aggregate_estate_file(path, 'exact', chunksize=4).result().set_index('구')
+    pd.testing.assert_frame_equal(exact.loc[expected.index], expected, check_names=False, check_dtype=False)
+
+    sketch = aggregate_estate_file(path, 'sketch', chunksize=4).result().set_index('구').loc[expected.index]
+    np.testing.assert_allclose(sketch['중위가'], expected['중위가'], rtol=0.01)
+    np.testing.assert_allclose(sketch['평균가'], expected['평균가'])
+
+@pytest.mark.parametrize('processes', [1, 2])
+@pytest.mark.parametrize('median', ['exact', 'sketch'])
+def test_files_merged_across_processes_match_single_file(transactions, tmp_path, median, processes):
+    #한 구의 거래가 두 파일에 나뉘어 있어도 병합 결과는 한 파일 집계와 같음
+    paths = [write_csv(transactions.iloc[:20], tmp_path / 'estate_1.csv'),
+             write_csv(transactions.iloc[20:], tmp_path / 'estate_2.csv')]
+    whole = aggregate_estate_file(write_csv(transactions, tmp_path / 'estate.csv'), median, chunksize=4)
+
+    merged = aggregate_estate_files(str(tmp_path / 'estate_*.csv'), median, chunksize=4, processes=processes)
+
+    pd.testing.assert_frame_equal(merged.result(), whole.result())
+    if median == 'exact':
+        expected = expected_summary(transactions)
+        np.testing.assert_array_equal(merged.result().set_index('구').loc[expected.index, '중위가'], expected['중위가'])
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from hierarchy import HierarchicalFeatures
+from predict import prepare_data
+
+#구 -> 동 -> (총인구, 외국인수)
+DONG_POPULATION = {
+    '종로구': {'청운동': (1000, 10), '사직동': (3000, 90)},
+    '강남구': {'역삼동': (4000, 200), '삼성동': (2000, 40), '대치동': (2000, 60)},
+}
+
+def synthetic_frames(estate_dong=True):
+    person = pd.DataFrame(
+        [(gu, dong, population, foreigners)
+         for gu, dongs in DONG_POPULATION.items()
+         for dong, (population, foreigners) in dongs.items()],
+        columns=['동별(2)', '동별(3)', '계 (명)', '등록외국인 (명)'])
+    person = pd.concat([pd.DataFrame([['소계', '소계', 14000, 400]], columns=person.columns), person])
+    crime = pd.DataFrame({'범죄대분류': ['절도범죄', '폭력범죄'], '종로구': [40, 40], '강남구': [120, 40]})
+    cctv = pd.DataFrame({'구': ['종로구', '강남구'], '카메라대수': [400, 1600]})
+    estate = pd.DataFrame({
+        '자치구명': ['종로구', '종로구', '종로구', '강남구', '강남구', '강남구', '강남구'],
+        '법정동명': ['청운동', '사직동', '사직동', '역삼동', '역삼동', '삼성동', '대치동'],
+        '물건금액(만원)': [50000, 70000, 90000, 200000, 220000, 250000, 300000],
+    })
+    if not estate_dong:
+        estate = estate.drop(columns='법정동명')
+    return cctv, crime, estate, person
+
+def test_prepare_data_at_dong_level():
+    features = HierarchicalFeatures.from_frames(*synthetic_frames()).district_features('동')
+    data = prepare_data(features)
+
+    assert list(data.columns) == ['구', '카메라대수', '총범죄수', '외국인비율', '평균가']
+    assert len(data) == 5
+    table = features.table.set_index('구')
+    assert table.loc['강남구 역삼동', '상위구'] == '강남구'
+    assert table['구코드'].notna().all()
+
+    #구 단위로만 있는 지표는 인구 비례로 나눠서 구 합계가 유지됨
+    totals = table.groupby('상위구')[['총범죄수', '카메라대수']].sum()
+    assert totals.loc['종로구', '총범죄수'] == pytest.approx(80)
+    assert totals.loc['강남구', '카메라대수'] == pytest.approx(1600)
+    assert table.loc['종로구 사직동', '총범죄수'] == pytest.approx(60)
+    assert table.loc['강남구 역삼동', '인구천명당범죄수'] == pytest.approx(20)
+    assert table.loc['종로구 사직동', '평균가'] == pytest.approx(80000)
+
+def test_prepare_data_with_district_prices_only():
+    features = HierarchicalFeatures.from_frames(*synthetic_frames(estate_dong=False)).district_features('동')
+    data = prepare_data(features).set_index('구')
+
+    assert len(data) == 5
+    #거래가 구 단위로만 있으면 동에는 소속 구의 평균가/중위가가 들어감
+    assert data.loc['강남구 삼성동', '평균가'] == pytest.approx(242500)
+    assert features.table.set_index('구').loc['종로구 청운동', '중위가'] == pytest.approx(70000)
@@ -0,0 +1,54 @@
+import os
+import time
+import http_client
+
+def cache_file(url):
+    return http_client._cache_path(http_client.cache_key(url))
+
+def test_service_key_is_not_part_of_cache_key(stub_server):
+    url, hits = stub_server(lambda query: (0, {'page': query['page']}))
+
+    first = http_client.get(url + '?page=1&serviceKey=AAA')
+    second = http_client.get(url + '?serviceKey=BBB&page=1')
+    http_client.get(url + '?page=2&serviceKey=AAA')
+
+    assert first == second
+    assert [hit['page'] for hit in hits] == ['1', '2']
+
+def test_expired_entries_are_fetched_again(stub_server):
+    url, hits = stub_server(lambda query: (0, {'page': query['page']}))
+    url += '?page=1'
+
+    http_client.get(url, ttl=60)
+    http_client.get(url, ttl=60)
+    assert len(hits) == 1
+
+    #받은 시각(mtime)을 두 시간 전으로 돌리면 만료
+    past = time.time() - 7200
+    os.utime(cache_file(url), (past, past))
+    http_client.get(url, ttl=None)
+    assert len(hits) == 1
+    http_client.get(url, ttl=60)
+    assert len(hits) == 2
+
+def test_least_recently_used_entries_are_evicted(stub_server, monkeypatch):
+    url, hits = stub_server(lambda query: (0, {'page': query['page']}))
+    urls = {page: f'{url}?page={page}' for page in 'abc'}
+    size = len(http_client.get(urls['a']))
+    http_client.get(urls['b'])
+    #캐시 두 개 반까지만 허용 (세 번째를 쓰면 가장 오래 쓰지 않은 하나를 지움)
+    monkeypatch.setattr(http_client, 'CACHE_MAX_BYTES', size * 2.5)
+    monkeypatch.setattr(http_client, '_cache_bytes', None)
+
+    now = time.time()
+    for page, age in (('a', 100), ('b', 50)):
+        path = cache_file(urls[page])
+        os.utime(path, (now - age, os.stat(path).st_mtime))
+    #a를 다시 읽으면 마지막 사용 시각이 갱신되어 b가 가장 오래된 항목이 됨
+    http_client.get(urls['a'])
+    http_client.get(urls['c'])
+
+    assert os.path.exists(cache_file(urls['a']))
+    assert not os.path.exists(cache_file(urls['b']))
+    assert os.path.exists(cache_file(urls['c']))
+    assert [hit['page'] for hit in hits] == ['a', 'b', 'c']
@@ -0,0 +1,28 @@
+import codecs
+import pytest
+from loader import detect_encoding
+
+TEXT = "자치구명,물건금액(만원)\n강남구,\"120,000\"\n"
+
+@pytest.mark.parametrize('data, expected', [
+    (codecs.BOM_UTF8 + TEXT.encode('utf-8'), 'utf-8-sig'),
+    (TEXT.encode('utf-8'), 'utf-8'),
+    (TEXT.encode('cp949'), 'cp949'),
+])
+def test_detect_encoding(tmp_path, data, expected):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(data)
+    assert detect_encoding(str(path)) == expected
+
+def test_sample_cut_inside_a_character_is_not_an_error(tmp_path):
+    path = tmp_path / 'data.csv'
+    data = TEXT.encode('cp949')
+    path.write_bytes(data)
+    #'자'의 첫 바이트에서 샘플이 잘려도 cp949로 판별
+    assert detect_encoding(str(path), sample_size=1) == 'cp949'
+
+def test_undecodable_file_names_the_path(tmp_path):
+    path = tmp_path / 'broken.csv'
+    path.write_bytes(b'\xff\xfe\x80\x80' * 16)
+    with pytest.raises(ValueError, match='broken.csv'):
+        detect_encoding(str(path))
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from price_index import WINDOWS, add_time_features
+
+def test_rolling_means_with_a_missing_month():
+    rng = np.random.default_rng(5)
+    months = pd.period_range('2020-01', '2022-12', freq='M')
+    frames = []
+    for code, gap in ((11680, '2021-02'), (11110, None)):
+        values = pd.Series(100 + rng.normal(size=len(months)).cumsum(), index=months)
+        if gap is not None:
+            values = values.drop(pd.Period(gap, 'M'))
+        frames.append(pd.DataFrame({'구코드': code, '기간': values.index.strftime('%Y%m').astype(int), '지수': values.values}))
+    panel = pd.concat(frames, ignore_index=True)
+
+    result = add_time_features(panel)
+
+    for code, rows in result.groupby('구코드'):
+        index = pd.PeriodIndex(rows['기간'].astype(str), freq='M')
+        series = pd.Series(rows['지수'].to_numpy(), index=index).reindex(months)
+        for window in WINDOWS:
+            actual = pd.Series(rows[f'지수{window}개월평균'].to_numpy(), index=index)
+            #창 안에 빠진 달이 없으면 유효 월 평균과 같고, 빠진 달이 있는 창만 NaN
+            reference = series.rolling(window, min_periods=1).mean().loc[index]
+            complete = series.notna().astype(int).rolling(window).sum().loc[index] == window
+            np.testing.assert_allclose(actual[complete], reference[complete], rtol=1e-6)
+            assert actual[~complete].isna().all()
+            if code == 11680:
+                #빠진 달 뒤 window개월이 지나면 다시 값이 있음
+                assert actual.loc[pd.Period('2021-02', 'M') + window:].notna().all()
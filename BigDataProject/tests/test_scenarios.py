@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+import scenarios
+from districts import DISTRICT_NAMES
+
+FEATURES = ['총범죄수', '외국인비율', '카메라대수']
+
+def test_downdated_scenarios_match_refits():
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame(rng.normal(size=(25, 3)) * [1000, 2, 300], columns=FEATURES)
+    data.insert(0, '구', list(DISTRICT_NAMES.values()))
+    data['평균가'] = data[FEATURES] @ [5.0, 300.0, -1.0] + rng.normal(scale=100, size=25)
+
+    cases = scenarios.make_scenarios([['강남'], ['강남', '서초'], ['중구', '종로', '용산']], all_features=FEATURES)
+    summary, coefficients, predictions = scenarios.run_scenarios(data, cases)
+
+    for name, exclude, features in cases:
+        train = data[~data['구'].isin(exclude)]
+        model = Pipeline([('scaler', StandardScaler()), ('regressor', LinearRegression())])
+        model.fit(train[list(features)], train['평균가'])
+
+        rows = coefficients[coefficients['시나리오'] == name]
+        np.testing.assert_allclose(rows['계수'], model.named_steps['regressor'].coef_, rtol=1e-8)
+        rows = predictions[predictions['시나리오'] == name]
+        np.testing.assert_allclose(rows['예측값'], model.predict(data[list(features)]), rtol=1e-8)
+        assert summary.loc[summary['시나리오'] == name, '학습 구 수'].item() == len(train)
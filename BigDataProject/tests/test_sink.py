@@ -0,0 +1,47 @@
+import csv
+import json
+import pytest
+from sink import RecordSink
+
+COLUMNS = {'unit': '단위', 'index': '번호', 'value': '값'}
+
+def unit_records(unit):
+    return [{'unit': unit, 'index': i, 'value': {'n': unit * 10 + i}} for i in range(2)]
+
+def read_csv(path):
+    with open(path, encoding='utf-8-sig', newline='') as infile:
+        return list(csv.reader(infile))
+
+@pytest.mark.parametrize('crash', ['partial_line', 'progress_lags'])
+def test_resume_after_crash_keeps_every_record_once(tmp_path, crash):
+    basename = str(tmp_path / 'out')
+    with RecordSink(basename, COLUMNS) as sink:
+        for unit in range(3):
+            sink.write(unit, unit_records(unit))
+
+    #단위 3을 쓰는 도중에 끊긴 상황: 레코드는 파일에 있지만 progress에는 기록되지 않음
+    with open(basename + '.ndjson', 'a', encoding='utf-8') as ndjson, \
+         open(basename + '.csv', 'a', encoding='utf-8-sig', newline='') as csv_file:
+        records = unit_records(3)
+        ndjson.write(json.dumps(records[0], sort_keys=True) + '\n')
+        csv.writer(csv_file).writerow([3, 0, '{}'])
+        if crash == 'partial_line':
+            ndjson.write(json.dumps(records[1], sort_keys=True)[:10])
+        else:
+            ndjson.write(json.dumps(records[1], sort_keys=True) + '\n')
+            with open(basename + '.progress', 'a', encoding='utf-8') as progress:
+                progress.write('3\t')
+
+    with RecordSink(basename, COLUMNS, resume=True) as sink:
+        assert sink.done == {'0', '1', '2'}
+        assert sink.count == 6
+        for unit in range(5):
+            if str(unit) not in sink.done:
+                sink.write(unit, unit_records(unit))
+
+    expected = [record for unit in range(5) for record in unit_records(unit)]
+    with open(basename + '.ndjson', encoding='utf-8') as infile:
+        assert [json.loads(line) for line in infile] == expected
+    rows = read_csv(basename + '.csv')
+    assert rows[0] == list(COLUMNS.values())
+    assert [(int(unit), int(index)) for unit, index, _ in rows[1:]] == [(r['unit'], r['index']) for r in expected]
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from transactions import StreamingRegression
+from estate import DISTRICT_COLUMN, PRICE_COLUMN
+from districts import SEOUL_DISTRICT_CODES
+
+DISTRICTS = ['강남구', '종로구', '중구', '마포구']
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(11)
+    table = pd.DataFrame({'구': DISTRICTS, '구코드': [SEOUL_DISTRICT_CODES[gu] for gu in DISTRICTS],
+                          '총범죄수': rng.normal(1000, 200, 4), '카메라대수': rng.normal(3000, 500, 4)})
+    n = 500
+    trades = pd.DataFrame({DISTRICT_COLUMN: rng.choice(DISTRICTS, n), '건물면적(㎡)': rng.uniform(30, 150, n),
+                           '층': rng.integers(1, 30, n).astype('float64')})
+    district = table.set_index('구').loc[trades[DISTRICT_COLUMN]]
+    trades[PRICE_COLUMN] = (1000 * trades['건물면적(㎡)'] + 50 * trades['층'] + 20 * district['총범죄수'].to_numpy()
+                            + rng.normal(0, 5000, n))
+    #거래 파일처럼 문자열, 일부는 값이 빠지거나 모르는 구
+    trades = trades.astype(str)
+    trades.loc[3, PRICE_COLUMN] = ''
+    trades.loc[7, DISTRICT_COLUMN] = '세종시'
+    return table, trades
+
+def reference(table, trades, columns, fixed_effects):
+    frame = trades.copy()
+    frame[PRICE_COLUMN] = pd.to_numeric(frame[PRICE_COLUMN], errors='coerce')
+    frame = frame.dropna(subset=[PRICE_COLUMN])
+    frame = frame[frame[DISTRICT_COLUMN].isin(DISTRICTS)]
+    district = table.set_index('구').loc[frame[DISTRICT_COLUMN]]
+    dense = frame[columns].astype('float64').to_numpy()
+    if fixed_effects:
+        order = table.sort_values('구코드')['구']
+        X = np.column_stack([(frame[DISTRICT_COLUMN].to_numpy()[:, None] == order.to_numpy()).astype(float), dense])
+    else:
+        X = np.column_stack([np.ones(len(frame)), district[['총범죄수', '카메라대수']].to_numpy(), dense])
+    return np.linalg.lstsq(X, frame[PRICE_COLUMN].to_numpy(), rcond=None)[0]
+
+@pytest.mark.parametrize('fixed_effects', [False, True])
+def test_chunked_fit_with_save_and_load_matches_lstsq(data, tmp_path, fixed_effects):
+    table, trades = data
+    columns = ['건물면적(㎡)', '층']
+
+    def model():
+        return StreamingRegression(table, ['총범죄수', '카메라대수'], columns, fixed_effects, district_fingerprint='v1')
+
+    first = model()
+    for start in range(0, 300, 64):
+        first.partial_fit(trades.iloc[start:min(start + 64, 300)])
+    path = str(tmp_path / 'state.npz')
+    first.save(path)
+
+    resumed = model().load(path)
+    for start in range(300, len(trades), 64):
+        resumed.partial_fit(trades.iloc[start:start + 64])
+
+    np.testing.assert_allclose(resumed.coefficients().to_numpy(), reference(table, trades, columns, fixed_effects),
+                               rtol=1e-6)
+    assert resumed.n == len(trades) - 2
+    assert resumed.skipped == 2
+
+def test_summary_without_transactions_raises(data):
+    table, trades = data
+    model = StreamingRegression(table, ['총범죄수'])
+    model.partial_fit(trades.assign(**{DISTRICT_COLUMN: '세종시'}))
+    with pytest.raises(ValueError, match='누적된 거래가 없습니다'):
+        model.summary()
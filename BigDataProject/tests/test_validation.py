@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, LeaveOneOut
+import validation
+
+@pytest.fixture
+def design():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(25, 3)) * [1, 100, 0.01]
+    y = X @ [2.0, -0.03, 50.0] + rng.normal(size=25)
+    return X, y
+
+def test_loo_predictions_match_refits(design):
+    X, y = design
+    expected = np.empty_like(y)
+    for train, test in LeaveOneOut().split(X):
+        expected[test] = LinearRegression().fit(X[train], y[train]).predict(X[test])
+
+    np.testing.assert_allclose(validation.loo_predictions(X, y), expected, rtol=1e-9)
+
+def test_kfold_predictions_match_refits(design):
+    X, y = design
+    folds = 5
+    #KFold 분할을 (반복, 점) 겹 번호 배열로 바꿔 같은 분할을 비교
+    splits = [list(KFold(folds, shuffle=True, random_state=seed).split(X)) for seed in range(3)]
+    assignment = np.empty((len(splits), len(y)), dtype='int64')
+    for repeat, split in enumerate(splits):
+        for fold, (_, test) in enumerate(split):
+            assignment[repeat, test] = fold
+
+    predictions = validation.kfold_predictions(X, y, assignment, folds)
+
+    for repeat, split in enumerate(splits):
+        for train, test in split:
+            model = LinearRegression().fit(X[train], y[train])
+            np.testing.assert_allclose(predictions[repeat, test], model.predict(X[test]), rtol=1e-9)
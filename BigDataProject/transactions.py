@@ -0,0 +1,170 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from loader import DATA_FILES, detect_encoding, to_numeric, file_fingerprint
+from districts import DISTRICT_NAMES, district_codes
+from estate import DISTRICT_COLUMN, PRICE_COLUMN, CHUNK_SIZE
+
+#거래 파일에 있으면 거래 단위 특성으로 쓰는 컬럼 (국토부 실거래가 원본 컬럼명)
+TRANSACTION_COLUMNS = ['건물면적(㎡)', '층', '건축년도']
+
+class StreamingRegression:
+    """거래 단위 선형 회귀를 청크마다 XᵀX, Xᵀy를 float64로 누적해 마지막에 한 번 풀기
+
+    거래마다 구 코드로 구 단위 지표를 붙이며, 메모리는 특성 수에만 비례한다.
+    fixed_effects=True이면 절편 대신 구별 고정효과를 두고 구 단위 지표는 고정효과에
+    흡수되므로 제외한다 (거래 단위 특성의 효과만 추정). 누적 상태를 save/load 해 두면
+    새 월별 파일을 partial_fit/fit_files로 더해 처음부터 다시 적합하지 않아도 된다.
+    district_fingerprint는 district_table을 만든 입력 파일 해시로, 상태 파일과 다르면 이어받지 않는다.
+    """
+
+    def __init__(self, district_table, feature_columns=(), transaction_columns=(), fixed_effects=False,
+                 district_fingerprint=None):
+        table = district_table.dropna(subset=['구코드']).sort_values('구코드')
+        self.codes = table['구코드'].to_numpy('int64')
+        self.fixed_effects = fixed_effects
+        self.feature_columns = [] if fixed_effects else list(feature_columns)
+        self.transaction_columns = list(transaction_columns)
+        self.district_values = table[self.feature_columns].to_numpy('float64')
+        self.district_fingerprint = district_fingerprint
+
+        if fixed_effects:
+            self.names = [f'구:{DISTRICT_NAMES[code]}' for code in self.codes] + self.transaction_columns
+        else:
+            self.names = ['절편'] + self.feature_columns + self.transaction_columns
+        p = len(self.names)
+        self.xtx = np.zeros((p, p))
+        self.xty = np.zeros(p)
+        self.yty = 0.0
+        self.y_sum = 0.0
+        self.n = 0
+        self.skipped = 0
+        self.sources = []
+
+    def _district_index(self, names):
+        #거래의 구 이름 -> district_table 행 번호 (없으면 -1)
+        codes = district_codes(names.astype(str)).to_numpy(dtype='float64', na_value=np.nan)
+        index = np.searchsorted(self.codes, np.nan_to_num(codes, nan=-1).astype('int64'))
+        index = np.minimum(index, len(self.codes) - 1)
+        return np.where(self.codes[index] == codes, index, -1)
+
+    def partial_fit(self, chunk):
+        """거래 데이터프레임 한 덩어리를 누적 (구 이름/가격/거래 특성 중 빠진 값이 있는 행은 제외)"""
+        y = to_numeric(chunk[PRICE_COLUMN]).to_numpy('float64')
+        index = self._district_index(chunk[DISTRICT_COLUMN])
+        dense = [self.district_values[index]]
+        if self.transaction_columns:
+            dense.append(np.column_stack([to_numeric(chunk[c]).to_numpy('float64') for c in self.transaction_columns]))
+        dense = np.column_stack(dense)
+
+        keep = (index >= 0) & ~np.isnan(y) & ~np.isnan(dense).any(axis=1)
+        self.skipped += int((~keep).sum())
+        y, index, dense = y[keep], index[keep], dense[keep]
+
+        if self.fixed_effects:
+            #구 더미는 만들지 않고 구별 건수/합계로 XᵀX, Xᵀy의 고정효과 블록을 채움
+            g = len(self.codes)
+            counts = np.bincount(index, minlength=g)
+            sums = np.column_stack([np.bincount(index, weights=dense[:, j], minlength=g)
+                                    for j in range(dense.shape[1])]) if dense.shape[1] else np.zeros((g, 0))
+            self.xtx[np.arange(g), np.arange(g)] += counts
+            self.xtx[:g, g:] += sums
+            self.xtx[g:, :g] += sums.T
+            self.xtx[g:, g:] += dense.T @ dense
+            self.xty[:g] += np.bincount(index, weights=y, minlength=g)
+            self.xty[g:] += dense.T @ y
+        else:
+            X = np.column_stack([np.ones(len(y)), dense])
+            self.xtx += X.T @ X
+            self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.y_sum += float(y.sum())
+        self.n += len(y)
+        return self
+
+    def fit_file(self, path, chunksize=CHUNK_SIZE):
+        """거래 파일을 청크 단위로 읽어 누적 (이미 누적한 내용의 파일은 건너뜀)"""
+        fingerprint = file_fingerprint(path)
+        if fingerprint in self.sources:
+            print(f"{path}: 이미 반영된 파일이라 건너뜁니다.")
+            return self
+        header = pd.read_csv(path, encoding=detect_encoding(path), nrows=0).columns
+        missing = [c for c in self.transaction_columns if c not in header]
+        if missing:
+            raise ValueError(f"{path}에 거래 특성 컬럼 {missing}이(가) 없습니다.")
+        reader = pd.read_csv(path, encoding=detect_encoding(path),
+                             usecols=[DISTRICT_COLUMN, PRICE_COLUMN] + self.transaction_columns,
+                             dtype=str, chunksize=chunksize)
+        before = self.n
+        with reader:
+            for chunk in reader:
+                self.partial_fit(chunk)
+        self.sources.append(fingerprint)
+        print(f"{path} 누적 완료 ({self.n - before:,}건)")
+        return self
+
+    def fit_files(self, paths, chunksize=CHUNK_SIZE):
+        for path in paths:
+            self.fit_file(path, chunksize)
+        return self
+
+    def coefficients(self):
+        """누적된 정규방정식의 해 (특성 이름 인덱스, 식별되지 않는 방향은 최소 노름 해)"""
+        if self.n == 0:
+            raise ValueError(f"누적된 거래가 없습니다. (제외된 거래 {self.skipped:,}건: 구 이름/가격/거래 특성 값 확인)")
+        beta, _, rank, _ = np.linalg.lstsq(self.xtx, self.xty, rcond=None)
+        if rank < len(beta):
+            print(f"특성 {len(beta)}개 중 {len(beta) - rank}개 방향이 다른 특성과 종속이라 식별되지 않습니다.")
+        return pd.Series(beta, index=self.names, name='계수')
+
+    def summary(self):
+        """학습 데이터 기준 거래 수, RMSE, R² (누적 통계만으로 계산)"""
+        beta = self.coefficients().to_numpy()
+        sse = self.yty - 2 * beta @ self.xty + beta @ self.xtx @ beta
+        sst = self.yty - self.y_sum ** 2 / self.n
+        return {'거래 수': self.n, '제외 거래 수': self.skipped,
+                'RMSE': float(np.sqrt(max(sse, 0) / self.n)), 'R²': float(1 - sse / sst)}
+
+    def save(self, path):
+        """누적 상태 저장 (.npz, 다음 달 파일을 이어서 누적할 때 사용)"""
+        tmp_path = path + '.tmp.npz'
+        meta = {'names': self.names, 'n': self.n, 'skipped': self.skipped, 'yty': self.yty,
+                'y_sum': self.y_sum, 'sources': self.sources, 'fixed_effects': self.fixed_effects,
+                'feature_columns': self.feature_columns, 'transaction_columns': self.transaction_columns,
+                'district_fingerprint': self.district_fingerprint}
+        np.savez(tmp_path, xtx=self.xtx, xty=self.xty, meta=json.dumps(meta, ensure_ascii=False))
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """save로 저장한 상태를 이어받음 (같은 특성 구성일 때만)
+
+        구 지표 데이터(district_fingerprint)가 저장 당시와 다르면 이미 누적한 거래에 붙인 지표가
+        현재 값과 섞이므로 이어받지 않고 빈 상태로 둔다.
+        """
+        with np.load(path) as state:
+            meta = json.loads(str(state['meta']))
+            if meta['names'] != self.names:
+                raise ValueError(f"{path}의 특성 구성이 현재 모델과 다릅니다.")
+            if meta.get('district_fingerprint') != self.district_fingerprint:
+                print(f"{path}: 구 지표 데이터가 누적 당시와 달라 이어받지 않고 처음부터 다시 누적합니다.")
+                return self
+            self.xtx, self.xty = state['xtx'], state['xty']
+        self.n, self.skipped, self.yty, self.y_sum = meta['n'], meta['skipped'], meta['yty'], meta['y_sum']
+        self.sources = meta['sources']
+        print(f"{path}에서 누적 상태 로드 ({self.n:,}건, 파일 {len(self.sources)}개)")
+        return self
+
+def transaction_regression(district_table, paths=(DATA_FILES['estate'],), feature_columns=(),
+                           fixed_effects=False, state_path=None, chunksize=CHUNK_SIZE, district_fingerprint=None):
+    """거래 파일들로 거래 단위 회귀 (state_path가 있으면 이전 누적에 새 파일만 더하고 저장)"""
+    header = pd.read_csv(paths[0], encoding=detect_encoding(paths[0]), nrows=0).columns
+    transaction_columns = [c for c in TRANSACTION_COLUMNS if c in header]
+    model = StreamingRegression(district_table, feature_columns, transaction_columns, fixed_effects,
+                                district_fingerprint)
+    if state_path and os.path.exists(state_path):
+        model.load(state_path)
+    model.fit_files(paths, chunksize)
+    if state_path:
+        model.save(state_path)
+    return model
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+#반복 k-겹 교차 검증 기본값
+FOLDS = 5
+REPEATS = 1000
+
+#지레값이 1에 가까우면 그 점을 빼고는 예측할 수 없음
+LEVERAGE_LIMIT = 1 - 1e-10
+
+def design_matrix(X):
+    """절편 열을 붙인 설계 행렬 (float64)
+
+    선형 회귀는 특성의 평행 이동/배율에 예측이 변하지 않으므로 StandardScaler 없이
+    풀어도 StandardScaler+LinearRegression 파이프라인과 같은 예측이 나온다.
+    """
+    X = np.asarray(X, dtype='float64')
+    return np.column_stack([np.ones(len(X)), X])
+
+def loo_predictions(X, y):
+    """한 번의 적합으로 정확한 leave-one-out 예측값 계산
+
+    잔차 e와 hat 행렬 대각 h로 i번째 점을 뺀 모델의 잔차가 e_i / (1 - h_i)임을 이용한다.
+    """
+    A = design_matrix(X)
+    y = np.asarray(y, dtype='float64')
+    Q, _ = np.linalg.qr(A)
+    leverage = (Q ** 2).sum(axis=1)
+    residual = y - Q @ (Q.T @ y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loo_residual = np.where(leverage < LEVERAGE_LIMIT, residual / (1 - leverage), np.nan)
+    return y - loo_residual
+
+def fold_assignments(n, folds=FOLDS, repeats=REPEATS, seed=42):
+    """반복마다 n개 점을 folds개 겹으로 무작위 배정한 (repeats, n) 정수 배열"""
+    rng = np.random.default_rng(seed)
+    order = np.argsort(rng.random((repeats, n)), axis=1)
+    assignment = np.empty((repeats, n), dtype='int64')
+    np.put_along_axis(assignment, order, np.arange(n) % folds, axis=1)
+    return assignment
+
+def kfold_predictions(X, y, assignment, folds=FOLDS):
+    """모든 반복/겹의 학습 모델을 한 번의 배치 연립방정식으로 풀어 겹 밖 예측값 반환
+
+    전체 AᵀA, Aᵀy에서 시험 겹의 기여분만 빼면 각 겹의 학습 정규방정식이 되므로
+    (반복 x 겹)개 모델을 반복문 없이 한꺼번에 푼다. 반환값은 assignment와 같은 모양.
+    """
+    A = design_matrix(X)
+    y = np.asarray(y, dtype='float64')
+    repeats, n = assignment.shape
+
+    #(반복 x 겹, n) 시험 겹 표시 행렬
+    member = (assignment[:, None, :] == np.arange(folds)[None, :, None]).reshape(-1, n).astype('float64')
+    outer = A[:, :, None] * A[:, None, :]
+    gram = A.T @ A - np.einsum('fn,nij->fij', member, outer)
+    moment = A.T @ y - member @ (A * y[:, None])
+    try:
+        beta = np.linalg.solve(gram, moment[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        #특성보다 학습 점이 적은 겹이 있으면 최소 노름 해 사용
+        beta = (np.linalg.pinv(gram) @ moment[:, :, None])[:, :, 0]
+
+    beta = beta.reshape(repeats, folds, -1)
+    fold_beta = np.take_along_axis(beta, assignment[:, :, None], axis=1)
+    return (fold_beta * A[None, :, :]).sum(axis=2)
+
+def scores(y, predictions):
+    """예측값(마지막 축이 점)별 MSE, MAE, R² (예측 불가능한 점은 제외)"""
+    y = np.asarray(y, dtype='float64')
+    error = predictions - y
+    valid = ~np.isnan(error)
+    count = valid.sum(axis=-1)
+    error = np.where(valid, error, 0)
+    mse = (error ** 2).sum(axis=-1) / count
+    mae = np.abs(error).sum(axis=-1) / count
+    r2 = 1 - mse / y.var()
+    return mse, mae, r2
+
+def cross_validate(X, y, folds=FOLDS, repeats=REPEATS, seed=42):
+    """LOO와 반복 k-겹 교차 검증 지표 요약 (행: 방법, 열: 지표 평균/표준편차)"""
+    loo = scores(y, loo_predictions(X, y))
+    kfold = scores(y, kfold_predictions(X, y, fold_assignments(len(y), folds, repeats, seed), folds))
+
+    rows = {'LOO': {name: value for name, value in zip(['MSE', 'MAE', 'R²'], loo)}}
+    row = {}
+    for name, values in zip(['MSE', 'MAE', 'R²'], kfold):
+        row[name] = values.mean()
+        row[f'{name} 표준편차'] = values.std()
+    rows[f'{folds}-겹 x {repeats}회'] = row
+    return pd.DataFrame(rows).T
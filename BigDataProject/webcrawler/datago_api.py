@@ -1,72 +1,132 @@
 import os
 import sys
+import argparse
+import asyncio
 import urllib.request
 import datetime
 import time
 import json
 import pandas as pd
 from dotenv import load_dotenv
+import http_client
+from sink import RecordSink
 
 load_dotenv()
 ServiceKey = os.getenv("SERVICE_KEY")
 
+#출입국 관광통계 서비스 주소 (테스트 서버로 바꿀 때는 TOURISM_SERVICE_URL 지정)
+SERVICE_URL = os.getenv("TOURISM_SERVICE_URL",
+                        'http://openapi.tour.go.kr/openapi/service/EdrcntTourismStatsService/getEdrcntTourismStatsList')
+
+#동시에 보낼 최대 요청 수
+MAX_CONCURRENCY = 8
+
+#CSV 컬럼 {레코드 키: 헤더}
+COLUMNS = {'nat_name': '입국자국가', 'nat_cd': '국가코드', 'yyyymm': '입국연월', 'visit_cnt': '입국자 수'}
+
 def getRequestUrl(url):
-    req = urllib.request.Request(url)
     try:
-        response = urllib.request.urlopen(req)
-        if response.getcode() == 200:
-            print("[%s] Url Request Success" % datetime.datetime.now())
-            return response.read().decode('utf-8')
+        response = http_client.get(url)
+        print("[%s] Url Request Success" % datetime.datetime.now())
+        return response.decode('utf-8')
     except Exception as e:
         print(e)
         print("[%s] Error for URL : %s" % (datetime.datetime.now(), url))
         return None
 
-def getTourismStatsItem(yyyymm, national_code, ed_cd):
-    service_url = 'http://openapi.tour.go.kr/openapi/service/EdrcntTourismStatsService/getEdrcntTourismStatsList'
-
-    parameters = "?_type=json&serviceKey=" + ServiceKey  #인증키
+def getTourismStatsItem(yyyymm, national_code, ed_cd, service_url=SERVICE_URL):
+    parameters = "?_type=json&serviceKey=" + str(ServiceKey)  #인증키
     parameters += "&YM=" + yyyymm
     parameters += "&NAT_CD=" + national_code
     parameters += "&ED_CD=" + ed_cd
 
     url = service_url + parameters
     print(url)  #액세스 거부 여부 확인용 출력
-    retData = getRequestUrl(url) 
+    retData = getRequestUrl(url)
 
     if retData == None:
         return None
-    else:
-        return json.loads(retData)
-def getTourismStatsService(nat_cd, ed_cd, nStartYear, nEndYear):
+    jsonData = json.loads(retData)
+    #아직 공개되지 않은 달이나 오류 응답은 다음 실행에서 다시 조회
+    if jsonData['response']['header']['resultMsg'] != 'OK' or isEmptyMonth(jsonData):
+        http_client.forget(url)
+    return jsonData
+
+def isEmptyMonth(jsonData):
+    #정상 응답인데 items가 비어 있으면 아직 제공되지 않는 달
+    return jsonData['response']['header']['resultMsg'] == 'OK' and jsonData['response']['body']['items'] == ''
+
+async def fetchTourismStats(nat_cd, ed_cd, months, concurrency=MAX_CONCURRENCY, service_url=SERVICE_URL):
+    #months를 최대 concurrency개씩 동시에 요청하고 결과는 months 순서대로 반환
+    #데이터가 없는 달이 확인되면 그 뒤 달 중 아직 보내지 않은 요청은 건너뛰고 None으로 둔다.
+    semaphore = asyncio.Semaphore(concurrency)
+    firstEmpty = None
+
+    async def fetch(index, yyyymm):
+        nonlocal firstEmpty
+        async with semaphore:
+            if firstEmpty is not None and index > firstEmpty:
+                return None
+            jsonData = await asyncio.to_thread(getTourismStatsItem, yyyymm, nat_cd, ed_cd, service_url)
+        if jsonData is not None and isEmptyMonth(jsonData):
+            if firstEmpty is None or index < firstEmpty:
+                firstEmpty = index
+        return jsonData
+
+    return await asyncio.gather(*(fetch(index, yyyymm) for index, yyyymm in enumerate(months)))
+
+def getTourismStatsService(nat_cd, ed_cd, nStartYear, nEndYear, concurrency=MAX_CONCURRENCY, sink=None):
+    #sink를 주면 달마다 바로 파일에 쓰고 (목록은 비워 둠) 이미 받은 달은 다시 요청하지 않음
     jsonResult = []
     result = []
-    for year in range(nStartYear, nEndYear + 1):
-        for month in range(1, 13):
-            yyyymm = '{0}{1:0>2}'.format(str(year), str(month))
-            jsonData = getTourismStatsItem(yyyymm, nat_cd, ed_cd)
-            if jsonData['response']['header']['resultMsg'] == 'OK':
-                if jsonData['response']['body']['items'] == '':
-                    dataEND = '{0}{1:0>2}'.format(str(year), str(month - 1))
-                    print("데이터 없음... \n제공되는 통계 데이터는 %s년 %s월까지입니다." %
-                          (str(year), str(month - 1)))
-                    break
-                print(json.dumps(jsonData, indent=4, sort_keys=True, ensure_ascii=False))
-                natName = jsonData['response']['body']['items']['item']['natKorNm']
-                natName = natName.replace(' ', '')
-                num = jsonData['response']['body']['items']['item']['num']
-                ed = jsonData['response']['body']['items']['item']['ed']
-                print('[%s_%s : %s]' % (natName, yyyymm, num))
-                print('----------------------------------------')
-                jsonResult.append({'nat_name': natName, 'nat_cd': nat_cd,
-                                   'yyyymm': yyyymm, 'visit_cnt': num,
-                                   'ed': ed})
-        result.append((natName, nat_cd, yyyymm, num))
+    natName = ed = dataEND = None
+    months = ['{0}{1:0>2}'.format(str(year), str(month))
+              for year in range(nStartYear, nEndYear + 1) for month in range(1, 13)]
+    if sink is not None:
+        months = [yyyymm for yyyymm in months if yyyymm not in sink.done]
+
+    #모든 달을 동시에 요청한 뒤 월 순서대로 처리 (첫 번째 빈 달에서 중단)
+    responses = asyncio.run(fetchTourismStats(nat_cd, ed_cd, months, concurrency))
+    for yyyymm, jsonData in zip(months, responses):
+        if jsonData is None:
+            print("[%s] 응답을 받지 못해 건너뜁니다." % yyyymm)
+            continue
+        if jsonData['response']['header']['resultMsg'] == 'OK':
+            if isEmptyMonth(jsonData):
+                #이어서 수집할 때는 이번 실행에서 받은 달이 없으면 이전 실행에서 받은 마지막 달
+                lastMonth = dataEND
+                if lastMonth is None and sink is not None:
+                    lastMonth = max((done for done in sink.done if done < yyyymm), default=None)
+                if lastMonth is None:
+                    print("데이터 없음... \n%s년 %s월부터 제공되는 통계 데이터가 없습니다." % (yyyymm[:4], yyyymm[4:]))
+                else:
+                    print("데이터 없음... \n제공되는 통계 데이터는 %s년 %s월까지입니다." % (lastMonth[:4], lastMonth[4:]))
+                break
+            print(json.dumps(jsonData, indent=4, sort_keys=True, ensure_ascii=False))
+            natName = jsonData['response']['body']['items']['item']['natKorNm']
+            natName = natName.replace(' ', '')
+            num = jsonData['response']['body']['items']['item']['num']
+            ed = jsonData['response']['body']['items']['item']['ed']
+            print('[%s_%s : %s]' % (natName, yyyymm, num))
+            print('----------------------------------------')
+            record = {'nat_name': natName, 'nat_cd': nat_cd,
+                      'yyyymm': yyyymm, 'visit_cnt': num,
+                      'ed': ed}
+            if sink is not None:
+                sink.write(yyyymm, [record])
+            else:
+                jsonResult.append(record)
+                result.append((natName, nat_cd, yyyymm, num))
+            dataEND = yyyymm
     return (jsonResult, result, natName, ed, dataEND)
 
 def main():
-    jsonResult = []
-    result = []
+    parser = argparse.ArgumentParser(description="국내 입국 외국인 통계 수집")
+    parser.add_argument('--resume', action='store_true',
+                        help="이전 실행에서 받은 달은 건너뛰고 이어서 수집")
+    parser.add_argument('--pretty-json', action='store_true',
+                        help="수집이 끝난 뒤 들여쓰기 JSON 파일도 생성")
+    args = parser.parse_args()
 
     print("<< 국내 입국한 외국인의 통계 데이터를 수집합니다. >>")
     nat_cd = input("국가 코드를 입력해주세요(중국: 112 / 일본: 130 / 미국: 275): ")
@@ -74,21 +134,13 @@ def main():
     nEndYear = int(input("몇 년까지?: "))
     ed_cd = "E"  #E: 방한외래관광객, D: 해외 출국
 
-    jsonResult, result, natName, ed, dataEND = getTourismStatsService(
-        nat_cd, ed_cd, nStartYear, nEndYear
-    )
-
-    #JSON
-    with open('./%s_%s_%d_%s.json' % (natName, ed, nStartYear, dataEND),
-              'w', encoding='utf8') as outfile:
-        jsonFile = json.dumps(jsonResult, indent=4, sort_keys=True, ensure_ascii=False)
-        outfile.write(jsonFile)
-
-    #CSV
-    columns = ['입국자국가', '국가코드', '입국연월', '입국자 수']
-    result_df = pd.DataFrame(result, columns=columns)
-    result_df.to_csv('./%s_%s_%d_%s.csv' % (natName, ed, nStartYear, dataEND),
-                     index=False, encoding='cp949')
+    #달마다 NDJSON/CSV에 바로 기록 (중단되면 --resume으로 이어서 수집)
+    basename = './%s_%s_%d_%d' % (nat_cd, ed_cd, nStartYear, nEndYear)
+    with RecordSink(basename, COLUMNS, csv_encoding='cp949', resume=args.resume) as sink:
+        getTourismStatsService(nat_cd, ed_cd, nStartYear, nEndYear, sink=sink)
+        print("%s 저장 완료 (%d건)" % (sink.csv_path, sink.count))
+        if args.pretty_json:
+            sink.write_pretty_json(basename + '.json')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,176 @@
+import os
+import time
+import hashlib
+import threading
+import http.client
+from urllib.parse import urlsplit, urlunsplit, urljoin, parse_qsl, urlencode
+
+#응답 캐시 폴더와 최대 크기 (CRAWLER_CACHE_DIR로 위치 변경)
+CACHE_DIR = os.getenv("CRAWLER_CACHE_DIR", ".crawler_cache")
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+#캐시 유효 기간 (초, None이면 만료 없음)
+DEFAULT_TTL = 30 * 24 * 3600
+
+#캐시 키에서 제외할 인증 파라미터
+SECRET_PARAMS = ('serviceKey', 'ServiceKey')
+
+TIMEOUT = 30
+MAX_REDIRECTS = 5
+
+_local = threading.local()
+_cache_lock = threading.Lock()
+_cache_bytes = None
+
+class HTTPStatusError(Exception):
+    #200이 아닌 응답
+    def __init__(self, status, reason, url):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.url = url
+
+def cache_key(url, secret_params=SECRET_PARAMS):
+    #인증키를 뺀 URL의 해시 (키가 바뀌어도 같은 요청은 같은 캐시를 사용)
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in secret_params]
+    normalized = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ''))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key)
+
+def _cache_files():
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith('.tmp'):
+                yield os.path.join(root, name)
+
+def _cache_read(key, ttl):
+    #만료되지 않은 캐시 본문 (파일 mtime = 받은 시각, atime = 마지막 사용 시각)
+    path = _cache_path(key)
+    try:
+        stat = os.stat(path)
+        if ttl is not None and time.time() - stat.st_mtime > ttl:
+            return None
+        with open(path, 'rb') as f:
+            body = f.read()
+        os.utime(path, (time.time(), stat.st_mtime))
+        return body
+    except OSError:
+        return None
+
+def _cache_write(key, body):
+    global _cache_bytes
+    path = _cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(body)
+    try:
+        previous = os.path.getsize(path)
+    except OSError:
+        previous = 0
+    os.replace(tmp, path)
+
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(os.path.getsize(p) for p in _cache_files())
+        else:
+            _cache_bytes += len(body) - previous
+        if _cache_bytes > CACHE_MAX_BYTES:
+            _evict()
+
+def _evict():
+    #가장 오래 사용하지 않은 파일부터 최대 크기의 90%가 될 때까지 삭제
+    global _cache_bytes
+    entries = sorted((os.stat(p).st_atime, os.path.getsize(p), p) for p in _cache_files())
+    for _, size, path in entries:
+        if _cache_bytes <= CACHE_MAX_BYTES * 0.9:
+            break
+        try:
+            os.remove(path)
+            _cache_bytes -= size
+        except OSError:
+            pass
+
+def forget(url, secret_params=SECRET_PARAMS):
+    #url의 캐시 삭제 (아직 바뀔 수 있는 응답을 다음 실행에서 다시 받도록)
+    global _cache_bytes
+    path = _cache_path(cache_key(url, secret_params))
+    with _cache_lock:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if _cache_bytes is not None:
+            _cache_bytes -= size
+
+def clear_cache():
+    #캐시 전체 삭제
+    global _cache_bytes
+    with _cache_lock:
+        for path in list(_cache_files()):
+            os.remove(path)
+        _cache_bytes = 0
+
+def _connection(scheme, netloc):
+    #스레드별로 호스트당 연결 하나를 유지 (keep-alive)
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+    conn = pool.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        conn = pool[(scheme, netloc)] = cls(netloc, timeout=TIMEOUT)
+    return conn
+
+def _drop_connection(scheme, netloc):
+    conn = _local.pool.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+def _request(url, headers):
+    #(status, reason, location, body), 서버가 끊은 연결은 한 번 다시 연결해 재시도
+    parts = urlsplit(url)
+    target = urlunsplit(('', '', parts.path or '/', parts.query, ''))
+    for attempt in range(2):
+        conn = _connection(parts.scheme, parts.netloc)
+        try:
+            conn.request('GET', target, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                http.client.BadStatusLine, ConnectionError):
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt:
+                raise
+            continue
+        except Exception:
+            _drop_connection(parts.scheme, parts.netloc)
+            raise
+        if response.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        return response.status, response.reason, response.getheader('Location'), body
+
+def get(url, headers=None, ttl=DEFAULT_TTL, use_cache=True, secret_params=SECRET_PARAMS):
+    #GET 본문(bytes) 반환, 200 응답만 캐시하며 200이 아니면 HTTPStatusError
+    key = cache_key(url, secret_params)
+    if use_cache:
+        body = _cache_read(key, ttl)
+        if body is not None:
+            return body
+
+    headers = dict(headers or {})
+    for _ in range(MAX_REDIRECTS + 1):
+        status, reason, location, body = _request(url, headers)
+        if status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            continue
+        break
+    if status != 200:
+        raise HTTPStatusError(status, reason, url)
+
+    if use_cache:
+        _cache_write(key, body)
+    return body
@@ -0,0 +1,72 @@
+import re
+import html
+from collections import Counter
+
+#검색 결과의 <b> 강조 태그 등 HTML 마크업
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+#제목과 본문 사이에 넣는 구분자 (두 필드에 걸친 매칭 방지)
+SEPARATOR = '\x00'
+
+def strip_markup(text):
+    #태그를 지우고 &quot; 같은 HTML 엔티티를 원래 문자로 변환
+    return html.unescape(TAG_PATTERN.sub('', text))
+
+def trie_pattern(keywords):
+    #키워드를 접두사 트리 모양의 정규식으로 변환 ('강도', '강력범죄' -> '강(?:도|력범죄)')
+    #한 위치에서 분기를 한 글자씩만 따라가므로 키워드 수가 늘어도 위치당 비교가 거의 늘지 않는다.
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        #여기서 끝나는 키워드가 있으면 더 긴 키워드를 먼저 시도하고 안 되면 여기서 멈춤
+        if '' in node:
+            return f'(?:{body})?' if len(branches) == 1 else body + '?'
+        return body
+
+    return build(trie)
+
+class KeywordMatcher:
+    #키워드 목록을 정규식 하나로 컴파일해 텍스트를 한 번만 훑으며 키워드별 등장 횟수를 셈
+    #전방탐색으로 모든 위치에서 매칭하므로 '강력범죄' 안의 '범죄'처럼 겹치는 키워드도 센다.
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+        first = ''.join(sorted({re.escape(k[0]) for k in self.keywords}))
+        #첫 글자 문자 집합으로 후보 위치를 먼저 거른 뒤 트리 정규식 적용
+        self.pattern = re.compile(f'(?=[{first}])(?=({trie_pattern(self.keywords)}))') if self.keywords else None
+
+        #한 위치에서는 가장 긴 키워드만 매칭되므로 그 키워드의 접두사인 짧은 키워드도 함께 센다.
+        self.prefixes = {
+            keyword: [other for other in self.keywords if keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+
+    def match(self, text):
+        #text에 등장한 키워드별 횟수
+        counts = Counter()
+        if self.pattern is None:
+            return counts
+        for keyword, n in Counter(self.pattern.findall(text)).items():
+            for hit in self.prefixes[keyword]:
+                counts[hit] += n
+        return counts
+
+    def post_text(self, post):
+        #제목과 본문을 마크업 없이 합친 텍스트
+        return strip_markup(post['title']) + SEPARATOR + strip_markup(post['description'])
+
+    def match_post(self, post):
+        return self.match(self.post_text(post))
+
+    def match_posts(self, posts):
+        #기사 목록의 키워드별 횟수 (기사 순서대로)
+        return [self.match(self.post_text(post)) for post in posts]
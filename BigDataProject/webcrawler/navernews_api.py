@@ -1,55 +1,71 @@
 import os
 import sys
+import argparse
 import urllib.request
 import datetime
 import json
 from dotenv import load_dotenv
+import http_client
+from keywords import KeywordMatcher
+from sink import RecordSink
 
 load_dotenv()
 #네이버 API
 client_id = os.getenv("NAVER_ID")
 client_secret = os.getenv("NAVER_SECRET")
 
+#검색 API 주소 (테스트 서버로 바꿀 때는 NAVER_SEARCH_URL 지정)
+SEARCH_URL = os.getenv("NAVER_SEARCH_URL", "https://openapi.naver.com/v1/search")
+
 #검색어
 SEARCH_QUERY = "서울 치안"
 
 #제목/본문에 필터링할 키워드
 KEYWORDS = ["치안", "범죄", "안전", "강력범죄", "CCTV", "사건", "우범", "도난", "강도","마약"]
+MATCHER = KeywordMatcher(KEYWORDS)
+
+#검색 결과는 자주 바뀌므로 캐시는 1시간만 사용
+CACHE_TTL = 3600
+
+#CSV로 저장할 컬럼
+COLUMNS = ['cnt', 'title', 'description', 'org_link', 'link', 'pDate', 'keywords']
 
-def getRequestUrl(url):
-    req = urllib.request.Request(url)
-    req.add_header("X-Naver-Client-Id", client_id)
-    req.add_header("X-Naver-Client-Secret", client_secret)
+def getRequestUrl(url, use_cache=True):
+    headers = {
+        "X-Naver-Client-Id": str(client_id),
+        "X-Naver-Client-Secret": str(client_secret),
+    }
 
     try:
-        response = urllib.request.urlopen(req)
-        if response.getcode() == 200:
-            print("[%s] Url Request Success" % datetime.datetime.now())
-            return response.read().decode('utf-8')
+        response = http_client.get(url, headers=headers, ttl=CACHE_TTL, use_cache=use_cache)
+        print("[%s] Url Request Success" % datetime.datetime.now())
+        return response.decode('utf-8')
     except Exception as e:
         print(e)
         print("[%s] Error for URL: %s" % (datetime.datetime.now(), url))
         return None
 
-def getNaverSearch(node, srcText, start, display):
-    base = "https://openapi.naver.com/v1/search"
+def getNaverSearch(node, srcText, start, display, sort="sim", use_cache=True):
+    base = SEARCH_URL
     node = f"/{node}.json"
-    parameters = f"?query={urllib.parse.quote(srcText)}&start={start}&display={display}"
+    parameters = f"?query={urllib.parse.quote(srcText)}&start={start}&display={display}&sort={sort}"
 
     url = base + node + parameters
-    responseDecode = getRequestUrl(url)
+    responseDecode = getRequestUrl(url, use_cache)
 
     if responseDecode is None:
         return None
     else:
         return json.loads(responseDecode)
 
-def getPostData(post, jsonResult, cnt):
+def getPostData(post, jsonResult, cnt, hits=None):
     title = post['title']
     description = post['description']
 
-    #제목이나 본문에 키워드 포함 여부
-    if not any(keyword in title or keyword in description for keyword in KEYWORDS):
+    #제목이나 본문에 등장한 키워드별 횟수 (없으면 저장하지 않음)
+    if hits is None:
+        hits = MATCHER.match_post(post)
+    if not hits:
         return
 
     org_link = post['originallink']
@@ -63,42 +79,120 @@ def getPostData(post, jsonResult, cnt):
         'description': description,
         'org_link': org_link,
         'link': link,
-        'pDate': pDate
+        'pDate': pDate,
+        'keywords': dict(hits)
     })
 
-def main():
-    node = 'news'
-    cnt = 0
-    jsonResult = []
+def getPostsData(posts, jsonResult, cnt):
+    #한 페이지의 기사를 한꺼번에 키워드 매칭 (cnt는 첫 기사 직전 번호)
+    for offset, (post, hits) in enumerate(zip(posts, MATCHER.match_posts(posts)), start=1):
+        getPostData(post, jsonResult, cnt + offset, hits)
+    return cnt + len(posts)
 
-    print(f"[INFO] 검색어: {SEARCH_QUERY}")
-    jsonResponse = getNaverSearch(node, SEARCH_QUERY, 1, 100)
+def loadCheckpoint(filename):
+    #마지막으로 본 가장 최신 기사 (pubDate와 같은 시각에 본 link 목록, 누적 cnt)
+    if not os.path.exists(filename):
+        return None
+    with open(filename, encoding='utf-8') as infile:
+        return json.load(infile)
+
+def saveCheckpoint(filename, checkpoint):
+    tmp = filename + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as outfile:
+        json.dump(checkpoint, outfile, ensure_ascii=False, indent=4)
+    os.replace(tmp, filename)
+
+def isSeen(post, checkpoint):
+    #체크포인트 이전(또는 같은 시각에 이미 본) 기사인지 확인
+    if checkpoint is None:
+        return False
+    pDate = datetime.datetime.strptime(post['pubDate'], '%a, %d %b %Y %H:%M:%S %z')
+    newest = datetime.datetime.fromisoformat(checkpoint['pubDate'])
+    return pDate < newest or (pDate == newest and post['link'] in checkpoint['links'])
+
+def crawlIncremental(node, checkpointFile, outputFile):
+    #최신순으로 페이지를 넘기다가 이미 본 기사를 만나면 중단하고 새 기사만 NDJSON에 추가
+    checkpoint = loadCheckpoint(checkpointFile)
+    newPosts = []
+    start = 1
+    done = False
+
+    while not done and start <= 1000:  # API 최대 검색 제한
+        jsonResponse = getNaverSearch(node, SEARCH_QUERY, start, 100, sort="date", use_cache=False)
+        if jsonResponse is None:
+            print("API 호출에 실패했습니다.")
+            return
+        if jsonResponse['display'] == 0:
+            break
+        for post in jsonResponse['items']:
+            if isSeen(post, checkpoint):
+                done = True
+                break
+            newPosts.append(post)
+        start = jsonResponse['start'] + jsonResponse['display']
 
-    if jsonResponse is None:
-        print("API 호출에 실패했습니다.")
+    if not newPosts:
+        print("새 기사가 없습니다.")
         return
 
-    total = jsonResponse['total']
-
-    while jsonResponse is not None and jsonResponse['display'] != 0:
-        for post in jsonResponse['items']:
-            cnt += 1
-            getPostData(post, jsonResult, cnt)
+    #오래된 기사부터 cnt를 이어 붙여 파일이 시간순으로 쌓이도록 추가
+    cnt = checkpoint['cnt'] if checkpoint else 0
+    jsonResult = []
+    cnt = getPostsData(newPosts[::-1], jsonResult, cnt)
+    with open(outputFile, 'a', encoding='utf-8') as outfile:
+        for record in jsonResult:
+            outfile.write(json.dumps(record, sort_keys=True, ensure_ascii=False) + '\n')
+
+    newest = datetime.datetime.strptime(newPosts[0]['pubDate'], '%a, %d %b %Y %H:%M:%S %z')
+    links = [post['link'] for post in newPosts
+             if datetime.datetime.strptime(post['pubDate'], '%a, %d %b %Y %H:%M:%S %z') == newest]
+    if checkpoint and datetime.datetime.fromisoformat(checkpoint['pubDate']) == newest:
+        links += checkpoint['links']
+    saveCheckpoint(checkpointFile, {'pubDate': newest.isoformat(), 'links': links, 'cnt': cnt})
+
+    print(f'새 기사 : {len(newPosts)} 건')
+    print(f'필터링 후 추가된 데이터 : {len(jsonResult)} 건')
+    print(f'{outputFile} 추가 완료')
 
-        start = jsonResponse['start'] + jsonResponse['display']
-        if start > 1000:  # API 최대 검색 제한
-            break
-        jsonResponse = getNaverSearch(node, SEARCH_QUERY, start, 100)
+def main():
+    parser = argparse.ArgumentParser(description="네이버 뉴스 검색 결과 수집")
+    parser.add_argument('--incremental', action='store_true',
+                        help="마지막 실행 이후의 새 기사만 받아 NDJSON 파일에 추가")
+    parser.add_argument('--resume', action='store_true',
+                        help="전체 수집이 중단된 경우 받은 페이지는 건너뛰고 이어서 수집")
+    parser.add_argument('--pretty-json', action='store_true',
+                        help="전체 수집이 끝난 뒤 들여쓰기 JSON 파일도 생성")
+    args = parser.parse_args()
 
-    print(f'전체 검색 : {total} 건')
-    print(f'필터링 후 저장된 데이터 : {len(jsonResult)} 건')
+    node = 'news'
+    display = 100
 
-    filename = f"{SEARCH_QUERY}_filtered_news.json"
-    with open(filename, 'w', encoding='utf-8') as outfile:
-        jsonFile = json.dumps(jsonResult, indent=4, sort_keys=True, ensure_ascii=False)
-        outfile.write(jsonFile)
+    print(f"[INFO] 검색어: {SEARCH_QUERY}")
+    if args.incremental:
+        crawlIncremental(node, f"{SEARCH_QUERY}_checkpoint.json", f"{SEARCH_QUERY}_filtered_news.ndjson")
+        return
 
-    print(f'{filename} 저장 완료')
+    #페이지마다 NDJSON/CSV에 바로 기록 (cnt는 검색 순위라 페이지 시작 번호로 정해짐)
+    basename = f"{SEARCH_QUERY}_filtered_news_all"
+    with RecordSink(basename, COLUMNS, resume=args.resume) as sink:
+        for start in range(1, 1000 + 1, display):  # API 최대 검색 제한
+            if str(start) in sink.done:
+                continue
+            jsonResponse = getNaverSearch(node, SEARCH_QUERY, start, display)
+            if jsonResponse is None:
+                print("API 호출에 실패했습니다. --resume으로 이어서 수집할 수 있습니다.")
+                return
+            if jsonResponse['display'] == 0:
+                break
+            jsonResult = []
+            getPostsData(jsonResponse['items'], jsonResult, start - 1)
+            sink.write(start, jsonResult)
+            print(f'전체 검색 : {jsonResponse["total"]} 건 중 {start + jsonResponse["display"] - 1} 건 확인')
+
+        print(f'필터링 후 저장된 데이터 : {sink.count} 건')
+        print(f'{sink.ndjson_path}, {sink.csv_path} 저장 완료')
+        if args.pretty_json:
+            sink.write_pretty_json(f"{SEARCH_QUERY}_filtered_news.json")
 
 if __name__ == '__main__':
     main()
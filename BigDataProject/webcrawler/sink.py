@@ -0,0 +1,118 @@
+import os
+import csv
+import json
+
+class RecordSink:
+    #수집 결과를 받는 즉시 NDJSON/CSV 파일에 추가하고 단위(페이지, 달, 구)마다 flush
+    #
+    #basename.ndjson  레코드 한 줄에 하나 (원본)
+    #basename.csv     columns 순서의 CSV (columns가 dict이면 {레코드 키: CSV 헤더})
+    #basename.progress 끝난 단위와 그 시점의 누적 레코드 수
+    #
+    #resume=True이면 progress에 기록된 단위까지만 남기고(중간에 끊긴 단위의 레코드는 잘라냄)
+    #이어서 수집하며, 끝난 단위는 done에서 확인해 건너뛸 수 있다.
+
+    def __init__(self, basename, columns, csv_encoding='utf-8-sig', resume=False):
+        self.ndjson_path = basename + '.ndjson'
+        self.csv_path = basename + '.csv'
+        self.progress_path = basename + '.progress'
+        self.columns = list(columns)
+        self.headers = list(columns.values()) if isinstance(columns, dict) else self.columns
+        self.csv_encoding = csv_encoding
+        self.done = set()
+        self.count = 0
+
+        if resume and os.path.exists(self.progress_path):
+            self._restore()
+        else:
+            for path in (self.ndjson_path, self.progress_path):
+                open(path, 'w', encoding='utf-8').close()
+            self._rewrite_csv()
+
+        self.ndjson = open(self.ndjson_path, 'a', encoding='utf-8')
+        self.csv_file = open(self.csv_path, 'a', encoding=self.csv_encoding, newline='')
+        self.csv = csv.writer(self.csv_file)
+        self.progress = open(self.progress_path, 'a', encoding='utf-8')
+
+    def _restore(self):
+        #progress의 마지막 누적 수까지만 NDJSON을 남기고, CSV 행 수가 다르면 NDJSON으로 다시 생성
+        with open(self.progress_path, encoding='utf-8') as infile:
+            for line in infile:
+                if line.endswith('\n') and '\t' in line:
+                    unit, count = line.rstrip('\n').rsplit('\t', 1)
+                    self.done.add(unit)
+                    self.count = int(count)
+
+        keep = 0
+        with open(self.ndjson_path, 'rb') as infile:
+            for _ in range(self.count):
+                line = infile.readline()
+                if not line.endswith(b'\n'):
+                    raise ValueError(f"{self.ndjson_path}의 레코드 수가 진행 기록보다 적습니다.")
+                keep += len(line)
+        with open(self.ndjson_path, 'r+b') as outfile:
+            outfile.truncate(keep)
+
+        rows = 0
+        if os.path.exists(self.csv_path):
+            with open(self.csv_path, encoding=self.csv_encoding, newline='') as infile:
+                rows = sum(1 for _ in csv.reader(infile)) - 1
+        if rows != self.count:
+            self._rewrite_csv(self.records())
+        print(f"{self.ndjson_path}에서 이어서 수집합니다. (완료 {len(self.done)}개 단위, {self.count:,}건)")
+
+    def _rewrite_csv(self, records=()):
+        with open(self.csv_path, 'w', encoding=self.csv_encoding, newline='') as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(self.headers)
+            for record in records:
+                writer.writerow(self._row(record))
+
+    def _row(self, record):
+        #dict/list 값은 JSON 문자열로 저장
+        row = []
+        for column in self.columns:
+            value = record.get(column, '')
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False, sort_keys=True)
+            row.append(value)
+        return row
+
+    def write(self, unit, records):
+        #단위 하나의 레코드를 추가하고 디스크에 반영한 뒤 완료로 기록
+        for record in records:
+            self.ndjson.write(json.dumps(record, sort_keys=True, ensure_ascii=False) + '\n')
+            self.csv.writerow(self._row(record))
+            self.count += 1
+        self.ndjson.flush()
+        self.csv_file.flush()
+        self.progress.write(f"{unit}\t{self.count}\n")
+        self.progress.flush()
+        self.done.add(str(unit))
+
+    def records(self):
+        #저장된 레코드를 한 줄씩 읽어 반환
+        with open(self.ndjson_path, encoding='utf-8') as infile:
+            for line in infile:
+                yield json.loads(line)
+
+    def write_pretty_json(self, path):
+        #NDJSON을 기존 결과와 같은 들여쓰기 JSON 배열로 변환 (레코드를 한 건씩 옮김)
+        self.ndjson.flush()
+        with open(path, 'w', encoding='utf8') as outfile:
+            outfile.write('[')
+            for i, record in enumerate(self.records()):
+                text = json.dumps(record, indent=4, sort_keys=True, ensure_ascii=False)
+                outfile.write((',\n    ' if i else '\n    ') + text.replace('\n', '\n    '))
+            outfile.write('\n]' if self.count else ']')
+        print(f"JSON 파일 저장 완료: {path}")
+
+    def close(self):
+        for f in (self.ndjson, self.csv_file, self.progress):
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()